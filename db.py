@@ -7,9 +7,14 @@
 import sqlite3
 import json
 import os
+import sys
 from datetime import datetime
 from typing import List, Dict, Optional
 
+# 球员名单（性别等）统一由 排阵/roster.py 提供
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "排阵"))
+from roster import ROSTER
+
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data.db")
 
@@ -117,8 +122,7 @@ def save_event_data(event_name: str, matches: List[Dict], court_count: int = 3)
         if row:
             player_ids[player] = row["id"]
         else:
-            # 简单判断性别（根据名字或单独配置）
-            gender = "F" if player in ["田茜", "唐英武", "李祺祺", "高洁", "滕菲", "谢卓珊", "崔倩男", "林小连"] else "M"
+            gender = "F" if ROSTER.is_female(player) else "M"
             cursor.execute("INSERT INTO players (name, gender) VALUES (?, ?)", (player, gender))
             player_ids[player] = cursor.lastrowid
     
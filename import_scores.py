@@ -12,7 +12,10 @@ from datetime import datetime
 # 导入数据库模块
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(script_dir))
+# 球员名单在 排阵/roster.py
+sys.path.insert(0, os.path.join(script_dir, "排阵"))
 from db import get_db_connection, init_db
+from roster import ROSTER
 
 
 def import_scores(json_path: str):
@@ -80,9 +83,7 @@ def import_scores(json_path: str):
         if row:
             player_ids[player] = row['id']
         else:
-            # 简单判断性别
-            female_names = ["田茜", "唐英武", "李祺祺", "高洁", "滕菲", "谢卓珊", "崔倩男", "林小连", "林小连"]
-            gender = "F" if player in female_names else "M"
+            gender = "F" if ROSTER.is_female(player) else "M"
             cursor.execute("INSERT INTO players (name, gender) VALUES (?, ?)", (player, gender))
             player_ids[player] = cursor.lastrowid
     
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Benchmark Suite
+Times every scheduler on synthetic signups and records peak memory and
+schedule quality, so scaling and regressions are visible across commits.
+
+Schedulers:
+- greedy: lineup_scheduler.select_balanced_matches
+- llm: llm_scheduler.LLMLineupScheduler.schedule
+- chaos: 混双大乱斗/mixed_doubles_chaos.generate_mixed_doubles_matches (fair mode)
+
+Usage:
+    python benchmark.py                                  # 默认规模 8-60 人
+    python benchmark.py --sizes 8 16 32 --schedulers greedy llm
+    python benchmark.py --output new.json --baseline benchmark_results.json
+    python benchmark.py --large                          # 大型活动性能目标（10 场地 / 80 人 / 12 轮 < 1 秒）
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "混双大乱斗"))
+
+import lineup_scheduler
+import llm_scheduler
+from roster import ROSTER
+from schedule_metrics import schedule_metrics
+
+
+DEFAULT_SIZES = (8, 12, 16, 24, 32, 48, 60, 80)
+DEFAULT_FEMALE_RATIOS = (0.2, 0.35, 0.5)
+GUEST_RATIO = 0.25            # 外援比例
+MIXED_ELIGIBLE_RATIO = 0.4    # 可打混双的男生比例
+
+# 回归判定：耗时超过基线的倍数（另加 5ms 容差），或目标值变差
+TIME_REGRESSION_FACTOR = 1.25
+
+# 大型活动的性能目标：10 片场地、80 人、12 轮，贪心排阵 1 秒内完成
+LARGE_EVENT = {"players": 80, "courts": 10, "rounds": 12, "seconds": 1.0}
+
+
+# ----------------------------------------------------------------------
+# Synthetic signups
+
+def synthetic_signup(total_players: int, female_ratio: float, seed: int) -> Dict:
+    """
+    Generate a synthetic signup with guests and player constraints.
+
+    Names are synthetic ("男01", "女03") so they never collide with the real roster.
+    """
+    rng = random.Random(f"{total_players}-{female_ratio}-{seed}")
+    female_count = max(0, min(total_players, round(total_players * female_ratio)))
+    males = [f"男{i + 1:02d}" for i in range(total_players - female_count)]
+    females = [f"女{i + 1:02d}" for i in range(female_count)]
+
+    players = males + females
+    guests = set(rng.sample(players, int(len(players) * GUEST_RATIO)))
+    internal_males = [m for m in males if m not in guests]
+    mixed_males = set(rng.sample(internal_males, int(len(internal_males) * MIXED_ELIGIBLE_RATIO)))
+
+    # 与真实名单一致的约束：一名提前离场球员，女生足够时一名只打女双
+    constraints = {}
+    if len(players) > 8:
+        constraints[rng.choice(players)] = {"fixed_games": None, "early_departure": True}
+    if len(females) >= 5:
+        only_womens = rng.choice([f for f in females if f not in constraints])
+        constraints[only_womens] = {"only_womens_doubles": True}
+
+    return {
+        "males": males,
+        "females": females,
+        "guests": guests,
+        "mixed_males": mixed_males,
+        "constraints": constraints,
+        "female_ratio": female_ratio,
+        "seed": seed,
+    }
+
+
+@contextlib.contextmanager
+def registered_roster(signup: Dict):
+    """Temporarily register a synthetic signup in the shared roster."""
+    names = signup["males"] + signup["females"]
+    female_set = set(signup["females"])
+    for name in names:
+        ROSTER.add(name, female=name in female_set, guest=name in signup["guests"],
+                   mixed_eligible=name in signup["mixed_males"],
+                   constraints=signup["constraints"].get(name, {}))
+    try:
+        yield
+    finally:
+        for name in names:
+            ROSTER.remove(name)
+
+
+# ----------------------------------------------------------------------
+# Scheduler runners: each returns (matches, players, objective or None)
+
+def run_greedy(signup: Dict) -> Tuple[List[Dict], List[str], Optional[float]]:
+    males, females = signup["males"], signup["females"]
+    all_players = males + females
+    court_count = lineup_scheduler.get_court_count(len(all_players))
+    total_matches = lineup_scheduler.get_total_matches(all_players, court_count)[0]
+    matches = lineup_scheduler.select_balanced_matches(
+        lineup_scheduler.generate_mixed_doubles_matches(males, females),
+        lineup_scheduler.generate_mens_doubles_matches(males),
+        lineup_scheduler.generate_womens_doubles_matches(females),
+        total_matches, court_count, all_players, males, females
+    )
+    return matches, all_players, lineup_scheduler.schedule_objective(matches, total_matches, all_players, females)
+
+
+def run_llm(signup: Dict) -> Tuple[List[Dict], List[str], Optional[float]]:
+    males, females = signup["males"], signup["females"]
+    all_players = males + females
+    court_count = llm_scheduler.get_court_count(len(all_players))
+    scheduler = llm_scheduler.LLMLineupScheduler(males, females, court_count, len(all_players))
+    matches = scheduler.schedule()
+    objective = lineup_scheduler.schedule_objective(matches, scheduler.total_matches, all_players, females)
+    return matches, all_players, objective
+
+
+def run_chaos(signup: Dict) -> Tuple[List[Dict], List[str], Optional[float]]:
+    from mixed_doubles_chaos import generate_mixed_doubles_matches
+
+    # 混双大乱斗：A 组男、B 组女人数相同
+    group_size = min(len(signup["males"]), len(signup["females"]))
+    group_a, group_b = signup["males"][:group_size], signup["females"][:group_size]
+    matches = generate_mixed_doubles_matches(group_a, group_b, court_count=2, mode="fair")
+    return matches, group_a + group_b, None
+
+
+# name -> (runner, max players, min players)
+# LLM 排阵在 48 人时已需 ~40 秒，默认限制规模
+SCHEDULERS: Dict[str, Tuple[Callable, int, int]] = {
+    "greedy": (run_greedy, 80, 8),
+    "llm": (run_llm, 40, 8),
+    "chaos": (run_chaos, 24, 8),
+}
+
+
+# ----------------------------------------------------------------------
+
+def benchmark_case(name: str, signup: Dict, repeat: int = 1, measure_memory: bool = True) -> Dict:
+    """Run one scheduler on one signup; returns a JSON-serializable result row."""
+    runner = SCHEDULERS[name][0]
+    result = {
+        "scheduler": name,
+        "players": len(signup["males"]) + len(signup["females"]),
+        "males": len(signup["males"]),
+        "females": len(signup["females"]),
+        "guests": len(signup["guests"]),
+        "female_ratio": signup["female_ratio"],
+        "seed": signup["seed"],
+    }
+    try:
+        with registered_roster(signup), contextlib.redirect_stdout(io.StringIO()):
+            times = []
+            for _ in range(repeat):
+                random.seed(signup["seed"])
+                start = time.perf_counter()
+                matches, players, objective = runner(signup)
+                times.append(time.perf_counter() - start)
+
+            peak = None
+            if measure_memory:
+                random.seed(signup["seed"])
+                tracemalloc.start()
+                try:
+                    runner(signup)
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+    except Exception as exc:  # 记录失败而不中断整个基准测试
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        return result
+
+    result["seconds"] = min(times)
+    result["peak_kb"] = round(peak / 1024, 1) if peak is not None else None
+    result["objective"] = objective
+    result["metrics"] = schedule_metrics(matches, players)
+    return result
+
+
+def case_key(row: Dict) -> Tuple:
+    return row["scheduler"], row["males"], row["females"], row["seed"]
+
+
+def compare_with_baseline(results: List[Dict], baseline: List[Dict]) -> List[str]:
+    """Human-readable regressions of ``results`` against a previous run."""
+    previous = {case_key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(case_key(row))
+        if old is None or "error" in old:
+            continue
+        label = f"{row['scheduler']} {row['males']}男/{row['females']}女 seed={row['seed']}"
+        if "error" in row:
+            regressions.append(f"{label}: 运行失败 ({row['error']})")
+            continue
+        if row["seconds"] > old["seconds"] * TIME_REGRESSION_FACTOR + 0.005:
+            regressions.append(f"{label}: 耗时 {old['seconds']:.3f}s -> {row['seconds']:.3f}s")
+        if row["objective"] is not None and old.get("objective") is not None \
+                and row["objective"] > old["objective"] + 1e-9:
+            regressions.append(f"{label}: 目标值 {old['objective']:.2f} -> {row['objective']:.2f}")
+    return regressions
+
+
+def run_suite(sizes=DEFAULT_SIZES, ratios=DEFAULT_FEMALE_RATIOS, seeds: int = 1,
+              schedulers=tuple(SCHEDULERS), repeat: int = 1, measure_memory: bool = True,
+              max_players: Optional[int] = None) -> List[Dict]:
+    results = []
+    for size in sizes:
+        for ratio in ratios:
+            for seed in range(seeds):
+                signup = synthetic_signup(size, ratio, seed)
+                for name in schedulers:
+                    _, limit, min_players = SCHEDULERS[name]
+                    if not min_players <= size <= (max_players or limit):
+                        continue
+                    row = benchmark_case(name, signup, repeat, measure_memory)
+                    results.append(row)
+                    if "error" in row:
+                        print(f"  {name:<7} {row['males']:>2}男/{row['females']:>2}女  失败：{row['error']}")
+                    else:
+                        objective = f"{row['objective']:.2f}" if row["objective"] is not None else "-"
+                        peak = f"{row['peak_kb']:.0f}KB" if row["peak_kb"] is not None else "-"
+                        print(f"  {name:<7} {row['males']:>2}男/{row['females']:>2}女  "
+                              f"{row['seconds']:8.3f}s  {peak:>9}  "
+                              f"{row['metrics']['total_matches']:>3}场  方差 {row['metrics']['games_variance']:.2f}  "
+                              f"目标值 {objective}")
+    return results
+
+
+def run_large_event(ratios=DEFAULT_FEMALE_RATIOS, seeds: int = 3) -> List[Dict]:
+    """Time the greedy scheduler at LARGE_EVENT size; each row records whether it met the target."""
+    results = []
+    courts, rounds = LARGE_EVENT["courts"], LARGE_EVENT["rounds"]
+    for ratio in ratios:
+        for seed in range(seeds):
+            signup = synthetic_signup(LARGE_EVENT["players"], ratio, seed)
+            males, females = signup["males"], signup["females"]
+            all_players = males + females
+            with registered_roster(signup), contextlib.redirect_stdout(io.StringIO()):
+                total_matches = lineup_scheduler.get_total_matches(all_players, courts, rounds)[0]
+
+                def run():
+                    random.seed(seed)
+                    return lineup_scheduler.select_balanced_matches(
+                        lineup_scheduler.generate_mixed_doubles_matches(males, females),
+                        lineup_scheduler.generate_mens_doubles_matches(males),
+                        lineup_scheduler.generate_womens_doubles_matches(females),
+                        total_matches, courts, all_players, males, females
+                    )
+
+                start = time.perf_counter()
+                matches = run()
+                seconds = time.perf_counter() - start
+                # 峰值内存单独测量（tracemalloc 会显著拖慢计时）
+                tracemalloc.start()
+                try:
+                    run()
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+            metrics = schedule_metrics(matches, all_players)
+            row = {
+                "players": len(all_players), "courts": courts, "rounds": rounds,
+                "female_ratio": ratio, "seed": seed,
+                "seconds": seconds, "peak_kb": round(peak / 1024, 1),
+                "matches": len(matches), "games_variance": metrics["games_variance"],
+                "met_target": seconds < LARGE_EVENT["seconds"],
+            }
+            results.append(row)
+            print(f"  {row['players']}人/{courts}场地/{rounds}轮 女生{ratio:.0%} seed={seed}  "
+                  f"{seconds:6.3f}s  {row['peak_kb']:>8.0f}KB  {len(matches)}场  "
+                  f"方差 {metrics['games_variance']:.2f}  {'✓' if row['met_target'] else '✗ 超时'}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="羽毛球排阵基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="报名人数列表（默认 8-60）")
+    parser.add_argument("--ratios", type=float, nargs="+", default=list(DEFAULT_FEMALE_RATIOS),
+                        help="女生比例列表")
+    parser.add_argument("--seeds", type=int, default=1, help="每种规模的随机报名数量")
+    parser.add_argument("--schedulers", nargs="+", choices=list(SCHEDULERS), default=list(SCHEDULERS))
+    parser.add_argument("--repeat", type=int, default=1, help="计时重复次数（取最小值）")
+    parser.add_argument("--no-memory", action="store_true", help="跳过峰值内存测量")
+    parser.add_argument("--max-players", type=int, default=None,
+                        help="覆盖各排阵算法的默认规模上限")
+    parser.add_argument("--output", default="benchmark_results.json", help="结果 JSON 路径")
+    parser.add_argument("--baseline", default=None, help="与之前的结果 JSON 对比，列出回归")
+    parser.add_argument("--large", action="store_true",
+                        help="只运行大型活动性能目标测试（10 场地 / 80 人 / 12 轮）")
+    args = parser.parse_args(argv)
+
+    if args.large:
+        print(f"大型活动性能目标：< {LARGE_EVENT['seconds']:.0f} 秒")
+        rows = run_large_event(args.ratios, max(args.seeds, 3))
+        missed = [row for row in rows if not row["met_target"]]
+        print(f"\n{len(rows) - len(missed)}/{len(rows)} 项达标")
+        return 1 if missed else 0
+
+    print("=" * 60)
+    print("羽毛球排阵基准测试")
+    print("=" * 60)
+    results = run_suite(args.sizes, args.ratios, args.seeds, args.schedulers,
+                        args.repeat, not args.no_memory, args.max_players)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存：{args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_with_baseline(results, baseline)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项回归:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n✓ 与基线相比没有回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Capacity Simulator
+Monte-Carlo replay of signups through the scheduler, for court booking decisions.
+
+Each simulated session schedules a roster with a seeded greedy run (as many
+rounds as the booked time holds at the archive's mean match length), draws every
+match duration from court_timeline.DurationModel (learned from the score
+archive) and plays the session on a court timeline. Only games that finish
+before the booked time count; a session reaches the target when every player
+finishes min(TARGET_GAMES, 固定场次或最大场次) games in time. Many sessions give
+the distribution of games per player and of session length for each court count. "Will 3 courts for 22
+signups give everyone 5 games in 2 hours?" is then read off the table instead
+of the COURT_ABUNDANCE_THRESHOLD rule of thumb.
+
+Scheduling is the expensive part, so each seeded schedule is reused for
+``samples`` duration draws (per-match mean / std computed once). Seeds are
+split into chunks that run in a process pool.
+
+Usage:
+    python capacity_simulator.py                             # 微信接龙.txt，2-4 片场地，2 小时
+    python capacity_simulator.py --players 22 --females 6 --courts 3 4 --hours 2.5
+    python capacity_simulator.py --sessions 5000 --workers 8 --mode lockstep
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from court_timeline import DurationModel, load_duration_model, simulate_lockstep, simulate_staggered
+from lineup_scheduler import (
+    TARGET_GAMES, get_fixed_games_for_player, get_max_games_for_player, get_total_matches, schedule_with_seed,
+)
+from roster import FEMALE_PLAYERS, MALE_PLAYERS
+
+
+DEFAULT_SCHEDULES = 20       # 每种场地数运行的排阵种子数
+DEFAULT_SESSIONS = 2000      # 每种场地数模拟的活动次数
+SIMULATORS = {"staggered": simulate_staggered, "lockstep": simulate_lockstep}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def random_roster(players: int, females: int, rng: random.Random) -> Tuple[List[str], List[str]]:
+    """A random signup of ``players`` known players, ``females`` of them female (名单顺序)."""
+    females = min(females, len(FEMALE_PLAYERS))
+    males = min(players - females, len(MALE_PLAYERS))
+    chosen_m = set(rng.sample(MALE_PLAYERS, males))
+    chosen_f = set(rng.sample(FEMALE_PLAYERS, females))
+    return [p for p in MALE_PLAYERS if p in chosen_m], [p for p in FEMALE_PLAYERS if p in chosen_f]
+
+
+def booking_rounds(booking_minutes: float, model: DurationModel) -> int:
+    """Rounds that fit in ``booking_minutes`` at the model's mean match length."""
+    mean_seconds = model.duration(model.default_points, model.default_points)
+    return max(1, int(booking_minutes * 60 // mean_seconds))
+
+
+def player_targets(players: List[str], total_matches: int) -> Dict[str, int]:
+    """Games each player should finish: TARGET_GAMES, capped by their fixed or maximum games."""
+    targets = {}
+    for p in players:
+        fixed = get_fixed_games_for_player(p, total_matches, len(players))
+        targets[p] = min(TARGET_GAMES, fixed if fixed is not None else get_max_games_for_player(p))
+    return targets
+
+
+def _simulate_chunk(args) -> Tuple[List[int], List[float], List[bool]]:
+    """
+    One worker's share: schedule each seed once, then replay it with ``samples`` duration draws.
+
+    Returns:
+        (每名球员在预订时间内完成的场次, 每次活动的总时长, 每次活动是否人人达到目标场次)
+    """
+    (seeds, roster, court_count, rounds, samples, booking_seconds, mode, model) = args
+    simulate = SIMULATORS[mode]
+    games_per_player: List[int] = []
+    lengths: List[float] = []
+    met_target: List[bool] = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        if isinstance(roster[0], int):
+            males, females = random_roster(roster[0], roster[1], rng)
+        else:
+            males, females = roster
+        all_players = males + females
+        total_matches = get_total_matches(all_players, court_count, rounds)[0]
+        _, _, matches = schedule_with_seed(seed, males, females, total_matches, court_count)
+        if not matches:
+            continue
+        targets = player_targets(all_players, total_matches)
+        # 每场比赛的期望总分与标准差只算一次，之后每次抽样只是一次正态采样
+        expected = [model.expected_points(m) for m in matches]
+        estimates = [model.duration(mean, mean) for mean, _ in expected]
+        for _ in range(samples):
+            durations = [model.duration(rng.gauss(mean, std), mean) for mean, std in expected]
+            session = simulate(matches, durations, court_count, estimates=estimates)
+            played = dict.fromkeys(all_players, 0)
+            for m in session["timeline"]:
+                if m["end"] <= booking_seconds:
+                    for pair in m["match"]:
+                        for p in pair:
+                            played[p] += 1
+            games_per_player.extend(played.values())
+            lengths.append(session["length"])
+            met_target.append(all(played[p] >= targets[p] for p in all_players))
+    return games_per_player, lengths, met_target
+
+
+def simulate_capacity(roster, court_count: int, booking_minutes: float, sessions: int = DEFAULT_SESSIONS,
+                      schedules: int = DEFAULT_SCHEDULES, rounds: Optional[int] = None, mode: str = "staggered",
+                      model: Optional[DurationModel] = None, workers: int = 1, seed: int = 0) -> Dict:
+    """
+    Simulate ``sessions`` sessions of one court count.
+
+    Args:
+        roster: (males, females) 固定报名，或 (人数, 女生人数) 每个种子随机抽取名单
+        booking_minutes: 预订的场地时长（分钟），之后结束的比赛不计入
+        rounds: 每片场地排的轮数，None = 按预订时长与平均比赛时长估计
+        schedules: 排阵种子数；每个排阵重复 sessions / schedules 次时长抽样
+        mode: staggered 错峰 / lockstep 同步轮次
+
+    Returns:
+        {"court_count", "sessions", "rounds", "mean_games", "p10_games", "p_target", "length_p50", "length_p90",
+         "p_overtime", "games_histogram"}
+    """
+    model = model or load_duration_model()
+    rounds = rounds or booking_rounds(booking_minutes, model)
+    schedules = max(1, min(schedules, sessions))
+    samples = max(1, sessions // schedules)
+    seeds = list(range(seed, seed + schedules))
+    chunks = [seeds[k::workers] for k in range(workers)] if workers > 1 else [seeds]
+    args = [(chunk, roster, court_count, rounds, samples, booking_minutes * 60, mode, model)
+            for chunk in chunks if chunk]
+    if len(args) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_chunk, args))
+    else:
+        results = [_simulate_chunk(a) for a in args]
+
+    games = sorted(g for r in results for g in r[0])
+    lengths = sorted(l for r in results for l in r[1])
+    met_target = [m for r in results for m in r[2]]
+    histogram: Dict[int, int] = {}
+    for g in games:
+        histogram[g] = histogram.get(g, 0) + 1
+    booking_seconds = booking_minutes * 60
+    return {
+        "court_count": court_count,
+        "sessions": len(lengths),
+        "mean_games": sum(games) / len(games) if games else 0.0,
+        "p10_games": percentile(games, 0.1),
+        "rounds": rounds,
+        "p_target": sum(met_target) / len(met_target) if met_target else 0.0,
+        "length_p50": percentile(lengths, 0.5),
+        "length_p90": percentile(lengths, 0.9),
+        "p_overtime": sum(1 for l in lengths if l > booking_seconds) / len(lengths) if lengths else 0.0,
+        "games_histogram": dict(sorted(histogram.items())),
+    }
+
+
+def recommend_courts(results: List[Dict], confidence: float = 0.8) -> Optional[int]:
+    """Fewest courts whose sessions give everyone their target games with probability >= ``confidence``."""
+    for r in sorted(results, key=lambda r: r["court_count"]):
+        if r["p_target"] >= confidence:
+            return r["court_count"]
+    return None
+
+
+def main(argv: Optional[List[str]] = None):
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="羽毛球排阵 - 场地容量模拟（订几片场地）")
+    parser.add_argument("--signup", default=str(base_dir / "微信接龙.txt"), help="报名接龙")
+    parser.add_argument("--players", type=int, default=None, help="按人数随机抽取名单（代替 --signup）")
+    parser.add_argument("--females", type=int, default=None, help="随机名单中的女生人数（默认约 1/3）")
+    parser.add_argument("--courts", type=int, nargs="+", default=[2, 3, 4], help="比较的场地数（默认 2 3 4）")
+    parser.add_argument("--hours", type=float, default=2.0, help="预订时长（小时，默认 2）")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="每种场地数模拟的活动次数")
+    parser.add_argument("--schedules", type=int, default=DEFAULT_SCHEDULES, help="每种场地数的排阵种子数")
+    parser.add_argument("--mode", choices=sorted(SIMULATORS), default="staggered", help="上场方式（默认错峰）")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数（默认 1）")
+    parser.add_argument("--db", default=None, help="比分数据库（默认 data.db）")
+    args = parser.parse_args(argv)
+
+    if args.players:
+        females = args.females if args.females is not None else args.players // 3
+        roster = (args.players, females)
+        print(f"随机名单：{args.players}人（女生 {females}人）")
+    else:
+        from schedule_api import normalize_signup
+        with open(args.signup, "r", encoding="utf-8") as f:
+            roster = normalize_signup(f.read())
+        print(f"报名：{len(roster[0]) + len(roster[1])}人（女生 {len(roster[1])}人）")
+    model = load_duration_model(args.db)
+    booking_minutes = args.hours * 60
+    print(f"预订 {args.hours:g} 小时（每片场地约 {booking_rounds(booking_minutes, model)} 场），"
+          f"每种场地数模拟 {args.sessions} 次（{args.schedules} 个排阵）")
+    print(f"达标：每人在预订时间内打满 {TARGET_GAMES} 场（固定场次或最大场次更少的球员按其上限）\n")
+
+    results = []
+    print(f"{'场地':>4}{'平均场次':>10}{'P10场次':>9}{'人人达标':>8}"
+          f"{'时长P50':>9}{'时长P90':>9}{'超时':>7}")
+    for court_count in args.courts:
+        r = simulate_capacity(roster, court_count, booking_minutes, args.sessions, args.schedules,
+                              mode=args.mode, model=model, workers=args.workers)
+        results.append(r)
+        print(f"{court_count:>4}{r['mean_games']:>10.2f}{r['p10_games']:>9}{r['p_target']:>10.0%}"
+              f"{r['length_p50'] / 60:>8.0f}m{r['length_p90'] / 60:>8.0f}m{r['p_overtime']:>7.0%}")
+
+    best = recommend_courts(results)
+    print(f"\n建议：{best}片场地（80% 以上的活动人人达标）" if best
+          else f"\n建议：以上场地数都难以保证人人达标，考虑增加场地或延长时间")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
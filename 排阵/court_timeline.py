@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Court Timeline
+Match duration estimates learned from the score archive, and an event-driven
+simulation of a session: lockstep rounds vs a staggered court timeline.
+
+A match lasts roughly ``MATCH_CHANGEOVER`` (上下场、热身) plus the rallies played,
+and the archive records every rally in the scores (两局 15 分制：15:5 远比 19:15
+结束得早). DurationModel learns the mean points per match type and a per-player
+factor (players whose games run long compared with other games of the same
+type), shrunk toward 1 for players with few archived games.
+
+Simulations:
+- 同步轮次 (lockstep)：一轮所有场地都打完才开始下一轮，每轮时长 = 最长的一场
+- 错峰 (staggered)：场地一空出，就在 4 名球员都已下场的比赛中挑一场开始
+  （只在接下来的 court_count × 2 场中挑选，保持轮次的大致先后）；可开的比赛
+  不止一场时，按期望时长推演之后的 court_count × 4 场，选推演最早结束的一场
+
+Both are driven by a heap of court-free events: lockstep simulates in
+O(matches · log courts), staggered in O(matches · window³) for the look-ahead
+play-outs (a few milliseconds for an evening's schedule). Comparing games per
+hour, session length and court idle time shows what staggering buys for a
+given schedule.
+
+Usage:
+    python court_timeline.py                          # 读取 对阵表.xlsx，比较两种方式
+    python court_timeline.py --input 对阵表.xlsx --start 19:00 --samples 500
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# data.db 的位置与表结构由项目根目录的 db.py 定义
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+SECONDS_PER_POINT = 24         # 每分（回合 + 间歇）的平均用时
+MATCH_CHANGEOVER = 120         # 每场比赛的上下场与热身时间（秒）
+DEFAULT_MATCH_POINTS = 48      # 没有历史数据时每场比赛的总分（两局 15 分制）
+DEFAULT_POINTS_STD = 6.0       # 没有历史数据时总分的标准差
+PLAYER_PRIOR_GAMES = 5         # 球员系数向 1 收缩的先验场次（历史场次少时不过度拟合）
+MIN_POINTS_RATIO = 0.5         # 抽样时总分不低于均值的比例
+
+
+def base_type(match_type: str) -> str:
+    """"混双 (男代)" / "混双 A组" -> "混双"."""
+    return match_type.split(" ")[0]
+
+
+class DurationModel:
+    """Expected and sampled match durations (seconds) from archived points per match."""
+
+    def __init__(self, type_points: Dict[str, Tuple[float, float]], player_factor: Dict[str, float],
+                 default_points: float = DEFAULT_MATCH_POINTS, default_std: float = DEFAULT_POINTS_STD):
+        self.type_points = type_points          # {类型: (平均总分, 标准差)}
+        self.player_factor = player_factor      # {球员: 相对同类型平均的总分系数}
+        self.default_points = default_points
+        self.default_std = default_std
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Sequence[str], Sequence[str], int]]) -> "DurationModel":
+        """Learn from archived matches [(match_type, team_a, team_b, total_points)]."""
+        by_type: Dict[str, List[int]] = {}
+        played: List[Tuple[str, List[str], int]] = []
+        for match_type, team_a, team_b, points in records:
+            if points <= 0:
+                continue  # 未录入比分的比赛
+            match_type = base_type(match_type)
+            by_type.setdefault(match_type, []).append(points)
+            played.append((match_type, list(team_a) + list(team_b), points))
+
+        all_points = [p for values in by_type.values() for p in values]
+        if not all_points:
+            return cls({}, {})
+        overall = sum(all_points) / len(all_points)
+        type_points = {}
+        for match_type, values in by_type.items():
+            mean = sum(values) / len(values)
+            var = sum((v - mean) ** 2 for v in values) / max(1, len(values) - 1)
+            type_points[match_type] = (mean, var ** 0.5 if len(values) > 1 else DEFAULT_POINTS_STD)
+        # 每场比赛相对同类型平均的比值：expected_points 再乘类型均值，类型差异不会算两次
+        by_player: Dict[str, List[float]] = {}
+        for match_type, players, points in played:
+            ratio = points / type_points[match_type][0]
+            for p in players:
+                by_player.setdefault(p, []).append(ratio)
+        # 收缩估计：(球员比值之和 + 先验场次 × 1) / (场次 + 先验场次)
+        player_factor = {p: (sum(values) + PLAYER_PRIOR_GAMES) / (len(values) + PLAYER_PRIOR_GAMES)
+                         for p, values in by_player.items()}
+        return cls(type_points, player_factor, overall)
+
+    def expected_points(self, match: Dict) -> Tuple[float, float]:
+        mean, std = self.type_points.get(base_type(match["type"]), (self.default_points, self.default_std))
+        players = [p for pair in match["match"] for p in pair]
+        factor = sum(self.player_factor.get(p, 1.0) for p in players) / len(players)
+        return mean * factor, std * factor
+
+    def estimate(self, match: Dict) -> float:
+        """Expected duration of ``match`` in seconds."""
+        points, _ = self.expected_points(match)
+        return MATCH_CHANGEOVER + points * SECONDS_PER_POINT
+
+    def sample(self, match: Dict, rng: random.Random) -> float:
+        """One random duration of ``match`` in seconds (normal around the expected points)."""
+        points, std = self.expected_points(match)
+        return self.duration(rng.gauss(points, std), points)
+
+    @staticmethod
+    def duration(points: float, expected: float) -> float:
+        """Seconds for a sampled total of ``points`` (not below MIN_POINTS_RATIO of ``expected``)."""
+        return MATCH_CHANGEOVER + max(expected * MIN_POINTS_RATIO, points) * SECONDS_PER_POINT
+
+
+def load_duration_model(db_path: Optional[str] = None) -> DurationModel:
+    """Duration model from the archive; defaults only when there is no database."""
+    if db_path is None:
+        from db import DB_PATH
+        db_path = DB_PATH
+    if not os.path.exists(db_path):
+        return DurationModel({}, {})
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("""
+                SELECT match_type, team_a, team_b, score_a1 + score_b1 + score_a2 + score_b2
+                FROM matches
+            """).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return DurationModel({}, {})
+    return DurationModel.from_records(
+        (match_type, [p for p in team_a.split(",") if p], [p for p in team_b.split(",") if p], points)
+        for match_type, team_a, team_b, points in rows
+    )
+
+
+def _play_order(matches: List[Dict]) -> List[int]:
+    return sorted(range(len(matches)), key=lambda i: (matches[i]["round"], matches[i]["court"]))
+
+
+def _summary(timeline: List[Dict], court_count: int) -> Dict:
+    length = max((m["end"] for m in timeline), default=0.0)
+    busy = sum(m["end"] - m["start"] for m in timeline)
+    return {
+        "timeline": timeline,
+        "length": length,
+        "games_per_hour": len(timeline) / (length / 3600) if length else 0.0,
+        "idle": court_count * length - busy,
+        "utilization": busy / (court_count * length) if length else 0.0,
+    }
+
+
+def simulate_lockstep(matches: List[Dict], durations: Sequence[float], court_count: int,
+                      estimates: Optional[Sequence[float]] = None) -> Dict:
+    """Rounds start together: each round lasts as long as its longest match (``estimates`` is not needed)."""
+    timeline = []
+    clock = 0.0
+    rounds: Dict[int, List[int]] = {}
+    for i in _play_order(matches):
+        rounds.setdefault(matches[i]["round"], []).append(i)
+    for round_num in sorted(rounds):
+        for i in rounds[round_num]:
+            timeline.append(dict(matches[i], start=clock, end=clock + durations[i]))
+        clock += max(durations[i] for i in rounds[round_num])
+    return _summary(timeline, court_count)
+
+
+def _playout_length(players: List[List[str]], pending: List[int], player_free: Dict[str, float],
+                    courts: List[Tuple[float, int]], estimates: Sequence[float], lookahead: int) -> float:
+    """
+    Play the next ``lookahead × 2`` pending matches in schedule order (first ready match in the window) with
+    ``estimates``; returns when the last court frees up.
+    """
+    pending = pending[:lookahead * 2]
+    player_free = dict(player_free)
+    courts = list(courts)
+    heapq.heapify(courts)
+    while pending:
+        now, court = heapq.heappop(courts)
+        ready_at = [max(player_free.get(p, 0.0) for p in players[i]) for i in pending[:lookahead]]
+        pick = next((k for k, t in enumerate(ready_at) if t <= now), None)
+        if pick is None:
+            heapq.heappush(courts, (min(ready_at), court))
+            continue
+        i = pending.pop(pick)
+        end = now + estimates[i]
+        for p in players[i]:
+            player_free[p] = end
+        heapq.heappush(courts, (end, court))
+    return max(t for t, _ in courts)
+
+
+def simulate_staggered(matches: List[Dict], durations: Sequence[float], court_count: int,
+                       lookahead: Optional[int] = None, estimates: Optional[Sequence[float]] = None) -> Dict:
+    """
+    Court timeline: whenever a court frees up, start a pending match (in the window) whose players are all off court.
+
+    With several ready matches, each one is tried first and the next matches are played out in schedule order
+    with the expected durations; the match whose play-out finishes earliest starts (ties keep the schedule order).
+
+    Args:
+        lookahead: 每次只在排阵顺序的前 N 场中挑选（默认 court_count × 2）
+        estimates: 挑选时使用的期望时长（默认即 durations；抽样模拟时传入期望值，避免"预知"抽样结果）
+    """
+    lookahead = lookahead or court_count * 2
+    estimates = durations if estimates is None else estimates
+    pending = _play_order(matches)
+    players = [[p for pair in m["match"] for p in pair] for m in matches]
+    player_free: Dict[str, float] = {}
+    courts = [(0.0, c) for c in range(1, court_count + 1)]
+    heapq.heapify(courts)
+    timeline = []
+    while pending:
+        now, court = heapq.heappop(courts)
+        window = pending[:lookahead]
+        ready_at = [max(player_free.get(p, 0.0) for p in players[i]) for i in window]
+        ready = [k for k, t in enumerate(ready_at) if t <= now]
+        if not ready:
+            # 窗口内的比赛都有球员还在场上：场地等到最早有人下场
+            heapq.heappush(courts, (min(ready_at), court))
+            continue
+        pick = ready[0]
+        if len(ready) > 1:
+            # 逐个试开每场可开的比赛，之后的比赛按排阵顺序推演（期望时长），选推演最早结束的
+            best = None
+            for k in ready:
+                i = window[k]
+                trial_free = dict(player_free, **{p: now + estimates[i] for p in players[i]})
+                length = _playout_length(players, pending[:k] + pending[k + 1:], trial_free,
+                                         courts + [(now + estimates[i], court)], estimates, lookahead)
+                if best is None or length < best - 1e-9:
+                    best, pick = length, k
+        i = pending.pop(pick)
+        end = now + durations[i]
+        for p in players[i]:
+            player_free[p] = end
+        timeline.append(dict(matches[i], court=court, start=now, end=end))
+        heapq.heappush(courts, (end, court))
+    return _summary(timeline, court_count)
+
+
+def compare_modes(matches: List[Dict], court_count: int, model: DurationModel,
+                  samples: int = 0, seed: int = 0) -> Dict[str, Dict]:
+    """
+    Lockstep vs staggered with expected durations, or averaged over ``samples`` random draws.
+
+    Returns:
+        {"lockstep": {...}, "staggered": {...}}，各含 length / games_per_hour / idle / utilization
+        （抽样时为平均值，timeline 为期望时长下的时间线）
+    """
+    expected = [model.estimate(m) for m in matches]
+    result = {"lockstep": simulate_lockstep(matches, expected, court_count),
+              "staggered": simulate_staggered(matches, expected, court_count)}
+    if samples > 0:
+        rng = random.Random(seed)
+        totals = {mode: {"length": 0.0, "games_per_hour": 0.0, "idle": 0.0, "utilization": 0.0}
+                  for mode in result}
+        for _ in range(samples):
+            durations = [model.sample(m, rng) for m in matches]
+            for mode, simulate in (("lockstep", simulate_lockstep), ("staggered", simulate_staggered)):
+                run = simulate(matches, durations, court_count, estimates=expected)
+                for key in totals[mode]:
+                    totals[mode][key] += run[key]
+        for mode in result:
+            result[mode].update({key: value / samples for key, value in totals[mode].items()})
+    return result
+
+
+def format_clock(seconds: float, start_minutes: int) -> str:
+    minutes = start_minutes + int(round(seconds / 60))
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+def parse_clock(text: str) -> int:
+    """"19:00" -> minutes after midnight."""
+    hour, minute = (int(x) for x in text.split(":"))
+    return hour * 60 + minute
+
+
+def timeline_schedule(matches: List[Dict], court_count: int, model: DurationModel, start_minutes: int) -> List[Dict]:
+    """
+    The staggered timeline with expected durations, for the 对阵表 export: matches in start order, on the
+    court the timeline uses, each with "start_time" (HH:MM).
+    """
+    expected = [model.estimate(m) for m in matches]
+    timeline = simulate_staggered(matches, expected, court_count)["timeline"]
+    return [dict(m, start_time=format_clock(m["start"], start_minutes))
+            for m in sorted(timeline, key=lambda m: (m["start"], m["court"]))]
+
+
+def main(argv: Optional[List[str]] = None):
+    from replan import load_schedule
+
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="羽毛球排阵 - 场地时间线（同步轮次 vs 错峰）")
+    parser.add_argument("--input", default=str(base_dir / "对阵表.xlsx"), help="对阵表")
+    parser.add_argument("--db", default=None, help="比分数据库（默认 data.db）")
+    parser.add_argument("--start", default="19:00", help="开始时间（默认 19:00）")
+    parser.add_argument("--samples", type=int, default=0, help="随机抽样比赛时长的次数（默认 0 = 只用期望时长）")
+    args = parser.parse_args(argv)
+
+    matches, court_count = load_schedule(args.input)
+    if not matches:
+        print(f"错误：{args.input} 中没有比赛")
+        return 1
+    model = load_duration_model(args.db)
+    start_minutes = parse_clock(args.start)
+
+    print(f"比赛：{len(matches)}场，场地：{court_count}个")
+    if model.type_points:
+        for match_type, (mean, std) in sorted(model.type_points.items()):
+            print(f"  - {match_type}：平均 {mean:.1f} 分 ± {std:.1f}，约 "
+                  f"{(MATCH_CHANGEOVER + mean * SECONDS_PER_POINT) / 60:.1f} 分钟")
+    else:
+        print(f"  - 没有历史比分，按每场 {DEFAULT_MATCH_POINTS} 分估计")
+
+    result = compare_modes(matches, court_count, model, args.samples)
+    staggered = result["staggered"]
+    print(f"\n错峰时间线:")
+    for m in sorted(staggered["timeline"], key=lambda m: (m["start"], m["court"])):
+        teams = " vs ".join("/".join(pair) for pair in m["match"])
+        print(f"  {format_clock(m['start'], start_minutes)}-{format_clock(m['end'], start_minutes)}"
+              f"  {m['court']}号场  {m['type']:<8} {teams}")
+
+    label = f"（{args.samples} 次抽样平均）" if args.samples else "（期望时长）"
+    print(f"\n对比{label}:")
+    for mode, name in (("lockstep", "同步轮次"), ("staggered", "错峰")):
+        r = result[mode]
+        print(f"  {name}：总时长 {r['length'] / 60:.0f} 分钟，每小时 {r['games_per_hour']:.1f} 场，"
+              f"场地利用率 {r['utilization']:.0%}，空闲 {r['idle'] / 60:.0f} 场地·分钟")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
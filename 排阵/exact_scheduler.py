@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Exact / Anytime Backend
+Branch-and-bound search over the same constraints as select_balanced_matches:
+one appearance per round, MAX_GAMES_INTERNAL / MAX_GAMES_GUEST, PLAYER_CONSTRAINTS
+and the per-type targets. It minimizes lineup_scheduler.schedule_objective and
+returns the optimal-or-best-found schedule within a time budget.
+
+Search strategy:
+- Each round heapifies the unused matches whose players are below their game
+  cap by a greedy heuristic and pops them in rank order only as the search
+  reaches them; conflicts inside the round are checked against a bitmask of
+  the round's players. Each court tries at most BRANCH_LIMIT matches.
+- Children are ordered by a greedy heuristic and explored with limited
+  discrepancy search (LDS), so good schedules appear early and the search
+  keeps improving until the deadline.
+- Each node is pruned with a lower bound on the objective. The per-player
+  part of the bound is computed once per round and updated in O(1) per
+  placed match. If one LDS iteration finishes without hitting its
+  discrepancy limit and no court was cut off at BRANCH_LIMIT, the
+  whole tree has been covered and the result is proven optimal.
+
+Proofs are practical only for small sessions (about ten players, one or two
+courts). On a full signup the backend is an anytime improver of the greedy
+incumbent and normally stops at the time budget.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+from lineup_scheduler import (
+    generate_mixed_doubles_matches, generate_mens_doubles_matches, generate_womens_doubles_matches,
+    get_fixed_games_for_player, get_match_players, get_max_games_for_player,
+    get_type_targets, is_guest_player, schedule_objective,
+)
+from match_index import MatchIndex
+from roster import ROSTER
+
+
+# 比赛池与类型名称映射
+POOL_TYPES = {"mixed": "混双", "mens": "男双", "womens": "女双"}
+
+# 默认搜索时限（秒）
+DEFAULT_TIME_BUDGET = 10.0
+# 每片场地最多尝试的候选比赛数（分支上限）
+DEFAULT_BRANCH_LIMIT = 24
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the deadline passes."""
+
+
+class _RoundRanking:
+    """A round's candidates in rank order, popped from a heap only as far as the search reads."""
+
+    def __init__(self, heap: List[Tuple[int, int]]):
+        heapq.heapify(heap)
+        self.heap = heap
+        self.ranked: List[int] = []
+
+    def extend(self, count: int = 32) -> bool:
+        """Pop up to ``count`` more candidates into ``ranked``; False when none are left."""
+        heap = self.heap
+        if not heap:
+            return False
+        pop = heapq.heappop
+        self.ranked.extend(pop(heap)[1] for _ in range(min(count, len(heap))))
+        return True
+
+
+class ExactLineupScheduler:
+    """
+    Anytime branch-and-bound lineup scheduler.
+
+    Usage:
+        solver = ExactLineupScheduler(males, females, total_matches, court_count, time_budget=10)
+        matches, score, optimal = solver.solve(initial=greedy_matches)
+    """
+
+    def __init__(self, males: List[str], females: List[str], total_matches: int,
+                 court_count: int, time_budget: float = DEFAULT_TIME_BUDGET,
+                 branch_limit: int = DEFAULT_BRANCH_LIMIT):
+        self.males = males
+        self.females = females
+        self.players = males + females
+        self.total_matches = total_matches
+        self.court_count = court_count
+        self.time_budget = time_budget
+        self.branch_limit = branch_limit
+
+        total_rounds = (total_matches + court_count - 1) // court_count
+        self.round_sizes = [court_count] * total_rounds
+        if total_rounds and total_matches % court_count:
+            self.round_sizes[-1] = total_matches % court_count
+
+        # 只打女双的球员不进入混双/男双池（女双人数不足 4 人时例外）
+        can_play_womens_doubles = len([p for p in self.players if ROSTER.is_female(p)]) >= 4
+        only_womens = set()
+        if can_play_womens_doubles:
+            only_womens = {p for p in self.players if ROSTER.is_only_womens_doubles(p)}
+
+        def allowed(pool):
+            return [m for m in pool if not (get_match_players(m) & only_womens)]
+
+        self.index = MatchIndex(self.players)
+        self.index.add_pool("mixed", allowed(generate_mixed_doubles_matches(males, females)))
+        self.index.add_pool("mens", allowed(generate_mens_doubles_matches(males)))
+        self.index.add_pool("womens", generate_womens_doubles_matches(females))
+        self.match_types = [POOL_TYPES[pool] for pool in self.index.pool_of]
+
+        n = len(self.players)
+        self.fixed = [get_fixed_games_for_player(p, total_matches, n) for p in self.players]
+        self.caps = []
+        for pid, p in enumerate(self.players):
+            cap = get_max_games_for_player(p)
+            if self.fixed[pid] is not None:
+                cap = min(cap, self.fixed[pid])
+            self.caps.append(cap)
+        self.free_ids = [pid for pid in range(n) if self.fixed[pid] is None]
+        self.guests = [1 if is_guest_player(p) else 0 for p in self.players]
+        self.targets = get_type_targets(total_matches, len(females))
+
+        # 每场比赛的球员位图：同一轮内的冲突用位运算判断
+        self.masks = [sum(1 << pid for pid in ids) for ids in self.index.members]
+        self.used = bytearray(len(self.masks))
+
+        # 搜索状态
+        self.games = [0] * n
+        self.streak = [0] * n
+        self.longest = [0] * n
+        self.capped = 0  # 已达到场次上限的球员位图
+        self.type_counts = {t: 0 for t in self.targets}
+        self.missing = 0
+        self.rounds: List[List[int]] = []
+
+        self.best_score = float("inf")
+        self.best_matches: List[Dict] = []
+        self.nodes = 0
+        self._deadline = 0.0
+        self._truncated = False
+        self._capped_branching = False
+
+    # ------------------------------------------------------------------
+    # State updates
+
+    def _place(self, idx: int):
+        self.used[idx] = 1
+        self.type_counts[self.match_types[idx]] += 1
+        for pid in self.index.members[idx]:
+            self.games[pid] += 1
+            if self.games[pid] == self.caps[pid]:
+                self.capped |= 1 << pid
+
+    def _unplace(self, idx: int):
+        for pid in self.index.members[idx]:
+            if self.games[pid] == self.caps[pid]:
+                self.capped &= ~(1 << pid)
+            self.games[pid] -= 1
+        self.type_counts[self.match_types[idx]] -= 1
+        self.used[idx] = 0
+
+    def _close_round(self, round_mask: int):
+        """Update bye streaks at the end of a round; returns undo info."""
+        if not round_mask:
+            return None
+        saved = (self.streak[:], self.longest[:])
+        for pid in range(len(self.players)):
+            if round_mask >> pid & 1:
+                self.streak[pid] = 0
+            else:
+                self.streak[pid] += 1
+                if self.streak[pid] > self.longest[pid]:
+                    self.longest[pid] = self.streak[pid]
+        return saved
+
+    # ------------------------------------------------------------------
+    # Bounds and heuristics
+
+    def _round_bound(self, round_idx: int, slots_left: int) -> Tuple[float, int, int, int]:
+        """
+        Parts of the lower bound fixed at the start of ``round_idx``.
+
+        Every player can still add at most ``extra = min(剩余上限, 剩余轮数)`` games.
+        Placing a match in the round lowers ``extra`` of its four players by one
+        and leaves ``games + extra`` unchanged, so inside the round only the total
+        capacity and the highest game count move; ``_lower_bound`` updates them in O(1).
+
+        Returns:
+            (与本轮选择无关的下界部分, 剩余可用人次, 非固定场次球员的最高可达场次, 最高已打场次)
+        """
+        rounds_left = len(self.round_sizes) - round_idx
+        capacity = shortfall = 0
+        for pid, fixed_games in enumerate(self.fixed):
+            extra = min(self.caps[pid] - self.games[pid], rounds_left)
+            capacity += extra
+            if fixed_games is not None:
+                shortfall += max(0, fixed_games - self.games[pid] - extra)
+        base = shortfall * 100 + self.missing * 20
+
+        high = low = 0
+        if self.free_ids:
+            base += sum(max(0, self.longest[pid] - 1) for pid in self.free_ids) * 5
+            high = min(self.games[pid] + min(self.caps[pid] - self.games[pid], rounds_left)
+                       for pid in self.free_ids)
+            low = max(self.games[pid] for pid in self.free_ids)
+        return base, capacity, high, low
+
+    def _lower_bound(self, base: float, capacity: int, high: int, low: int, slots_left: int) -> float:
+        """Admissible lower bound on schedule_objective for any completion."""
+        # 剩余可用人次不足以填满剩余场地时，缺少的比赛无法避免
+        bound = base + max(0, slots_left - capacity // 4) * 20
+
+        excess = deficit = 0
+        for t, target in self.targets.items():
+            if self.type_counts[t] > target:
+                excess += self.type_counts[t] - target
+            else:
+                deficit += target - self.type_counts[t]
+        bound += (excess + max(0, deficit - slots_left)) * 2
+
+        # 任意两名球员最终场次差 d 时，方差至少为 d²/(2n)
+        if low > high:
+            bound += (low - high) ** 2 / (2 * len(self.free_ids)) * 10
+        return bound
+
+    def _rank_round_candidates(self) -> _RoundRanking:
+        """All valid matches at the start of a round, most promising first."""
+        # 场次少、已连续轮空、固定场次未完成的球员优先；外援略靠后
+        player_key = [10 * g + self.guests[pid] - 40 * self.streak[pid]
+                      - (30 * (self.fixed[pid] - g) if self.fixed[pid] is not None else 0)
+                      for pid, g in enumerate(self.games)]
+        # 未达到目标的比赛类型优先
+        type_key = {t: (-15 * (target - self.type_counts[t]) if self.type_counts[t] < target
+                        else 25 * (self.type_counts[t] - target + 1))
+                    for t, target in self.targets.items()}
+        capped = self.capped
+        used = self.used
+        members = self.index.members
+        match_types = self.match_types
+        heap = []
+        for idx, mask in enumerate(self.masks):
+            if used[idx] or mask & capped:
+                continue
+            a, b, c, d = members[idx]
+            heap.append((player_key[a] + player_key[b] + player_key[c] + player_key[d]
+                         + type_key[match_types[idx]], idx))
+        return _RoundRanking(heap)
+
+    # ------------------------------------------------------------------
+    # Search
+
+    def _record(self):
+        matches = []
+        for round_idx, round_matches in enumerate(r for r in self.rounds if r):
+            for court_idx, idx in enumerate(round_matches):
+                matches.append({
+                    "type": self.match_types[idx],
+                    "match": self.index.matches[idx],
+                    "fallback": False,
+                    "court": court_idx + 1,
+                    "round": round_idx + 1,
+                })
+        score = schedule_objective(matches, self.total_matches, self.players, self.females)
+        if score < self.best_score:
+            self.best_score = score
+            self.best_matches = matches
+
+    def _search(self, round_idx: int, round_mask: int, slots_left: int, discrepancies: int,
+                ranked: _RoundRanking, pos: int, bound: Tuple[float, int, int, int]):
+        """
+        Fill the next court of ``round_idx``.
+
+        ``ranked`` is the round's candidate order and ``pos`` the rank of the
+        previous pick; later courts only take candidates ranked after it, so
+        each set of matches for a round is generated exactly once.
+        ``round_mask`` holds the players already on court this round and
+        ``bound`` the round's incremental bound state (see ``_round_bound``).
+        """
+        self.nodes += 1
+        if self.nodes & 15 == 0 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout
+
+        if self._lower_bound(*bound, slots_left) >= self.best_score:
+            return
+
+        current = self.rounds[round_idx]
+        if len(current) == self.round_sizes[round_idx]:
+            self._next_round(round_idx, round_mask, slots_left, discrepancies)
+            return
+
+        base, capacity, high, low = bound
+        masks = self.masks
+        rank = 0
+        order = ranked.ranked
+        p = pos
+        while True:
+            p += 1
+            if p == len(order) and not ranked.extend():
+                break
+            idx = order[p]
+            if masks[idx] & round_mask:
+                continue
+            if rank > discrepancies:
+                self._truncated = True
+                return
+            if rank == self.branch_limit:
+                self._capped_branching = True
+                break
+            self._place(idx)
+            current.append(idx)
+            try:
+                placed_low = max([low] + [self.games[pid] for pid in self.index.members[idx]
+                                          if self.fixed[pid] is None])
+                self._search(round_idx, round_mask | masks[idx], slots_left - 1, discrepancies - rank,
+                             ranked, p, (base, capacity - 4, high, placed_low))
+            finally:
+                current.pop()
+                self._unplace(idx)
+            rank += 1
+
+        # 最后的选择：本轮剩余场地空置（计入比赛数不足）
+        if rank > discrepancies:
+            self._truncated = True
+            return
+        empty = self.round_sizes[round_idx] - len(current)
+        self.missing += empty
+        try:
+            self._next_round(round_idx, round_mask, slots_left - empty, discrepancies - rank)
+        finally:
+            self.missing -= empty
+
+    def _next_round(self, round_idx: int, round_mask: int, slots_left: int, discrepancies: int):
+        saved = self._close_round(round_mask)
+        self.rounds.append([])
+        try:
+            if round_idx + 1 == len(self.round_sizes):
+                self._record()
+            else:
+                self._search(round_idx + 1, 0, slots_left, discrepancies, self._rank_round_candidates(), -1,
+                             self._round_bound(round_idx + 1, slots_left))
+        finally:
+            self.rounds.pop()
+            if saved is not None:
+                self.streak, self.longest = saved
+
+    def solve(self, initial: Optional[List[Dict]] = None) -> Tuple[List[Dict], float, bool]:
+        """
+        Search for the schedule with the lowest objective.
+
+        Args:
+            initial: Optional incumbent schedule (e.g. from select_balanced_matches)
+
+        Returns:
+            (matches, objective, proven_optimal)
+        """
+        if initial:
+            self.best_score = schedule_objective(initial, self.total_matches, self.players, self.females)
+            self.best_matches = initial
+
+        self._deadline = time.perf_counter() + self.time_budget
+        optimal = False
+        discrepancies = 0
+        try:
+            while True:
+                self._truncated = False
+                self.rounds = [[]]
+                self._search(0, 0, self.total_matches, discrepancies, self._rank_round_candidates(), -1,
+                             self._round_bound(0, self.total_matches))
+                if not self._truncated:
+                    # 没有候选被分支上限截掉时，整棵树已搜索完毕
+                    optimal = not self._capped_branching
+                    break
+                discrepancies += 1
+        except _SearchTimeout:
+            pass
+
+        return self.best_matches, self.best_score, optimal
+
+
+def solve_schedule(males: List[str], females: List[str], total_matches: int, court_count: int,
+                   time_budget: float = DEFAULT_TIME_BUDGET,
+                   initial: Optional[List[Dict]] = None,
+                   branch_limit: int = DEFAULT_BRANCH_LIMIT) -> Tuple[List[Dict], float, bool]:
+    """Convenience wrapper around ExactLineupScheduler.solve."""
+    solver = ExactLineupScheduler(males, females, total_matches, court_count, time_budget, branch_limit)
+    return solver.solve(initial)
@@ -6,43 +6,20 @@ Supports both traditional and LLM-based schedulers.
 """
 
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from typing import List, Dict, Optional, Tuple
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
+from typing import Iterable, List, Dict, Optional, Tuple
 import re
 
+from schedule_metrics import ScheduleMatrices
+# Player definitions (shared across modules, re-exported for existing imports)
+from roster import (
+    ROSTER, INTERNAL_MALE_PLAYERS, GUEST_MALE_PLAYERS, MALE_PLAYERS,
+    INTERNAL_FEMALE_PLAYERS, GUEST_FEMALE_PLAYERS, FEMALE_PLAYERS,
+    MIXED_DOUBLES_MALES, PLAYER_CONSTRAINTS, FIXED_PARTNERS,
+)
 
-# Player definitions (shared across modules)
-INTERNAL_MALE_PLAYERS = [
-    "苏大哲", "罗蒙", "江锐", "严勇文", "陈顺星", "陈小洪",
-    "卢志辉", "林锋", "王小波", "刘继宇", "董广博", "林琪琛", "罗琴荩"
-]
-
-GUEST_MALE_PLAYERS = [
-    "张欣欣", "黄冬青", "程建兴", "陈宇霆", "卢子龙", "吴煜"
-]
-
-MALE_PLAYERS = INTERNAL_MALE_PLAYERS + GUEST_MALE_PLAYERS
-
-INTERNAL_FEMALE_PLAYERS = [
-    "田茜", "唐英武", "李祺祺", "高洁", "滕菲", "谢卓珊", "崔倩男", "林小连"
-]
-
-GUEST_FEMALE_PLAYERS = [
-    "张燕红", "李杏芝", "项小英"
-]
-
-FEMALE_PLAYERS = INTERNAL_FEMALE_PLAYERS + GUEST_FEMALE_PLAYERS
-
-# Mixed doubles eligible male players (internal only)
-MIXED_DOUBLES_MALES = {"林锋", "王小波", "陈顺星", "罗琴荩", "罗蒙"}
-
-# Player-specific constraints
-# fixed_games: None = 自动根据场地紧张程度计算，整数 = 固定场次
-PLAYER_CONSTRAINTS = {
-    "严勇文": {"fixed_games": None, "early_departure": True},
-    "崔倩男": {"fixed_games": None, "early_departure": True},
-    "林小连": {"only_womens_doubles": True},
-}
 
 # 场地紧张程度阈值（球员平均比赛场次）
 # 当球员平均比赛场次 >= 此值时，场地算充裕；否则算紧张
@@ -54,10 +31,6 @@ EARLY_DEPARTURE_GAMES = {
     "tight": 4,     # 场地紧张时的场次
 }
 
-# Fixed partner pairs
-FIXED_PARTNERS = {
-}
-
 # Global config
 MATCHES_PER_COURT = 8
 MAX_GAMES_INTERNAL = 7
@@ -80,7 +53,7 @@ def get_max_games_for_player(player: str, court_count: int, total_players: int)
         return MAX_GAMES_INTERNAL  # Same as internal players
 
     # If courts are limited, apply guest restriction
-    if player in GUEST_MALE_PLAYERS or player in GUEST_FEMALE_PLAYERS:
+    if ROSTER.is_guest(player):
         return MAX_GAMES_GUEST
 
     return MAX_GAMES_INTERNAL
@@ -164,6 +137,143 @@ def parse_activity_date(signup_text: str) -> str:
     return ""  # No date found
 
 
+LINEUP_HEADERS = ["轮次", "场地", "类型", "对阵 A", "比分 A", "比分 B", "对阵 B"]
+LINEUP_COLUMN_WIDTHS = [7, 9, 9, 22, 12, 12, 22]
+START_TIME_HEADER = "预计开始"
+START_TIME_COLUMN_WIDTH = 10
+STATS_HEADERS = ["姓名", "总场次", "男双", "女双", "混双"]
+STATS_COLUMN_WIDTHS = [12, 10, 10, 10, 10]
+
+
+def lineup_named_styles() -> List[NamedStyle]:
+    """
+    Named styles of the lineup workbook.
+
+    Registered once per workbook and referenced by name when a cell is written,
+    so the export never walks the sheet again to set fonts and borders.
+    """
+    def style(name, size, bold=False, wrap=True, border=True, fill=False):
+        named = NamedStyle(name=name)
+        named.font = Font(name="微软雅黑", size=size, bold=bold)
+        named.alignment = Alignment(horizontal="center", vertical="center", wrap_text=wrap)
+        if border:
+            thin = Side(style="thin")
+            named.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        if fill:
+            named.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        return named
+
+    return [
+        style("lineup_title", 18, bold=True),
+        style("lineup_config", 10, border=False),
+        style("lineup_header", 11, bold=True, fill=True),
+        style("lineup_cell", 10),
+        style("stats_title", 14, bold=True, wrap=False),
+        style("stats_header", 11, bold=True, wrap=False, fill=True),
+        style("stats_cell", 10, wrap=False),
+    ]
+
+
+class LineupWorkbook:
+    """
+    Write-only (streaming) lineup workbook.
+
+    Rows are written once, in order, with their named style attached, so memory
+    stays flat no matter how many matches or sheets are exported. Row heights use
+    the sheet default instead of one row dimension per row.
+    """
+
+    def __init__(self, row_height: float = 32):
+        self.wb = openpyxl.Workbook(write_only=True)
+        for named in lineup_named_styles():
+            self.wb.add_named_style(named)
+        self.row_height = row_height
+
+    def _sheet(self, title: str, widths: List[float], merge: str):
+        ws = self.wb.create_sheet(title=title)
+        # 写入模式下列宽、合并单元格和页面设置都必须在写入数据行之前设置
+        for col, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        ws.merged_cells.add(merge)
+        return ws
+
+    def _row(self, ws, values, style: str) -> List[WriteOnlyCell]:
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
+
+    def add_lineup_sheet(self, matches: Iterable[Dict], title: str, config_line: str, sheet_title: str = "对阵表",
+                         show_start: bool = False):
+        """
+        One 对阵表 sheet; ``matches`` may be any iterable (e.g. a generator), it is consumed once.
+
+        With ``show_start`` a last column 预计开始 shows each match's "start_time" (see court_timeline.timeline_schedule).
+        """
+        headers = LINEUP_HEADERS + [START_TIME_HEADER] if show_start else LINEUP_HEADERS
+        widths = LINEUP_COLUMN_WIDTHS + [START_TIME_COLUMN_WIDTH] if show_start else LINEUP_COLUMN_WIDTHS
+        last_column = get_column_letter(len(headers))
+        ws = self._sheet(sheet_title, widths, f"A1:{last_column}1")
+        ws.merged_cells.add(f"A2:{last_column}2")
+        ws.sheet_format.defaultRowHeight = self.row_height
+        ws.sheet_format.customHeight = True
+
+        # Page setup for A4 landscape printing
+        ws.page_setup.paperSize = 9
+        ws.page_setup.orientation = "landscape"
+        ws.page_margins.left = 0.3
+        ws.page_margins.right = 0.3
+        ws.page_margins.top = 0.5
+        ws.page_margins.bottom = 0.5
+
+        ws.append(self._row(ws, [title], "lineup_title"))
+        ws.append(self._row(ws, [config_line], "lineup_config"))
+        ws.append(self._row(ws, headers, "lineup_header"))
+        for match_info in matches:
+            match = match_info["match"]
+            row = [
+                match_info.get("round", 1),
+                f"{match_info['court']}号",
+                match_info["type"],
+                "/".join(match[0]),
+                "",
+                "",
+                "/".join(match[1]),
+            ]
+            if show_start:
+                row.append(match_info.get("start_time", ""))
+            ws.append(self._row(ws, row, "lineup_cell"))
+        return ws
+
+    def add_stats_sheet(self, player_stats: Dict, sheet_title: str = "球员统计"):
+        """Per-player game counts, males first, then females."""
+        ws = self._sheet(sheet_title, STATS_COLUMN_WIDTHS, "A1:E1")
+        ws.append(self._row(ws, ["球员参赛场次统计"], "stats_title"))
+        ws.append(self._row(ws, STATS_HEADERS, "stats_header"))
+        male_players = [p for p in player_stats.keys() if ROSTER.is_male(p)]
+        female_players = [p for p in player_stats.keys() if ROSTER.is_female(p)]
+        for player in sorted(male_players) + sorted(female_players):
+            stats = player_stats[player]
+            ws.append(self._row(ws, [player, stats["total"], stats.get("男双", 0), stats.get("女双", 0),
+                                     stats.get("混双", 0)], "stats_cell"))
+        return ws
+
+    def save(self, output_path: str):
+        self.wb.save(output_path)
+
+
+def lineup_title(title: str, activity_date: str = "") -> str:
+    date_suffix = f"（{activity_date}）" if activity_date else ""
+    return f"{title}{date_suffix}"
+
+
+def lineup_config_line(court_count: int, schedule_method: str = "") -> str:
+    method_info = f" | 排阵方式：{schedule_method}" if schedule_method else ""
+    return f"场地数：{court_count}个 | 时长：2 小时 | 赛制：15 分/局，2 局 | 项目：男双、女双、混双{method_info}"
+
+
 def create_lineup_excel(
     matches: List[Dict],
     court_count: int,
@@ -171,7 +281,9 @@ def create_lineup_excel(
     player_stats: Optional[Dict] = None,
     title: str = "科技球队日常训练活动 - 对阵表",
     schedule_method: str = "",
-    activity_date: str = ""
+    activity_date: str = "",
+    row_height: float = 32,
+    show_start: bool = False
 ):
     """
     Create Excel file with lineup schedule.
@@ -188,157 +300,49 @@ def create_lineup_excel(
         title: Custom title for the sheet
         schedule_method: Scheduling method description (e.g., "传统算法", "LLM 推理")
         activity_date: Activity date (e.g., "2026 年 03 月 23 日")
+        row_height: Row height of the lineup sheet
+        show_start: Add a 预计开始 column from each match's "start_time"
     """
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "对阵表"
-
-    # Style definitions
-    font_title = Font(name="微软雅黑", size=18, bold=True)
-    font_header = Font(name="微软雅黑", size=11, bold=True)
-    font_content = Font(name="微软雅黑", size=10)
-    alignment_center = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-    header_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-
-    # Title row with date
-    ws.merge_cells("A1:G1")
-    date_suffix = f"（{activity_date}）" if activity_date else ""
-    ws["A1"] = f"{title}{date_suffix}"
-    ws["A1"].font = font_title
-    ws["A1"].alignment = alignment_center
-    ws["A1"].border = border
-
-    # Config row
-    ws.merge_cells("A2:G2")
-    method_info = f" | 排阵方式：{schedule_method}" if schedule_method else ""
-    ws["A2"] = f"场地数：{court_count}个 | 时长：2 小时 | 赛制：15 分/局，2 局 | 项目：男双、女双、混双{method_info}"
-    ws["A2"].font = Font(name="微软雅黑", size=10)
-    ws["A2"].alignment = alignment_center
-
-    # Headers
-    headers = ["轮次", "场地", "类型", "对阵 A", "比分 A", "比分 B", "对阵 B"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = font_header
-        cell.alignment = alignment_center
-        cell.border = border
-        cell.fill = header_fill
-
-    # Match rows
-    for row_idx, match_info in enumerate(matches, 4):
-        match_type = match_info["type"]
-        match = match_info["match"]
-        court = match_info["court"]
-        round_num = match_info.get("round", 1)
-
-        ws.cell(row=row_idx, column=1, value=round_num).font = font_content
-        ws.cell(row=row_idx, column=2, value=f"{court}号").font = font_content
-        ws.cell(row=row_idx, column=3, value=match_type).font = font_content
-        ws.cell(row=row_idx, column=4, value="/".join(match[0])).font = font_content
-        ws.cell(row=row_idx, column=5, value="").font = font_content
-        ws.cell(row=row_idx, column=6, value="").font = font_content
-        ws.cell(row=row_idx, column=7, value="/".join(match[1])).font = font_content
-
-        for col in range(1, 8):
-            ws.cell(row=row_idx, column=col).alignment = alignment_center
-            ws.cell(row=row_idx, column=col).border = border
-
-    # Column widths
-    ws.column_dimensions["A"].width = 7
-    ws.column_dimensions["B"].width = 9
-    ws.column_dimensions["C"].width = 9
-    ws.column_dimensions["D"].width = 22
-    ws.column_dimensions["E"].width = 12
-    ws.column_dimensions["F"].width = 12
-    ws.column_dimensions["G"].width = 22
-
-    # Row heights
-    max_row = len(matches) + 3
-    for row in ws.iter_rows(min_row=1, max_row=max_row if max_row > 3 else 20):
-        ws.row_dimensions[row[0].row].height = 32
-
-    # Page setup for A4 landscape printing
-    ws.page_setup.paperSize = 9
-    ws.page_setup.orientation = "landscape"
-    ws.page_margins.left = 0.3
-    ws.page_margins.right = 0.3
-    ws.page_margins.top = 0.5
-    ws.page_margins.bottom = 0.5
-
-    # Player statistics sheet (optional)
+    workbook = LineupWorkbook(row_height)
+    workbook.add_lineup_sheet(matches, lineup_title(title, activity_date),
+                              lineup_config_line(court_count, schedule_method), show_start=show_start)
     if player_stats:
-        ws_stats = wb.create_sheet(title="球员统计")
-        font_title_stats = Font(name="微软雅黑", size=14, bold=True)
-        font_header_stats = Font(name="微软雅黑", size=11, bold=True)
-        font_content_stats = Font(name="微软雅黑", size=10)
-        alignment_center_stats = Alignment(horizontal="center", vertical="center")
-        border_stats = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin")
-        )
-        header_fill_stats = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-
-        ws_stats.merge_cells("A1:E1")
-        ws_stats["A1"] = "球员参赛场次统计"
-        ws_stats["A1"].font = font_title_stats
-        ws_stats["A1"].alignment = alignment_center_stats
-        ws_stats["A1"].border = border_stats
-
-        headers_stats = ["姓名", "总场次", "男双", "女双", "混双"]
-        for col, header in enumerate(headers_stats, 1):
-            cell = ws_stats.cell(row=2, column=col, value=header)
-            cell.font = font_header_stats
-            cell.alignment = alignment_center_stats
-            cell.border = border_stats
-            cell.fill = header_fill_stats
-
-        row = 3
-        # Sort players: males first, then females
-        male_players = [p for p in player_stats.keys() if p in MALE_PLAYERS]
-        female_players = [p for p in player_stats.keys() if p in FEMALE_PLAYERS]
-
-        for player in sorted(male_players):
-            stats = player_stats[player]
-            ws_stats.cell(row=row, column=1, value=player).font = font_content_stats
-            ws_stats.cell(row=row, column=2, value=stats["total"]).font = font_content_stats
-            ws_stats.cell(row=row, column=3, value=stats.get("男双", 0)).font = font_content_stats
-            ws_stats.cell(row=row, column=4, value=stats.get("女双", 0)).font = font_content_stats
-            ws_stats.cell(row=row, column=5, value=stats.get("混双", 0)).font = font_content_stats
-            for col in range(1, 6):
-                ws_stats.cell(row=row, column=col).alignment = alignment_center_stats
-                ws_stats.cell(row=row, column=col).border = border_stats
-            row += 1
-
-        for player in sorted(female_players):
-            stats = player_stats[player]
-            ws_stats.cell(row=row, column=1, value=player).font = font_content_stats
-            ws_stats.cell(row=row, column=2, value=stats["total"]).font = font_content_stats
-            ws_stats.cell(row=row, column=3, value=stats.get("男双", 0)).font = font_content_stats
-            ws_stats.cell(row=row, column=4, value=stats.get("女双", 0)).font = font_content_stats
-            ws_stats.cell(row=row, column=5, value=stats.get("混双", 0)).font = font_content_stats
-            for col in range(1, 6):
-                ws_stats.cell(row=row, column=col).alignment = alignment_center_stats
-                ws_stats.cell(row=row, column=col).border = border_stats
-            row += 1
-
-        ws_stats.column_dimensions["A"].width = 12
-        ws_stats.column_dimensions["B"].width = 10
-        ws_stats.column_dimensions["C"].width = 10
-        ws_stats.column_dimensions["D"].width = 10
-        ws_stats.column_dimensions["E"].width = 10
-
-    wb.save(output_path)
+        workbook.add_stats_sheet(player_stats)
+    workbook.save(output_path)
     print(f"对阵表已生成：{output_path}")
 
 
+def create_season_excel(
+    sessions: Iterable[Dict],
+    output_path: str,
+    title: str = "科技球队日常训练活动 - 对阵表",
+    row_height: float = 32
+) -> int:
+    """
+    Export many sessions into one workbook, one 对阵表 sheet per session.
+
+    Args:
+        sessions: iterable of {"matches", "court_count", "activity_date"?, "schedule_method"?, "sheet_title"?};
+            sheets are streamed one at a time, so a generator keeps memory flat for a whole season
+
+    Returns:
+        Number of sheets written
+    """
+    workbook = LineupWorkbook(row_height)
+    count = 0
+    for session in sessions:
+        count += 1
+        activity_date = session.get("activity_date", "")
+        # Excel 工作表名最长 31 个字符
+        sheet_title = (session.get("sheet_title") or activity_date or f"第{count}次活动")[:31]
+        workbook.add_lineup_sheet(session["matches"], lineup_title(title, activity_date),
+                                  lineup_config_line(session["court_count"], session.get("schedule_method", "")),
+                                  sheet_title)
+    workbook.save(output_path)
+    print(f"对阵表已生成：{output_path}（{count}个工作表）")
+    return count
+
+
 def calculate_player_stats(matches: List[Dict], all_players: List[str]) -> Dict:
     """
     Calculate player statistics from matches.
@@ -350,31 +354,7 @@ def calculate_player_stats(matches: List[Dict], all_players: List[str]) -> Dict:
     Returns:
         Dictionary with player stats: {player: {"total": N, "男双": N, "女双": N, "混双": N}}
     """
-    player_games = {}
-    player_type_games = {}
-    
-    for m in matches:
-        match_type = m["type"]
-        # Handle fallback types: extract base type
-        base_type = match_type.split(" ")[0]  # "男双 (临时)" -> "男双"
-        
-        for player in get_match_players(m["match"]):
-            player_games[player] = player_games.get(player, 0) + 1
-            if player not in player_type_games:
-                player_type_games[player] = {"男双": 0, "女双": 0, "混双": 0}
-            player_type_games[player][base_type] += 1
-    
-    player_stats = {}
-    for player in all_players:
-        type_stats = player_type_games.get(player, {"男双": 0, "女双": 0, "混双": 0})
-        player_stats[player] = {
-            "total": player_games.get(player, 0),
-            "男双": type_stats["男双"],
-            "女双": type_stats["女双"],
-            "混双": type_stats["混双"]
-        }
-    
-    return player_stats
+    return ScheduleMatrices(matches, all_players).player_stats(all_players)
 
 
 def generate_mixed_vs_mens_matches(males: List[str], females: List[str]) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
@@ -389,13 +369,12 @@ def generate_mixed_vs_mens_matches(males: List[str], females: List[str]) -> List
     """
     import itertools
     
-    mixed_males = [m for m in males if m in MIXED_DOUBLES_MALES]
+    mixed_males = [m for m in males if ROSTER.is_mixed_eligible(m)]
     
     # Filter females who can play mixed
     can_play_womens_doubles = len(females) >= 4
     mixed_females = [f for f in females
-                     if not PLAYER_CONSTRAINTS.get(f, {}).get("only_womens_doubles")
-                     or not can_play_womens_doubles]
+                     if not ROSTER.is_only_womens_doubles(f) or not can_play_womens_doubles]
     
     matches = []
     
@@ -463,8 +442,16 @@ def print_schedule_summary(matches: List[Dict], all_players: List[str], court_co
     print("\n✓ 核心规则检查通过：无球员在同一轮次重复出现")
     
     print(f"\n球员参赛场次统计:")
-    player_stats = calculate_player_stats(matches, all_players)
+    matrices = ScheduleMatrices(matches, all_players)
+    player_stats = matrices.player_stats(all_players)
     for player in sorted(all_players):
         stats = player_stats[player]
         type_str = f"(男{stats['男双']}/女{stats['女双']}/混{stats['混双']})"
         print(f"  - {player}: {stats['total']}场 {type_str}")
+
+    metrics = matrices.metrics(all_players)
+    print(f"\n均衡性指标:")
+    print(f"  - 场次：平均 {metrics['games_mean']:.2f}，方差 {metrics['games_variance']:.2f}，"
+          f"范围 [{metrics['games_min']}, {metrics['games_max']}]")
+    print(f"  - 最长连续轮空：{metrics['max_bye_streak']}轮")
+    print(f"  - 重复搭档：{metrics['partner_repeats']}次，重复对手：{metrics['opponent_repeats']}次")
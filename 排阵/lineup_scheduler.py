@@ -7,35 +7,23 @@ Supports player-specific constraints (fixed games, early departure) and fixed pa
 Supports guest players (former employees) with lower priority than internal employees.
 """
 
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-import itertools
-from typing import List, Tuple, Dict, Optional
+from typing import Iterator, List, Tuple, Dict, Optional
 import random
 import re
 
-
-# Player definitions
-INTERNAL_MALE_PLAYERS = [
-    "苏大哲", "罗蒙", "江锐", "严勇文", "陈顺星", "陈小洪",
-    "卢志辉", "林锋", "王小波", "刘继宇", "董广博", "林琪琛", "罗琴荩"
-]
-
-GUEST_MALE_PLAYERS = [
-    "张欣欣", "黄冬青", "程建兴", "陈宇霆", "卢子龙", "吴煜"
-]
-
-MALE_PLAYERS = INTERNAL_MALE_PLAYERS + GUEST_MALE_PLAYERS
-
-INTERNAL_FEMALE_PLAYERS = [
-    "田茜", "唐英武", "李祺祺", "高洁", "滕菲", "谢卓珊", "崔倩男", "林小连"
-]
-
-GUEST_FEMALE_PLAYERS = [
-    "张燕红", "李杏芝", "项小英"
-]
-
-FEMALE_PLAYERS = INTERNAL_FEMALE_PLAYERS + GUEST_FEMALE_PLAYERS
+import excel_exporter
+from match_index import MatchIndex
+from match_pool import (
+    count_doubles_matches, count_mixed_doubles_matches, iter_doubles_matches, iter_mixed_doubles_matches,
+    random_doubles_matches, random_mixed_doubles_matches,
+)
+from schedule_metrics import ScheduleMatrices, longest_zero_run
+from scoring_profile import DEFAULT_WEIGHTS, CompiledProfile, ScoringWeights, player_score, womens_bonus
+from roster import (
+    ROSTER, INTERNAL_MALE_PLAYERS, GUEST_MALE_PLAYERS, MALE_PLAYERS,
+    INTERNAL_FEMALE_PLAYERS, GUEST_FEMALE_PLAYERS, FEMALE_PLAYERS,
+    MIXED_DOUBLES_MALES, PLAYER_CONSTRAINTS, FIXED_PARTNERS,
+)
 
 
 def parse_activity_date(signup_text: str) -> str:
@@ -75,17 +63,6 @@ def parse_activity_date(signup_text: str) -> str:
     
     return ""  # No date found
 
-# Mixed doubles eligible male players (internal only)
-MIXED_DOUBLES_MALES = {"林锋", "王小波", "陈顺星", "罗琴荩", "罗蒙"}
-
-# Player-specific constraints
-# fixed_games: None = 自动根据场地紧张程度计算，整数 = 固定场次
-PLAYER_CONSTRAINTS = {
-    "严勇文": {"fixed_games": None, "early_departure": True},
-    "崔倩男": {"fixed_games": None, "early_departure": True},
-    "林小连": {"only_womens_doubles": True},  # 只打女双
-}
-
 # 场地紧张程度阈值（球员平均比赛场次）
 # 当球员平均比赛场次 >= 此值时，场地算充裕；否则算紧张
 COURT_ABUNDANCE_THRESHOLD = 5.0
@@ -96,24 +73,27 @@ EARLY_DEPARTURE_GAMES = {
     "tight": 4,     # 场地紧张时的场次
 }
 
-# Fixed partner pairs
-FIXED_PARTNERS = {
-}
-
 # Global config
-MATCHES_PER_COURT = 8
+MATCHES_PER_COURT = 8   # 默认轮数（每片场地的比赛数），可通过 --rounds 调整
+PLAYERS_PER_COURT = 8   # 24 人以上的大型活动：每 8 人一片场地
+# 大型活动的完整比赛池有上百万场：超过 MAX_POOL_MATCHES 的池只均匀抽样 SAMPLED_POOL_MATCHES 场
+MAX_POOL_MATCHES = 12000
+SAMPLED_POOL_MATCHES = 4000
 MAX_GAMES_INTERNAL = 7  # Internal employees max games
 MAX_GAMES_GUEST = 6     # Guest players max games (lower priority)
+# 评分权重默认值见 scoring_profile.ScoringWeights（可用 --profile 加载 TOML 配置调整）
+TARGET_GAMES = DEFAULT_WEIGHTS.target_games        # 目标场次
+GUEST_SCORE_PENALTY = DEFAULT_WEIGHTS.guest        # 外援球员的评分加分（降低优先级，优先保障内部员工）
 
 
 def is_internal_player(player: str) -> bool:
     """Check if a player is an internal employee."""
-    return player in INTERNAL_MALE_PLAYERS or player in INTERNAL_FEMALE_PLAYERS
+    return ROSTER.is_internal(player)
 
 
 def is_guest_player(player: str) -> bool:
     """Check if a player is a guest player (former employee)."""
-    return player in GUEST_MALE_PLAYERS or player in GUEST_FEMALE_PLAYERS
+    return ROSTER.is_guest(player)
 
 
 def get_max_games_for_player(player: str) -> int:
@@ -162,6 +142,16 @@ def get_fixed_games_for_player(player: str, total_matches: int, total_players: i
     return None
 
 
+def player_priority_score(games: int, fixed_games: Optional[int], max_games: int, is_guest: bool,
+                          weights: ScoringWeights = DEFAULT_WEIGHTS) -> int:
+    """
+    Scheduling priority of one player given the games already played (lower = play sooner).
+
+    评分规则见 scoring_profile.player_score，权重可由评分配置调整。
+    """
+    return player_score(weights, games, fixed_games, max_games, is_guest)
+
+
 def parse_signup(signup_text: str) -> Tuple[List[str], List[str]]:
     """Parse signup list and return male and female players."""
     males = []
@@ -174,9 +164,9 @@ def parse_signup(signup_text: str) -> Tuple[List[str], List[str]]:
         if "." in name or "," in name:
             name = name.split(".", 1)[-1].split(",", 1)[-1].strip()
 
-        if name in MALE_PLAYERS:
+        if ROSTER.is_male(name):
             males.append(name)
-        elif name in FEMALE_PLAYERS:
+        elif ROSTER.is_female(name):
             females.append(name)
 
     return males, females
@@ -186,56 +176,38 @@ def get_court_count(total_players: int) -> int:
     """Determine number of courts based on player count."""
     if total_players <= 12:
         return 2
-    return 3
+    if total_players <= 24:
+        return 3
+    # 公司级大型活动：按人数扩展场地（80 人 -> 10 片）
+    return -(-total_players // PLAYERS_PER_COURT)
 
 
-def generate_mixed_doubles_matches(males: List[str], females: List[str]) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
-    """Generate mixed doubles matches."""
-    mixed_males = [m for m in males if m in MIXED_DOUBLES_MALES]
+def generate_mixed_doubles_matches(males: List[str], females: List[str]) -> Iterator[Tuple[Tuple[str, str], Tuple[str, str]]]:
+    """Generate mixed doubles matches lazily."""
+    mixed_males = [m for m in males if ROSTER.is_mixed_eligible(m)]
 
     # 过滤只打女双的球员（但如果女双人数不足 4 人，则允许她们参加混双）
     can_play_womens_doubles = len(females) >= 4
-    mixed_females = [f for f in females 
-                     if not PLAYER_CONSTRAINTS.get(f, {}).get("only_womens_doubles") 
-                     or not can_play_womens_doubles]
+    mixed_females = [f for f in females
+                     if not ROSTER.is_only_womens_doubles(f) or not can_play_womens_doubles]
 
-    matches = []
+    if count_mixed_doubles_matches(len(mixed_males), len(mixed_females)) > MAX_POOL_MATCHES:
+        return iter(random_mixed_doubles_matches(mixed_males, mixed_females, SAMPLED_POOL_MATCHES))
+    return iter_mixed_doubles_matches(mixed_males, mixed_females)
 
-    for male_pair in itertools.combinations(mixed_males, 2):
-        for female_pair in itertools.combinations(mixed_females, 2):
-            match = ((male_pair[0], female_pair[0]), (male_pair[1], female_pair[1]))
-            matches.append(match)
 
-    return matches
+def generate_mens_doubles_matches(males: List[str]) -> Iterator[Tuple[Tuple[str, str], Tuple[str, str]]]:
+    """Generate men's doubles matches lazily, each match once (sampled for large signups)."""
+    if count_doubles_matches(len(males)) > MAX_POOL_MATCHES:
+        return iter(random_doubles_matches(males, SAMPLED_POOL_MATCHES))
+    return iter_doubles_matches(males)
 
 
-def generate_mens_doubles_matches(males: List[str]) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
-    """Generate men's doubles matches."""
-    matches = []
-    for pair1 in itertools.combinations(males, 2):
-        remaining = [m for m in males if m not in pair1]
-        if len(remaining) < 2:
-            continue
-        for pair2 in itertools.combinations(remaining, 2):
-            match = (pair1, pair2)
-            matches.append(match)
-    return matches
-
-
-def generate_womens_doubles_matches(females: List[str]) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
-    """Generate women's doubles matches."""
-    matches = []
-    if len(females) < 4:
-        return matches
-
-    for pair1 in itertools.combinations(females, 2):
-        remaining = [f for f in females if f not in pair1]
-        if len(remaining) < 2:
-            continue
-        for pair2 in itertools.combinations(remaining, 2):
-            match = (pair1, pair2)
-            matches.append(match)
-    return matches
+def generate_womens_doubles_matches(females: List[str]) -> Iterator[Tuple[Tuple[str, str], Tuple[str, str]]]:
+    """Generate women's doubles matches lazily, each match once (sampled for large signups)."""
+    if count_doubles_matches(len(females)) > MAX_POOL_MATCHES:
+        return iter(random_doubles_matches(females, SAMPLED_POOL_MATCHES))
+    return iter_doubles_matches(females)
 
 
 def get_match_players(match: Tuple[Tuple[str, str], Tuple[str, str]]) -> set:
@@ -251,12 +223,33 @@ def get_pair_key(p1: str, p2: str) -> tuple:
     return tuple(sorted([p1, p2]))
 
 
+def get_type_targets(total_matches: int, womens_count: int) -> Dict[str, int]:
+    """Target number of matches per type (混双/男双/女双)."""
+    # 根据实际女性人数动态调整女双比例
+    if womens_count >= 4:
+        # 4 个女生：女双目标 3-4 场
+        mixed_target = int(total_matches * 0.28)
+        womens_target = 4
+    else:
+        mixed_target = int(total_matches * 0.33)
+        womens_target = 0
+
+    mens_target = total_matches - mixed_target - womens_target
+    return {"混双": mixed_target, "男双": mens_target, "女双": womens_target}
+
+
 def select_balanced_matches(
     mixed_matches: List, mens_matches: List, womens_matches: List,
     total_matches: int, court_count: int, players: List[str],
-    males: List[str], females: List[str]
+    males: List[str], females: List[str], season=None, weights: Optional[ScoringWeights] = None
 ) -> List[Dict]:
-    """Select balanced matches with all constraints."""
+    """
+    Select balanced matches with all constraints.
+
+    ``season`` (season_history.SeasonHistory) biases scoring toward players
+    under-served this season and partnerships / opponents not seen yet.
+    ``weights`` (scoring_profile.ScoringWeights) replaces the default scoring weights.
+    """
     selected = []
     player_games = {p: 0 for p in players}
     partner_games = {pair: 0 for pair in FIXED_PARTNERS}
@@ -264,63 +257,34 @@ def select_balanced_matches(
     def get_constraint(player):
         return PLAYER_CONSTRAINTS.get(player, {})
 
-    def can_player_play(player, current_round_matches, round_num, total_rounds):
-        """
-        检查球员是否可以在当前轮次上场比赛。
-
-        【最高优先级规则】每个轮次中，每个球员在所有场地（1 号、2 号、3 号）只能出现一次！
-        这是排阵的核心原则，必须严格保证。
-
-        【外援球员规则】外援球员最大场次限制为 5 场，内部员工为 6 场，
-        优先保障内部员工的场次。
-        """
-        constraint = get_constraint(player)
-        # Use dynamic fixed_games calculation based on court availability
-        fixed_games = get_fixed_games_for_player(player, total_matches, len(players))
-        max_games = get_max_games_for_player(player)
-
-        # 【固定场次规则】严格执行 fixed_games 限制
-        # 有 fixed_games 约束的球员，达到固定场次后禁止参赛（不享受冷场规则例外）
-        if fixed_games is not None and player_games[player] >= fixed_games:
-            return False
-
-        # 检查是否已达到最大场次限制（外援 5 场，内部 6 场）
-        if player_games[player] >= max_games:
-            return False
-
-        # 【核心规则】检查球员是否已在当前轮次的其他场地出现过
-        for m in current_round_matches:
-            if player in get_match_players(m["match"]):
-                return False  # 该球员已在本轮次上场比赛，不能再参加
-
-        return True
-
-    def can_add_match(match, current_round_matches, round_num, total_rounds):
-        match_type = None
-        for m in current_round_matches:
-            if m.get("type"):
-                match_type = m["type"]
-                break
-
-        # 获取当前女性球员总数，判断女双是否可行
-        all_females_count = len([p for p in players if p in FEMALE_PLAYERS])
-        can_play_womens_doubles = all_females_count >= 4
-
-        for player in get_match_players(match):
-            # 检查特殊约束：只打女双的球员不能参加混双（但女双人数不足 4 人时例外）
-            constraint = get_constraint(player)
-            if constraint.get("only_womens_doubles"):
-                # 如果当前比赛不是女双，且女双人数足够 4 人，该球员不能参加
-                if match_type and match_type != "女双" and can_play_womens_doubles:
-                    return False
-
-            if not can_player_play(player, current_round_matches, round_num, total_rounds):
-                return False
-
-        return True
+    # 球员的固定场次与最大场次在整个排阵过程中不变，预先计算
+    # Use dynamic fixed_games calculation based on court availability
+    fixed_games_map = {p: get_fixed_games_for_player(p, total_matches, len(players)) for p in players}
+    max_games_map = {p: get_max_games_for_player(p) for p in players}
+    guest_players = {p for p in players if is_guest_player(p)}
+    season_offsets = season.player_offsets(players) if season is not None else {}
+    weights = weights or DEFAULT_WEIGHTS
+    # 球员评分只依赖自己的场次：按评分权重预先编译成 场次 -> 评分 的查找表
+    profile = CompiledProfile(weights, [fixed_games_map[p] for p in players],
+                              [max_games_map[p] for p in players], [p in guest_players for p in players])
+    profile_ids = {p: i for i, p in enumerate(players)}
+
+    def get_player_score(player):
+        """单个球员对比赛评分的贡献，只依赖该球员自己的场次。"""
+        score = profile.score(profile_ids[player], player_games[player])
+        if season_offsets:
+            score += season_offsets.get(player, 0)
+        return score
+
+    def get_match_bonus(round_num, is_womens_doubles):
+        """与具体球员无关的比赛加减分项。"""
+        # 优先级 8：女双比赛减分（4 个女生难得，优先安排，但不超过目标）
+        if is_womens_doubles and womens_used < womens_target:
+            return [womens_bonus(weights, round_num, womens_target - womens_used)]
+        return []
 
-    def get_match_score(match, round_num, is_womens_doubles=False):
-        """评分越低越优先被选中。
+    def best_candidate(pool_name, round_num, is_womens_doubles=False):
+        """评分越低越优先被选中，返回 (比赛索引, 评分)。
 
         评分规则：
         1. 已达到固定场次的球员 = 禁止参赛（巨额加分）
@@ -330,62 +294,30 @@ def select_balanced_matches(
         5. 达到最大场次的球员：大幅加分（最后）
         6. 固定搭档组合：减分（优先）
         7. 女双比赛：大幅减分（4 个女生难得，优先安排）
-        """
-        match_players = get_match_players(match)
-        scores = []
-        active_games = [g for p, g in player_games.items() if g > 0]
-        avg_games = sum(active_games) / len(active_games) if active_games else 0
-
-        TARGET_GAMES = 5  # 目标场次
 
-        for player in match_players:
-            constraint = get_constraint(player)
-            games = player_games[player]
-            # Use dynamic fixed_games calculation
-            fixed_games = get_fixed_games_for_player(player, total_matches, len(players))
-            max_games = get_max_games_for_player(player)
-            score = 0
-
-            # 优先级 1：已达到固定场次的球员 = 禁止参赛（巨额加分）
-            if fixed_games is not None and games >= fixed_games:
-                score += 10000  # 巨额加分，确保不会被选中
-
-            # 优先级 2：固定场次要求：未完成时大幅减分（最优先）
-            if fixed_games is not None:
-                remaining = fixed_games - games
-                if remaining > 0:
-                    score -= remaining * 1000
-
-            # 优先级 3：未达到目标场次的球员优先
-            if games < TARGET_GAMES:
-                score -= (TARGET_GAMES - games) * 200
-            elif games >= max_games:
-                # 达到最大场次，大幅加分（靠后）
-                score += 2000
+        比赛评分 = 各项得分的平均值。球员得分缓存在 player_scores 中，
+        每次排入比赛后只刷新这 4 名球员，因此这里只需做加法。
+        """
+        bonus = get_match_bonus(round_num, is_womens_doubles)
+        bonus_sum = sum(bonus)
+        bonus_count = len(bonus)
+        members = index.members
+        best_idx = None
+        best_score = float('inf')
+        for idx in index.candidates(pool_name):
+            a, b, c, d = members[idx]
+            total = player_scores[a] + player_scores[b] + player_scores[c] + player_scores[d] + bonus_sum
+            partner_terms = partner_scores.get(idx)
+            if partner_terms:
+                score = (total + sum(partner_terms)) / (4 + len(partner_terms) + bonus_count)
             else:
-                # 达到 5 场但未到最大场次，小幅加分
-                score += (games - TARGET_GAMES) * 100
-
-            # 优先级 4：外援球员：小幅加分（降低优先级，优先保障内部员工）
-            if is_guest_player(player):
-                score += 50
-
-            scores.append(score)
-
-        pair_a, pair_b = match
-        for pair in [pair_a, pair_b]:
-            pair_key = get_pair_key(pair[0], pair[1])
-            if pair_key in FIXED_PARTNERS:
-                weight = FIXED_PARTNERS[pair_key]
-                scores.append(-weight * 30)
-
-        # 优先级 8：女双比赛减分（4 个女生难得，优先安排，但不超过目标）
-        if is_womens_doubles and womens_used < womens_target:
-            remaining_womens = womens_target - womens_used
-            round_bonus = 1500 if round_num <= 3 else 600
-            scores.append(-remaining_womens * round_bonus)
-
-        return sum(scores) / len(scores) if scores else float('inf')
+                score = total / (4 + bonus_count)
+            if season_scores:
+                score += season_scores.get(idx, 0)
+            if score < best_score:
+                best_score = score
+                best_idx = idx
+        return best_idx, best_score
 
     mixed_pool = list(mixed_matches)
     mens_pool = list(mens_matches)
@@ -395,18 +327,62 @@ def select_balanced_matches(
     random.shuffle(mens_pool)
     random.shuffle(womens_pool)
 
-    # 预设比赛类型比例和目标数量
-    # 根据实际女性人数动态调整女双比例
-    womens_count = len(females)
-    if womens_count >= 4:
-        # 4 个女生：女双目标 3-4 场
-        mixed_target = int(total_matches * 0.28)
-        womens_target = 4
-    else:
-        mixed_target = int(total_matches * 0.33)
-        womens_target = 0
+    # 获取当前女性球员总数，判断女双是否可行
+    all_females_count = len([p for p in players if ROSTER.is_female(p)])
+    can_play_womens_doubles = all_females_count >= 4
+
+    # 只打女双的球员不能参加混双/男双（但女双人数不足 4 人时例外）
+    only_womens_players = set()
+    if can_play_womens_doubles:
+        only_womens_players = {p for p in players if get_constraint(p).get("only_womens_doubles")}
+
+    def without_only_womens(pool):
+        return [m for m in pool if not (get_match_players(m) & only_womens_players)]
+
+    # 候选比赛索引：每场比赛存为球员位掩码，每个球员维护倒排表。
+    # 【最高优先级规则】每个轮次中，每个球员在所有场地只能出现一次！
+    # 球员本轮上场后屏蔽其所有比赛，轮次结束再解除；
+    # 达到场次上限（固定场次 / 外援 6 场 / 内部 7 场）后永久屏蔽。
+    index = MatchIndex(players)
+    index.add_pool("mixed", without_only_womens(mixed_pool))
+    index.add_pool("mens", without_only_womens(mens_pool))
+    index.add_pool("womens", womens_pool)
+
+    game_caps = {}
+    for p in players:
+        fixed_games = fixed_games_map[p]
+        cap = max_games_map[p]
+        if fixed_games is not None:
+            cap = min(cap, fixed_games)
+        game_caps[p] = cap
+        if player_games[p] >= cap:
+            index.block_player(p)
+
+    # 评分缓存：按球员 id 存储每个球员的得分；固定搭档与赛季搭档得分只与比赛本身有关
+    player_scores = [get_player_score(p) for p in players]
+    partner_scores = {}
+    if FIXED_PARTNERS:
+        for idx, match in enumerate(index.matches):
+            terms = []
+            for pair in match:
+                pair_key = get_pair_key(pair[0], pair[1])
+                if pair_key in FIXED_PARTNERS:
+                    terms.append(-FIXED_PARTNERS[pair_key] * weights.fixed_partner)
+            if terms:
+                partner_scores[idx] = terms
+    # 赛季内搭档过 / 交手过的加分直接加在平均分上（不参与平均，避免稀释）
+    season_scores = {}
+    if season is not None:
+        for idx, match in enumerate(index.matches):
+            penalty = season.match_penalty(match)
+            if penalty:
+                season_scores[idx] = penalty
 
-    mens_target = total_matches - mixed_target - womens_target
+    # 预设比赛类型比例和目标数量
+    type_targets = get_type_targets(total_matches, len(females))
+    mixed_target = type_targets["混双"]
+    womens_target = type_targets["女双"]
+    mens_target = type_targets["男双"]
 
     mixed_used = 0
     mens_used = 0
@@ -414,22 +390,49 @@ def select_balanced_matches(
 
     rounds = []
     current_round = []
+    round_players = set()
+    round_blocked = []
     total_rounds = (total_matches + court_count - 1) // court_count
 
     # 比赛类型名称映射
     match_type_name_map = {"mixed": "混双", "mens": "男双", "womens": "女双"}
 
-    def try_add_match(pool, match_type_name, current_count, target_count, allow_fallback=False):
+    def place_match(match_info, match_players):
+        """把比赛加入当前轮次，并更新场次计数和候选索引。"""
+        # 本轮首场不是女双时，只打女双的球员本轮不再上场
+        if not current_round and match_info["type"] != "女双":
+            for p in only_womens_players:
+                index.block_player(p)
+                round_blocked.append(p)
+
+        current_round.append(match_info)
+        for player in match_players:
+            player_games[player] += 1
+            round_players.add(player)
+            index.block_player(player)
+            round_blocked.append(player)
+            if player_games[player] == game_caps[player]:
+                index.block_player(player)
+            player_scores[index.player_ids[player]] = get_player_score(player)
+
+    def count_partners(match):
+        pair_a, pair_b = match
+        for pair in [pair_a, pair_b]:
+            pair_key = get_pair_key(pair[0], pair[1])
+            if pair_key in partner_games:
+                partner_games[pair_key] += 1
+
+    def try_add_match(pool_name, match_type_name, current_count, target_count, allow_fallback=False):
         """尝试添加一场比赛到当前轮次，返回是否成功。
         
         Args:
-            pool: 比赛池
+            pool_name: 比赛池名称 (mixed/mens/womens)
             match_type_name: 比赛类型 (mixed/mens/womens)
             current_count: 当前已使用该类型的次数
             target_count: 目标使用次数
             allow_fallback: 是否允许 fallback（混双/女双位置用男双代替）
         """
-        nonlocal current_round, mixed_used, mens_used, womens_used
+        nonlocal mixed_used, mens_used, womens_used
 
         # 如果已达到目标数量，跳过（女双严格限制，其他类型允许稍微超出）
         if match_type_name == "womens" and current_count >= womens_target:
@@ -438,72 +441,34 @@ def select_balanced_matches(
             return False, current_count
 
         current_round_num = len(rounds) + 1
-        best_match = None
-        best_score = float('inf')
-
-        # 获取当前女性球员总数，判断女双是否可行
-        all_females_count = len([p for p in players if p in FEMALE_PLAYERS])
-        can_play_womens_doubles = all_females_count >= 4
+        best_idx = None
 
         # Fallback 逻辑：如果允许 fallback 且原池子为空或无法提供比赛，从男双池借
-        if allow_fallback and (not pool or (match_type_name == "mixed" and len(females) < 2)):
+        if allow_fallback and (not index.remaining[pool_name] or (match_type_name == "mixed" and len(females) < 2)):
             # 从男双池借一场比赛来打这个位置
-            if mens_pool:
-                for match in mens_pool:
-                    if can_add_match(match, current_round, current_round_num, total_rounds):
-                        score = get_match_score(match, current_round_num, is_womens_doubles=False)
-                        if score < best_score:
-                            best_score = score
-                            best_match = match
+            best_idx, _ = best_candidate("mens", current_round_num, is_womens_doubles=False)
 
         # 如果没有找到 fallback 比赛，尝试原池子
-        if not best_match and pool:
-            for match in pool:
-                # 检查是否有球员不能参加该类型的比赛
-                can_play = True
-                for player in get_match_players(match):
-                    constraint = get_constraint(player)
-                    if constraint.get("only_womens_doubles") and match_type_name != "womens" and can_play_womens_doubles:
-                        can_play = False
-                        break
-
-                if not can_play:
-                    continue
-
-                if not can_add_match(match, current_round, current_round_num, total_rounds):
-                    continue
-                is_wd = (match_type_name == "womens")
-                score = get_match_score(match, current_round_num, is_womens_doubles=is_wd)
-                if score < best_score:
-                    best_score = score
-                    best_match = match
+        if best_idx is None and index.remaining[pool_name]:
+            is_wd = (match_type_name == "womens")
+            best_idx, _ = best_candidate(pool_name, current_round_num, is_womens_doubles=is_wd)
 
-        if best_match:
+        if best_idx is not None:
+            best_match = index.matches[best_idx]
             # 确定实际显示的类型
-            is_fallback = best_match in mens_pool and match_type_name != "mens"
+            is_fallback = index.pool_of[best_idx] == "mens" and match_type_name != "mens"
             if is_fallback:
                 display_type = f"{match_type_name_map[match_type_name]} (男代)"
             else:
                 display_type = match_type_name_map[match_type_name]
             
-            current_round.append({
+            index.remove(best_idx)
+            place_match({
                 "type": display_type,
                 "match": best_match,
                 "fallback": is_fallback
-            })
-            for player in get_match_players(best_match):
-                player_games[player] += 1
-            pair_a, pair_b = best_match
-            for pair in [pair_a, pair_b]:
-                pair_key = get_pair_key(pair[0], pair[1])
-                if pair_key in partner_games:
-                    partner_games[pair_key] += 1
-            
-            # 从对应的池子移除
-            if best_match in pool:
-                pool.remove(best_match)
-            elif best_match in mens_pool:
-                mens_pool.remove(best_match)
+            }, index.players_of(best_idx))
+            count_partners(best_match)
             
             # 更新计数（fallback 也算作原类型的计数）
             if match_type_name == "mixed":
@@ -520,9 +485,9 @@ def select_balanced_matches(
     # 策略：女双始终最优先，直到达到目标
     # 放宽女双目标限制，在未达到目标前不计上限
     type_priorities_default = [
-        ("womens", lambda: womens_used, lambda: womens_target + 10, womens_pool),  # 女双最优先（大幅放宽上限）
-        ("mixed", lambda: mixed_used, lambda: mixed_target + 10, mixed_pool),  # 混双次优先（也放宽）
-        ("mens", lambda: mens_used, lambda: mens_target + 10, mens_pool),  # 男双最后
+        ("womens", lambda: womens_used, lambda: womens_target + 10),  # 女双最优先（大幅放宽上限）
+        ("mixed", lambda: mixed_used, lambda: mixed_target + 10),  # 混双次优先（也放宽）
+        ("mens", lambda: mens_used, lambda: mens_target + 10),  # 男双最后
     ]
 
     # 所有轮次都用同样的优先级（女双始终优先）
@@ -530,6 +495,8 @@ def select_balanced_matches(
 
     for round_num in range(total_rounds):
         current_round = []
+        round_players = set()
+        round_blocked = []
 
         # 交替优先级：奇数轮女双优先，偶数轮混双优先
         if round_num % 2 == 0:
@@ -542,10 +509,10 @@ def select_balanced_matches(
             added = False
 
             # 按优先级尝试每种比赛类型
-            for match_type, get_used, get_target, pool in type_priorities:
-                if not pool:
+            for match_type, get_used, get_target in type_priorities:
+                if not index.remaining[match_type]:
                     continue
-                success, new_count = try_add_match(pool, match_type, get_used(), get_target())
+                success, new_count = try_add_match(match_type, match_type, get_used(), get_target())
                 if success:
                     added = True
                     # 更新计数
@@ -559,11 +526,11 @@ def select_balanced_matches(
 
             # 如果优先级类型都无法添加，尝试所有类型（放宽限制）
             if not added:
-                for match_type, get_used, get_target, pool in type_priorities:
-                    if not pool:
+                for match_type, get_used, get_target in type_priorities:
+                    if not index.remaining[match_type]:
                         continue
                     # 放宽限制：不检查目标数量
-                    success, new_count = try_add_match(pool, match_type, 0, 999)
+                    success, new_count = try_add_match(match_type, match_type, 0, 999)
                     if success:
                         added = True
                         if match_type == "mixed":
@@ -577,53 +544,31 @@ def select_balanced_matches(
             # 如果还是无法添加，尝试 fallback 模式（用男双填充场地）
             if not added:
                 # 尝试用男双代替混双：从男双池找一场可用的比赛
-                if mens_pool:
-                    for match in list(mens_pool):
-                        if can_add_match(match, current_round, len(rounds) + 1, total_rounds):
-                            current_round.append({
-                                "type": "混双 (男代)",
-                                "match": match,
-                                "fallback": True
-                            })
-                            for player in get_match_players(match):
-                                player_games[player] += 1
-                            pair_a, pair_b = match
-                            for pair in [pair_a, pair_b]:
-                                pair_key = get_pair_key(pair[0], pair[1])
-                                if pair_key in partner_games:
-                                    partner_games[pair_key] += 1
-                            mens_pool.remove(match)
-                            mens_used += 1
-                            added = True
-                            break
+                idx = index.first_candidate("mens")
+                if idx is not None:
+                    match = index.matches[idx]
+                    index.remove(idx)
+                    place_match({
+                        "type": "混双 (男代)",
+                        "match": match,
+                        "fallback": True
+                    }, index.players_of(idx))
+                    count_partners(match)
+                    mens_used += 1
+                    added = True
 
             # 如果还是无法添加，尝试临时组合：从本轮未上场的人中选 4 个打第 3 场地
             if not added:
-                # 找出本轮已上场的球员
-                played_players = set()
-                for m in current_round:
-                    played_players.update(get_match_players(m["match"]))
-                
                 # 候选人 = 所有球员 - 已上场球员 - 不能打的球员（fixed_games 已满）
-                candidates = []
-                for p in players:
-                    if p in played_players:
-                        continue
-                    # Use dynamic fixed_games calculation
-                    fixed_games = get_fixed_games_for_player(p, total_matches, len(players))
-                    if fixed_games is not None and player_games[p] >= fixed_games:
-                        continue
-                    max_games = get_max_games_for_player(p)
-                    if player_games[p] >= max_games:
-                        continue
-                    candidates.append(p)
+                candidates = [p for p in players
+                              if p not in round_players and player_games[p] < game_caps[p]]
                 
                 # 如果有至少 4 个候选人，随机选 4 个组成一场比赛
                 if len(candidates) >= 4:
                     selected = random.sample(candidates, 4)
                     # 尽量按性别配对
-                    females_in_selected = [p for p in selected if p in FEMALE_PLAYERS]
-                    males_in_selected = [p for p in selected if p not in FEMALE_PLAYERS]
+                    females_in_selected = [p for p in selected if ROSTER.is_female(p)]
+                    males_in_selected = [p for p in selected if not ROSTER.is_female(p)]
                     
                     if len(females_in_selected) >= 2 and len(males_in_selected) >= 2:
                         # 2 女 2 男：女双
@@ -652,26 +597,22 @@ def select_balanced_matches(
                         match_type = "男双 (乱打)"
                     
                     match = (pair1, pair2)
-                    current_round.append({
+                    place_match({
                         "type": match_type,
                         "match": match,
                         "fallback": True
-                    })
-                    for player in get_match_players(match):
-                        player_games[player] += 1
+                    }, pair1 + pair2)
                     added = True
 
             if not added:
                 break
 
+        # 轮次结束：解除本轮的屏蔽
+        for p in round_blocked:
+            index.unblock_player(p)
+
         if current_round:
             rounds.append(current_round)
-            
-            # 【防止冷场规则】更新球员的轮空历史
-            # 找出本轮上场的球员
-            played_players = set()
-            for m in current_round:
-                played_players.update(get_match_players(m["match"]))
 
     # 【核心规则检查】验证没有球员在同一轮次重复出现
 
@@ -696,140 +637,148 @@ def select_balanced_matches(
     return selected
 
 
-def create_lineup_excel(matches: List[Dict], court_count: int, output_path: str, player_stats: Dict = None, activity_date: str = None):
-    """Create Excel file with lineup schedule."""
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "对阵表"
+def get_total_matches(all_players: List[str], court_count: int,
+                      rounds: Optional[int] = None) -> Tuple[int, int, int, int]:
+    """
+    Calculate how many matches can be scheduled in ``rounds`` rounds (default MATCHES_PER_COURT).
 
-    font_title = Font(name="微软雅黑", size=18, bold=True)
-    font_header = Font(name="微软雅黑", size=11, bold=True)
-    font_content = Font(name="微软雅黑", size=10)
-    alignment_center = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"), bottom=Side(style="thin"))
-    header_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+    Returns:
+        (total_matches, target_matches, max_possible_matches, total_available_games)
+    """
+    # Calculate actual available player-games against the requested courts and rounds
+    target_matches = (rounds or MATCHES_PER_COURT) * court_count
+    total_available_games = 0
+    for p in all_players:
+        # Use dynamic fixed_games calculation based on court availability
+        fixed_games = get_fixed_games_for_player(p, target_matches, len(all_players))
+        if fixed_games is not None:
+            total_available_games += fixed_games
+        else:
+            total_available_games += get_max_games_for_player(p)
+
+    # Each match requires 4 player-games
+    max_possible_matches = total_available_games // 4
+    total_matches = min(max_possible_matches, target_matches)
+    return total_matches, target_matches, max_possible_matches, total_available_games
+
+
+def schedule_objective(
+    matches: List[Dict], total_matches: int, players: List[str], females: List[str]
+) -> float:
+    """
+    Fairness objective of a schedule (lower is better).
+
+    Components:
+    - 场次方差：非固定场次球员的场次方差
+    - 连续轮空：每个球员最长连续轮空超过 1 轮的部分
+    - 类型偏差：混双/男双/女双场次与目标的偏差
+    - 固定场次未完成、比赛数不足：重罚
+    """
+    matrices = ScheduleMatrices(matches, players)
+    type_counts = matrices.type_counts
+
+    free_games = []
+    fixed_shortfall = 0
+    bye_penalty = 0
+    for pid, p in enumerate(players):
+        games = matrices.games[pid]
+        fixed_games = get_fixed_games_for_player(p, total_matches, len(players))
+        if fixed_games is not None:
+            fixed_shortfall += max(0, fixed_games - games)
+            continue
+        free_games.append(games)
+        longest = longest_zero_run(matrices.incidence[pid], matrices.round_count)
+        bye_penalty += max(0, longest - 1)
+
+    mean = sum(free_games) / len(free_games) if free_games else 0
+    variance = sum((g - mean) ** 2 for g in free_games) / len(free_games) if free_games else 0
+
+    targets = get_type_targets(total_matches, len(females))
+    type_deviation = sum(abs(type_counts[t] - targets[t]) for t in targets)
+
+    missing_matches = max(0, total_matches - len(matches))
+
+    return (variance * 10 + bye_penalty * 5 + type_deviation * 2
+            + fixed_shortfall * 100 + missing_matches * 20)
+
+
+def schedule_with_seed(
+    seed: int, males: List[str], females: List[str], total_matches: int, court_count: int,
+    season=None, weights: Optional[ScoringWeights] = None
+) -> Tuple[float, int, List[Dict]]:
+    """Run one seeded schedule; returns (objective, seed, matches). Safe to run in a worker process."""
+    random.seed(seed)
+    all_players = males + females
+    matches = select_balanced_matches(
+        generate_mixed_doubles_matches(males, females),
+        generate_mens_doubles_matches(males),
+        generate_womens_doubles_matches(females),
+        total_matches, court_count, all_players, males, females, season, weights
+    )
+    return schedule_objective(matches, total_matches, all_players, females), seed, matches
+
+
+def search_best_schedule(
+    males: List[str], females: List[str], total_matches: int, court_count: int,
+    seeds: List[int], workers: int = 1, season=None, weights: Optional[ScoringWeights] = None
+) -> Tuple[float, int, List[Dict]]:
+    """
+    Run many independently seeded schedules and keep the one with the lowest objective.
+
+    With workers > 1 the seeds run in a ProcessPoolExecutor. Ties go to the smaller seed,
+    so the result only depends on the seed list.
+    """
+    args = [(seed, males, females, total_matches, court_count, season, weights) for seed in seeds]
+    if workers > 1 and len(seeds) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(schedule_with_seed, *zip(*args),
+                                        chunksize=max(1, len(seeds) // (workers * 4))))
+    else:
+        results = [schedule_with_seed(*a) for a in args]
+    return min(results, key=lambda r: (r[0], r[1]))
+
+
+def create_lineup_excel(matches: List[Dict], court_count: int, output_path: str, player_stats: Dict = None,
+                        activity_date: str = None, show_start: bool = False):
+    """Create Excel file with lineup schedule (streamed by excel_exporter, 行高 27)."""
+    excel_exporter.create_lineup_excel(matches, court_count, output_path, player_stats,
+                                       activity_date=activity_date or "", row_height=27, show_start=show_start)
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    from schedule_api import normalize_signup, schedule
+    parser = argparse.ArgumentParser(description="羽毛球排阵")
+    parser.add_argument("--seeds", type=int, default=1,
+                        help="多种子搜索：运行的种子数量，取最均衡的排阵（默认 1）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="多种子搜索使用的进程数（默认 1）")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="随机种子（默认 0，用于复现）；多种子搜索时为起始种子")
+    parser.add_argument("--backend", choices=["greedy", "exact"], default="greedy",
+                        help="排阵后端：greedy 贪心（默认）/ exact 分支定界搜索"
+                             "（以贪心结果为初始解在时限内改进；只有十人以内的小活动能证明最优）")
+    parser.add_argument("--time-budget", type=float, default=10.0,
+                        help="exact 后端的搜索时限（秒，默认 10）")
+    parser.add_argument("--anneal", type=int, default=0, metavar="ITERS",
+                        help="排阵后用模拟退火局部搜索改进的迭代次数（默认 0 = 不改进）")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="忽略排阵缓存，重新计算")
+    parser.add_argument("--courts", type=int, default=None,
+                        help="场地数（默认按人数自动决定）")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help=f"轮数，即每片场地的比赛数（默认 {MATCHES_PER_COURT}）")
+    parser.add_argument("--season", action="store_true",
+                        help="参考历史存档（data.db）：优先安排本赛季场次少的球员和没搭档过的组合")
+    parser.add_argument("--season-since", default=None, metavar="YYYY-MM-DD",
+                        help="赛季起始日期（默认统计全部历史活动）")
+    parser.add_argument("--profile", default=None, metavar="FILE[:NAME]",
+                        help="评分权重配置（TOML / JSON，见 scoring_profile.py），默认使用内置权重")
+    parser.add_argument("--start", default=None, metavar="HH:MM",
+                        help="活动开始时间：对阵表按错峰时间线（历史比分估计的比赛时长）排序，并加一列预计开始时间")
+    args = parser.parse_args(argv)
 
-    ws.merge_cells("A1:G1")
-    title = "科技球队日常训练活动 - 对阵表"
-    if activity_date:
-        title = f"科技球队日常训练活动 - 对阵表（{activity_date}）"
-    ws["A1"] = title
-    ws["A1"].font = font_title
-    ws["A1"].alignment = alignment_center
-    ws["A1"].border = border
-
-    ws.merge_cells("A2:G2")
-    ws["A2"] = f"场地数：{court_count}个 | 时长：2 小时 | 赛制：15 分/局，2 局 | 项目：男双、女双、混双"
-    ws["A2"].font = Font(name="微软雅黑", size=10)
-    ws["A2"].alignment = alignment_center
-
-    headers = ["轮次", "场地", "类型", "对阵 A", "比分 A", "比分 B", "对阵 B"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = font_header
-        cell.alignment = alignment_center
-        cell.border = border
-        cell.fill = header_fill
-
-    for row_idx, match_info in enumerate(matches, 4):
-        match_type = match_info["type"]
-        match = match_info["match"]
-        court = match_info["court"]
-        round_num = match_info.get("round", 1)  # 直接使用已存储的轮次值
-
-        ws.cell(row=row_idx, column=1, value=round_num).font = font_content
-        ws.cell(row=row_idx, column=2, value=f"{court}号").font = font_content
-        ws.cell(row=row_idx, column=3, value=match_type).font = font_content
-        ws.cell(row=row_idx, column=4, value="/".join(match[0])).font = font_content
-        ws.cell(row=row_idx, column=5, value="").font = font_content
-        ws.cell(row=row_idx, column=6, value="").font = font_content
-        ws.cell(row=row_idx, column=7, value="/".join(match[1])).font = font_content
-
-        for col in range(1, 8):
-            ws.cell(row=row_idx, column=col).alignment = alignment_center
-            ws.cell(row=row_idx, column=col).border = border
-
-    ws.column_dimensions["A"].width = 7
-    ws.column_dimensions["B"].width = 9
-    ws.column_dimensions["C"].width = 9
-    ws.column_dimensions["D"].width = 22
-    ws.column_dimensions["E"].width = 12
-    ws.column_dimensions["F"].width = 12
-    ws.column_dimensions["G"].width = 22
-
-    max_row = len(matches) + 3
-    for row in ws.iter_rows(min_row=1, max_row=max_row if max_row > 3 else 20):
-        ws.row_dimensions[row[0].row].height = 27
-
-    ws.page_setup.paperSize = 9
-    ws.page_setup.orientation = "landscape"
-    ws.page_margins.left = 0.3
-    ws.page_margins.right = 0.3
-    ws.page_margins.top = 0.5
-    ws.page_margins.bottom = 0.5
-
-    if player_stats:
-        ws_stats = wb.create_sheet(title="球员统计")
-        font_title = Font(name="微软雅黑", size=14, bold=True)
-        font_header = Font(name="微软雅黑", size=11, bold=True)
-        font_content = Font(name="微软雅黑", size=10)
-        alignment_center = Alignment(horizontal="center", vertical="center")
-        border = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"), bottom=Side(style="thin"))
-        header_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-
-        ws_stats.merge_cells("A1:E1")
-        ws_stats["A1"] = "球员参赛场次统计"
-        ws_stats["A1"].font = font_title
-        ws_stats["A1"].alignment = alignment_center
-        ws_stats["A1"].border = border
-
-        headers = ["姓名", "总场次", "男双", "女双", "混双"]
-        for col, header in enumerate(headers, 1):
-            cell = ws_stats.cell(row=2, column=col, value=header)
-            cell.font = font_header
-            cell.alignment = alignment_center
-            cell.border = border
-            cell.fill = header_fill
-
-        row = 3
-        male_players = [p for p in player_stats.keys() if p in MALE_PLAYERS]
-        female_players = [p for p in player_stats.keys() if p in FEMALE_PLAYERS]
-
-        for player in sorted(male_players):
-            stats = player_stats[player]
-            ws_stats.cell(row=row, column=1, value=player).font = font_content
-            ws_stats.cell(row=row, column=2, value=stats["total"]).font = font_content
-            ws_stats.cell(row=row, column=3, value=stats.get("男双", 0)).font = font_content
-            ws_stats.cell(row=row, column=4, value=stats.get("女双", 0)).font = font_content
-            ws_stats.cell(row=row, column=5, value=stats.get("混双", 0)).font = font_content
-            for col in range(1, 6):
-                ws_stats.cell(row=row, column=col).alignment = alignment_center
-                ws_stats.cell(row=row, column=col).border = border
-            row += 1
-
-        for player in sorted(female_players):
-            stats = player_stats[player]
-            ws_stats.cell(row=row, column=1, value=player).font = font_content
-            ws_stats.cell(row=row, column=2, value=stats["total"]).font = font_content
-            ws_stats.cell(row=row, column=3, value=stats.get("男双", 0)).font = font_content
-            ws_stats.cell(row=row, column=4, value=stats.get("女双", 0)).font = font_content
-            ws_stats.cell(row=row, column=5, value=stats.get("混双", 0)).font = font_content
-            for col in range(1, 6):
-                ws_stats.cell(row=row, column=col).alignment = alignment_center
-                ws_stats.cell(row=row, column=col).border = border
-            row += 1
-
-        ws_stats.column_dimensions["A"].width = 12
-        ws_stats.column_dimensions["B"].width = 10
-        ws_stats.column_dimensions["C"].width = 10
-        ws_stats.column_dimensions["D"].width = 10
-        ws_stats.column_dimensions["E"].width = 10
-
-    wb.save(output_path)
-    print(f"对阵表已生成：{output_path}")
-
-
-def main():
     # Try multiple paths for flexibility
     possible_paths = [
         "微信接龙.txt",  # When running from 排阵 directory
@@ -854,7 +803,8 @@ def main():
     # Parse activity date
     activity_date = parse_activity_date(signup_text)
     
-    males, females = parse_signup(signup_text)
+    # 规范化报名：只保留名单中的球员，按名单顺序排列，保证结果可复现
+    males, females = normalize_signup(signup_text)
     all_players = males + females
     total_players = len(all_players)
 
@@ -864,33 +814,16 @@ def main():
     if activity_date:
         print(f"活动日期：{activity_date}")
 
-    court_count = get_court_count(total_players)
+    court_count = args.courts or get_court_count(total_players)
+    rounds = args.rounds or MATCHES_PER_COURT
     print(f"场地数量：{court_count}个")
 
-    mixed_matches = generate_mixed_doubles_matches(males, females)
-    mens_matches = generate_mens_doubles_matches(males)
-    womens_matches = generate_womens_doubles_matches(females)
-
-    # Calculate actual available player-games
-    court_count_temp = get_court_count(len(all_players))
-    target_matches_temp = MATCHES_PER_COURT * court_count_temp
-    total_available_games = 0
-    for p in all_players:
-        constraint = PLAYER_CONSTRAINTS.get(p, {})
-        # Use dynamic fixed_games calculation based on court availability
-        fixed_games = get_fixed_games_for_player(p, target_matches_temp, len(all_players))
-        if fixed_games is not None:
-            total_available_games += fixed_games
-        else:
-            total_available_games += get_max_games_for_player(p)
-
-    # Each match requires 4 player-games
-    max_possible_matches = total_available_games // 4
-    target_matches = MATCHES_PER_COURT * court_count
-    total_matches = min(max_possible_matches, target_matches)
+    total_matches, target_matches, max_possible_matches, total_available_games = get_total_matches(
+        all_players, court_count, rounds
+    )
 
     print(f"\n配置参数:")
-    print(f"  - 每场地比赛数：{MATCHES_PER_COURT}场")
+    print(f"  - 每场地比赛数：{rounds}场")
     print(f"  - 可用总人次：{total_available_games}")
     print(f"  - 理论最大比赛数：{max_possible_matches}场")
     print(f"  - 目标比赛数：{target_matches}场")
@@ -898,9 +831,33 @@ def main():
     print(f"  - 内部员工最大场次：{MAX_GAMES_INTERNAL}场")
     print(f"  - 外援球员最大场次：{MAX_GAMES_GUEST}场（优先保障内部员工）")
 
-    selected_matches = select_balanced_matches(
-        mixed_matches, mens_matches, womens_matches, total_matches, court_count, all_players, males, females
-    )
+    config = {"backend": args.backend, "seeds": args.seeds, "anneal": args.anneal,
+              "time_budget": args.time_budget, "court_count": court_count, "rounds": rounds, "workers": args.workers,
+              "season": args.season, "season_since": args.season_since}
+    if args.profile:
+        from scoring_profile import load_profile, weight_overrides
+        config["weights"] = weight_overrides(load_profile(args.profile))
+    seed = args.seed if args.seed is not None else 0
+    result = schedule(signup_text, config, seed, use_cache=not args.no_cache)
+    selected_matches = result["matches"]
+
+    print(f"\n排阵结果:")
+    if result["cached"]:
+        print(f"  - 使用缓存（报名、约束、配置与种子均未变化）")
+    if args.seeds > 1:
+        print(f"  - 多种子搜索：{args.seeds}个种子，最优种子 {result['best_seed']}")
+        print(f"  - 复现：python lineup_scheduler.py --seeds 1 --seed {result['best_seed']}")
+    else:
+        print(f"  - 随机种子：{seed}")
+    if args.backend == "exact":
+        print(f"  - 分支定界搜索（时限 {args.time_budget:.0f} 秒，以贪心结果为初始解）")
+    if args.anneal > 0:
+        print(f"  - 模拟退火局部搜索：{args.anneal} 次迭代")
+    if args.profile:
+        print(f"  - 评分配置：{args.profile}（{config['weights'] or '与默认权重相同'}）")
+    if args.season:
+        print(f"  - 赛季均衡：{'已参考历史存档' if result['season'] else '未找到历史存档，按单次活动排阵'}")
+    print(f"  - 目标值：{result['objective']:.2f}（越低越均衡）")
 
     from collections import Counter
     match_type_counts = Counter()
@@ -935,27 +892,19 @@ def main():
             round_players.update(players_in_match)
         print(f"  本轮球员 ({len(round_players)}人): {', '.join(sorted(round_players))}")
         # 计算轮空球员（排除提前走的人）
-        round_bye_players = [p for p in all_players if p not in round_players and not PLAYER_CONSTRAINTS.get(p, {}).get("early_departure")]
+        round_bye_players = [p for p in all_players if p not in round_players and not ROSTER.is_early_departure(p)]
         if round_bye_players:
             print(f"  本轮轮空 ({len(round_bye_players)}人): {', '.join(sorted(round_bye_players))}")
     
     print("\n✓ 核心规则检查通过：无球员在同一轮次重复出现")
 
     print(f"\n球员参赛场次统计:")
-    player_games = {}
-    player_type_games = {}
-    for m in selected_matches:
-        match_type = m["type"]
-        # 处理 fallback 类型：提取基础类型（男双/女双/混双）
-        base_type = match_type.split(" ")[0]  # "男双 (临时)" -> "男双", "混双 (男代)" -> "混双"
-        for player in get_match_players(m["match"]):
-            player_games[player] = player_games.get(player, 0) + 1
-            if player not in player_type_games:
-                player_type_games[player] = {"男双": 0, "女双": 0, "混双": 0}
-            player_type_games[player][base_type] += 1
+    # fallback 类型按基础类型统计："男双 (临时)" -> "男双", "混双 (男代)" -> "混双"
+    matrices = ScheduleMatrices(selected_matches, all_players)
+    player_stats = matrices.player_stats(all_players)
 
     for player in sorted(all_players):
-        games = player_games.get(player, 0)
+        games = player_stats[player]["total"]
         # Use dynamic fixed_games calculation for display
         fixed_games = get_fixed_games_for_player(player, total_matches, len(all_players))
         note = ""
@@ -964,21 +913,16 @@ def main():
                 note = f" (已完成{fixed_games}场)"
             elif games < fixed_games:
                 note = f" (目标{fixed_games}场，还差{fixed_games - games}场)"
-        if PLAYER_CONSTRAINTS.get(player, {}).get("early_departure"):
+        if ROSTER.is_early_departure(player):
             note += " [需提前离场]"
-        type_stats = player_type_games.get(player, {"男双": 0, "女双": 0, "混双": 0})
+        type_stats = player_stats[player]
         type_str = f"(男{type_stats['男双']}/女{type_stats['女双']}/混{type_stats['混双']})"
         print(f"  - {player}: {games}场 {type_str}{note}")
 
-    player_stats = {}
-    for player in all_players:
-        type_stats = player_type_games.get(player, {"男双": 0, "女双": 0, "混双": 0})
-        player_stats[player] = {
-            "total": player_games.get(player, 0),
-            "男双": type_stats["男双"],
-            "女双": type_stats["女双"],
-            "混双": type_stats["混双"]
-        }
+    metrics = matrices.metrics(all_players)
+    print(f"\n均衡性指标:")
+    print(f"  - 场次方差：{metrics['games_variance']:.2f}，最长连续轮空：{metrics['max_bye_streak']}轮")
+    print(f"  - 重复搭档：{metrics['partner_repeats']}次，重复对手：{metrics['opponent_repeats']}次")
 
     # Try multiple paths for flexibility
     possible_output_paths = [
@@ -999,9 +943,16 @@ def main():
         except (IOError, OSError):
             continue
     
+    export_matches = selected_matches
+    if args.start and selected_matches:
+        from court_timeline import load_duration_model, parse_clock, timeline_schedule
+        export_matches = timeline_schedule(selected_matches, court_count, load_duration_model(),
+                                           parse_clock(args.start))
+        print(f"\n错峰时间线：{args.start} 开始，预计 {export_matches[-1]['start_time']} 开始最后一场")
+
     create_lineup_excel(
-        selected_matches, court_count, output_path, player_stats,
-        activity_date=activity_date
+        export_matches, court_count, output_path, player_stats,
+        activity_date=activity_date, show_start=bool(args.start)
 )
 
 
@@ -5,6 +5,7 @@ Uses structured reasoning to generate balanced matchups.
 This is an alternative approach to the traditional algorithm.
 """
 
+import heapq
 import json
 import random
 from typing import List, Tuple, Dict, Optional
@@ -12,38 +13,29 @@ from collections import defaultdict
 
 # Import shared utilities
 from excel_exporter import (
-    INTERNAL_MALE_PLAYERS, GUEST_MALE_PLAYERS, MALE_PLAYERS,
-    INTERNAL_FEMALE_PLAYERS, GUEST_FEMALE_PLAYERS, FEMALE_PLAYERS,
     create_lineup_excel, calculate_player_stats, parse_activity_date,
     get_max_games_for_player, get_fixed_games_for_player, generate_mixed_vs_mens_matches
 )
-
-# Mixed doubles eligible male players (internal only)
-MIXED_DOUBLES_MALES = {"林锋", "王小波", "陈顺星", "罗琴荩", "罗蒙"}
-
-# Player-specific constraints
-# fixed_games: None = 自动根据场地紧张程度计算，整数 = 固定场次
-PLAYER_CONSTRAINTS = {
-    "严勇文": {"fixed_games": None, "early_departure": True},
-    "崔倩男": {"fixed_games": None, "early_departure": True},
-    "林小连": {"only_womens_doubles": True},
-}
-
-# Fixed partner pairs
-FIXED_PARTNERS = {
-}
+from lineup_scheduler import MATCHES_PER_COURT, get_court_count
+from match_pool import iter_doubles_matches, iter_mixed_doubles_matches
+from scoring_profile import DEFAULT_WEIGHTS, ScoringWeights, player_score
+from roster import (
+    ROSTER, INTERNAL_MALE_PLAYERS, GUEST_MALE_PLAYERS, MALE_PLAYERS,
+    INTERNAL_FEMALE_PLAYERS, GUEST_FEMALE_PLAYERS, FEMALE_PLAYERS,
+    MIXED_DOUBLES_MALES, PLAYER_CONSTRAINTS, FIXED_PARTNERS,
+)
 
 # Global config
-MATCHES_PER_COURT = 8
+# MATCHES_PER_COURT and get_court_count are shared with lineup_scheduler (场地数随人数扩展)
 # MAX_GAMES_INTERNAL and MAX_GAMES_GUEST are now in excel_exporter.py
 
 
 def is_internal_player(player: str) -> bool:
-    return player in INTERNAL_MALE_PLAYERS or player in INTERNAL_FEMALE_PLAYERS
+    return ROSTER.is_internal(player)
 
 
 def is_guest_player(player: str) -> bool:
-    return player in GUEST_MALE_PLAYERS or player in GUEST_FEMALE_PLAYERS
+    return ROSTER.is_guest(player)
 
 
 def get_match_players(match) -> set:
@@ -57,6 +49,92 @@ def get_pair_key(p1: str, p2: str) -> tuple:
     return tuple(sorted([p1, p2]))
 
 
+class MatchQueue:
+    """
+    One candidate pool as a lazily-invalidated priority queue.
+
+    Heap entries are (priority, position, stamp, idx); position is the match's
+    place in the shuffled pool, so ties resolve exactly like a scan of the
+    pool. A match's priority only depends on its players' game counts, and
+    every player carries a version that goes up whenever their count changes.
+    ``stamp`` is the sum of the four versions at push time, so an entry whose
+    stamp differs from the current sum is stale: when it reaches the top it is
+    re-scored and pushed back instead of being returned.
+
+    Re-scoring on pop is exact when priorities never decrease as games are
+    played (true for the default weights, where every extra game makes a
+    player less urgent): a stale key is then a lower bound. For weight
+    profiles without that property (``monotone=False``) the matches of the
+    players who just played are re-queued eagerly in ``refresh``.
+
+    Entries that cannot be played in the current round are set aside and
+    return to the heap when the round is recorded.
+    """
+
+    def __init__(self, pool: List, priority, versions: Dict[str, int], monotone: bool = True):
+        self.matches = list(pool)  # 位置固定的副本（调度器会从原列表中删除已选比赛）
+        self.priority = priority
+        self.versions = versions
+        self.monotone = monotone
+        self.players = [tuple(get_match_players(m)) for m in self.matches]
+        self.index = {m: i for i, m in enumerate(self.matches)}
+        self.by_player = defaultdict(list)
+        if not monotone:
+            for i, players in enumerate(self.players):
+                for p in players:
+                    self.by_player[p].append(i)
+        self.taken = [False] * len(self.matches)
+        self.deferred = []
+        self.heap = [(priority(m, self.players[i]), i, self._stamp(i), i)
+                     for i, m in enumerate(self.matches)]
+        heapq.heapify(self.heap)
+
+    def _stamp(self, i: int) -> int:
+        versions = self.versions
+        return sum(versions[p] for p in self.players[i])
+
+    def best(self, can_add) -> Optional[Tuple]:
+        """Highest-priority match that ``can_add`` accepts, or None."""
+        heap = self.heap
+        while heap:
+            entry = heap[0]
+            i = entry[3]
+            if self.taken[i]:
+                heapq.heappop(heap)
+                continue
+            stamp = self._stamp(i)
+            if entry[2] != stamp:
+                if self.monotone:
+                    heapq.heapreplace(heap, (self.priority(self.matches[i], self.players[i]), i, stamp, i))
+                else:
+                    heapq.heappop(heap)  # refresh 已经放入了新的评分
+                continue
+            if not can_add(self.matches[i]):
+                # 本轮有球员已上场（或已达场次上限）：本轮不再考虑
+                self.deferred.append(heapq.heappop(heap))
+                continue
+            return self.matches[i]
+        return None
+
+    def take(self, match) -> None:
+        self.taken[self.index[match]] = True
+
+    def refresh(self, changed_players) -> None:
+        """End of round: restore the set-aside entries (and re-queue eagerly for non-monotone weights)."""
+        heap = self.heap
+        for entry in self.deferred:
+            heapq.heappush(heap, entry)
+        self.deferred = []
+        if not self.monotone:
+            affected = set()
+            for p in changed_players:
+                affected.update(self.by_player.get(p, ()))
+            for i in affected:
+                if not self.taken[i]:
+                    heapq.heappush(heap, (self.priority(self.matches[i], self.players[i]),
+                                          i, self._stamp(i), i))
+
+
 class LLMLineupScheduler:
     """
     LLM-based lineup scheduler using structured reasoning.
@@ -68,17 +146,19 @@ class LLMLineupScheduler:
     4. Validate and adjust
     """
     
-    def __init__(self, males: List[str], females: List[str], court_count: int, total_players: int):
+    def __init__(self, males: List[str], females: List[str], court_count: int, total_players: int,
+                 weights: Optional[ScoringWeights] = None, rounds: Optional[int] = None):
         self.males = males
         self.females = females
         self.all_players = males + females
         self.court_count = court_count
         self.total_players = total_players
+        self.weights = weights or DEFAULT_WEIGHTS  # 评分权重（scoring_profile）
 
         # Calculate actual available player-games
         # For players with dynamic fixed_games (None), estimate using average
         total_available_games = 0
-        target_matches = MATCHES_PER_COURT * court_count
+        target_matches = (rounds or MATCHES_PER_COURT) * court_count  # 轮数默认 MATCHES_PER_COURT
         for p in self.all_players:
             constraint = PLAYER_CONSTRAINTS.get(p, {})
             fixed_games = constraint.get("fixed_games")
@@ -94,8 +174,18 @@ class LLMLineupScheduler:
         max_possible_matches = total_available_games // 4
         self.total_matches = min(max_possible_matches, target_matches)
 
+        # 每名球员的固定场次与最大场次在排阵过程中不变，预先计算
+        self.fixed_games_map = {p: get_fixed_games_for_player(p, court_count, total_players, self.total_matches)
+                                for p in self.all_players}
+        self.max_games_map = {p: get_max_games_for_player(p, court_count, total_players) for p in self.all_players}
+
         # State tracking
         self.player_games = {p: 0 for p in self.all_players}
+        # 球员版本号：场次变化时加一，候选队列据此识别过期的评分
+        self.player_versions = {p: 0 for p in self.all_players}
+        self.player_scores = {}
+        self.partner_terms = {}
+        self.queues = {}
         self.partner_games = {pair: 0 for pair in FIXED_PARTNERS}
         self.scheduled_matches = []
         self.rounds = []
@@ -121,51 +211,22 @@ class LLMLineupScheduler:
     
     def _generate_mixed_doubles_matches(self) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
         """Generate all possible mixed doubles matches."""
-        import itertools
-        mixed_males = [m for m in self.males if m in MIXED_DOUBLES_MALES]
+        mixed_males = [m for m in self.males if ROSTER.is_mixed_eligible(m)]
         
         # Filter females who can play mixed (exclude only_womens_doubles if enough females)
         can_play_womens_doubles = len(self.females) >= 4
         mixed_females = [f for f in self.females
-                        if not PLAYER_CONSTRAINTS.get(f, {}).get("only_womens_doubles")
-                        or not can_play_womens_doubles]
-        
-        matches = []
-        for male_pair in itertools.combinations(mixed_males, 2):
-            for female_pair in itertools.combinations(mixed_females, 2):
-                match = ((male_pair[0], female_pair[0]), (male_pair[1], female_pair[1]))
-                matches.append(match)
+                        if not ROSTER.is_only_womens_doubles(f) or not can_play_womens_doubles]
         
-        return matches
+        return list(iter_mixed_doubles_matches(mixed_males, mixed_females))
     
     def _generate_mens_doubles_matches(self) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
         """Generate all possible men's doubles matches."""
-        import itertools
-        matches = []
-        for pair1 in itertools.combinations(self.males, 2):
-            remaining = [m for m in self.males if m not in pair1]
-            if len(remaining) < 2:
-                continue
-            for pair2 in itertools.combinations(remaining, 2):
-                match = (pair1, pair2)
-                matches.append(match)
-        return matches
+        return list(iter_doubles_matches(self.males))
     
     def _generate_womens_doubles_matches(self) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
         """Generate all possible women's doubles matches."""
-        import itertools
-        matches = []
-        if len(self.females) < 4:
-            return matches
-        
-        for pair1 in itertools.combinations(self.females, 2):
-            remaining = [f for f in self.females if f not in pair1]
-            if len(remaining) < 2:
-                continue
-            for pair2 in itertools.combinations(remaining, 2):
-                match = (pair1, pair2)
-                matches.append(match)
-        return matches
+        return list(iter_doubles_matches(self.females))
     
     def _get_constraint(self, player: str) -> dict:
         """Get player constraints."""
@@ -178,11 +239,9 @@ class LLMLineupScheduler:
         【Core Rule】Each player can only appear once per round across all courts!
         【Fixed Games Rule】Players with fixed_games constraint CANNOT exceed their fixed games.
         """
-        constraint = self._get_constraint(player)
-        # Use dynamic fixed_games calculation based on court availability
-        fixed_games = get_fixed_games_for_player(player, self.court_count, self.total_players, self.total_matches)
-        max_games = get_max_games_for_player(player, self.court_count, self.total_players)
-        early_departure = constraint.get("early_departure")
+        # Dynamic fixed_games calculation based on court availability (precomputed)
+        fixed_games = self.fixed_games_map[player]
+        max_games = self.max_games_map[player]
 
         # 【Fixed Games Rule】Strictly enforce fixed_games limit
         # Players with fixed_games CANNOT exceed their fixed games (no exception for byes)
@@ -218,7 +277,7 @@ class LLMLineupScheduler:
 
         return True
 
-    def _calculate_match_priority(self, match, match_type: str, round_num: int) -> float:
+    def _calculate_match_priority(self, match, match_type: str, round_num: int, players=None) -> float:
         """
         Calculate match priority score (lower is better).
 
@@ -229,71 +288,64 @@ class LLMLineupScheduler:
         4. Players with consecutive byes (anti-cold rule)
         5. Guest players (lower priority)
         6. Fixed partner combinations
-        """
-        match_players = get_match_players(match)
-        scores = []
-        active_games = [g for p, g in self.player_games.items() if g > 0]
-        avg_games = sum(active_games) / len(active_games) if active_games else 0
-
-        TARGET_GAMES = 5
 
-        for player in match_players:
-            constraint = self._get_constraint(player)
-            games = self.player_games[player]
-            # Use dynamic fixed_games calculation
-            fixed_games = get_fixed_games_for_player(player, self.court_count, self.total_players, self.total_matches)
-            max_games = get_max_games_for_player(player, self.court_count, self.total_players)
-            score = 0.0
-
-            # Priority 1: FORBIDDEN if already reached fixed_games (huge penalty)
-            if fixed_games is not None and games >= fixed_games:
-                score += 10000  # Huge penalty - should not be selected
-
-            # Priority 2: Fixed games requirement (unfinished = large penalty)
-            if fixed_games is not None:
-                remaining = fixed_games - games
-                if remaining > 0:
-                    score -= remaining * 1000
-
-            # Priority 3: Below target games
-            if games < TARGET_GAMES:
-                score -= (TARGET_GAMES - games) * 200
-            elif games >= max_games:
-                score += 2000  # Reached max, high penalty
-            else:
-                score += (games - TARGET_GAMES) * 100
-
-            # Priority 4: Guest players (lower priority)
-            if is_guest_player(player):
-                score += 50
-
-            scores.append(score)
-
-        # Priority 6: Fixed partners
-        pair_a, pair_b = match
-        for pair in [pair_a, pair_b]:
-            pair_key = get_pair_key(pair[0], pair[1])
-            if pair_key in FIXED_PARTNERS:
-                weight = FIXED_PARTNERS[pair_key]
-                scores.append(-weight * 30)
+        ``players`` may pass the match's players when the caller already has them.
+        """
+        # Priorities 1-4: forbidden / fixed games / target games / guest (see scoring_profile.player_score)
+        scores = [self._player_priority(player) for player in (players or get_match_players(match))]
+
+        # Priority 6: Fixed partners (depends only on the match itself, cached)
+        partner_terms = self.partner_terms.get(match)
+        if partner_terms is None:
+            partner_terms = []
+            for pair in match:
+                pair_key = get_pair_key(pair[0], pair[1])
+                if pair_key in FIXED_PARTNERS:
+                    partner_terms.append(-FIXED_PARTNERS[pair_key] * self.weights.fixed_partner)
+            self.partner_terms[match] = partner_terms
+        scores.extend(partner_terms)
 
         return sum(scores) / len(scores) if scores else float('inf')
     
+    def _player_priority(self, player: str) -> float:
+        """A player's share of the match priority; cached until their game count changes."""
+        score = self.player_scores.get(player)
+        if score is None:
+            score = player_score(self.weights, self.player_games[player], self.fixed_games_map[player],
+                                 self.max_games_map[player], is_guest_player(player))
+            self.player_scores[player] = score
+        return score
+
+    def _scores_monotone(self) -> bool:
+        """Whether every player's priority is non-decreasing in games played (lazy re-scoring is exact)."""
+        for p in self.all_players:
+            args = (self.fixed_games_map[p], self.max_games_map[p], is_guest_player(p))
+            scores = [player_score(self.weights, g, *args) for g in range(self.max_games_map[p] + 2)]
+            if any(b < a for a, b in zip(scores, scores[1:])):
+                return False
+        return True
+
+    def _build_queues(self, pools: List[Tuple[List, str]]):
+        """One priority queue per (shuffled) pool, keyed by the pool object."""
+        round_num = len(self.rounds) + 1
+        monotone = self._scores_monotone()
+        for pool, match_type in pools:
+            self.queues[id(pool)] = MatchQueue(
+                pool, lambda m, players, t=match_type: self._calculate_match_priority(m, t, round_num, players),
+                self.player_versions, monotone)
+
     def _select_best_match(self, pool: List, match_type: str, current_round_matches: List[Dict]) -> Optional[Tuple]:
-        """Select the best match from a pool for the current round."""
-        best_match = None
-        best_score = float('inf')
-        
-        for match in pool:
-            if not self._can_add_match(match, current_round_matches, match_type):
-                continue
-            
-            score = self._calculate_match_priority(match, match_type, len(self.rounds) + 1)
-            if score < best_score:
-                best_score = score
-                best_match = match
-        
-        return best_match
+        """Select the best match from a pool for the current round (log-time via the pool's queue)."""
+        queue = self.queues.get(id(pool))
+        if queue is None:
+            self._build_queues([(pool, match_type)])
+            queue = self.queues[id(pool)]
+        return queue.best(lambda m: self._can_add_match(m, current_round_matches, match_type))
+
+    def _take_match(self, pool: List, match) -> None:
+        """Remove a scheduled match from its pool."""
+        pool.remove(match)
+        self.queues[id(pool)].take(match)
     
     def _update_player_history(self, round_matches: List[Dict]):
         """Update player game counts after a round."""
@@ -302,6 +354,8 @@ class LLMLineupScheduler:
             played_players.update(get_match_players(m["match"]))
             for player in get_match_players(m["match"]):
                 self.player_games[player] += 1
+                self.player_versions[player] += 1
+                self.player_scores.pop(player, None)
 
             # Update partner games
             pair_a, pair_b = m["match"]
@@ -309,6 +363,9 @@ class LLMLineupScheduler:
                 pair_key = get_pair_key(pair[0], pair[1])
                 if pair_key in self.partner_games:
                     self.partner_games[pair_key] += 1
+
+        for queue in self.queues.values():
+            queue.refresh(played_players)
     
     def _get_match_type_display(self, base_type: str, is_fallback: bool = False) -> str:
         """Get display name for match type."""
@@ -344,6 +401,8 @@ class LLMLineupScheduler:
         random.shuffle(self.mens_pool)
         random.shuffle(self.womens_pool)
         random.shuffle(self.mixed_vs_mens_pool)
+        self._build_queues([(self.mixed_pool, "混双"), (self.mens_pool, "男双"),
+                            (self.womens_pool, "女双"), (self.mixed_vs_mens_pool, "混双 (vs 男双)")])
 
         # Check if we need mixed vs men's doubles (few female players)
         # This is a LAST RESORT option, not preferred
@@ -409,7 +468,7 @@ class LLMLineupScheduler:
                             "match": best_match,
                             "fallback": is_fallback
                         })
-                        pool.remove(best_match)
+                        self._take_match(pool, best_match)
 
                         if type_name == "mixed":
                             mixed_used += 1
@@ -432,7 +491,7 @@ class LLMLineupScheduler:
                             "match": best_match,
                             "fallback": True
                         })
-                        self.mens_pool.remove(best_match)
+                        self._take_match(self.mens_pool, best_match)
                         mens_used += 1
                         added = True
                 
@@ -446,7 +505,7 @@ class LLMLineupScheduler:
                             "match": best_match,
                             "fallback": True
                         })
-                        self.mixed_vs_mens_pool.remove(best_match)
+                        self._take_match(self.mixed_vs_mens_pool, best_match)
                         mixed_vs_mens_used += 1
                         added = True
                 # Emergency: create临时 match from available players
@@ -470,8 +529,8 @@ class LLMLineupScheduler:
                     
                     if len(candidates) >= 4:
                         selected = random.sample(candidates, 4)
-                        females_in_selected = [p for p in selected if p in FEMALE_PLAYERS]
-                        males_in_selected = [p for p in selected if p not in FEMALE_PLAYERS]
+                        females_in_selected = [p for p in selected if ROSTER.is_female(p)]
+                        males_in_selected = [p for p in selected if not ROSTER.is_female(p)]
                         
                         if len(females_in_selected) >= 2 and len(males_in_selected) >= 2:
                             pair1 = (females_in_selected[0], females_in_selected[1])
@@ -543,21 +602,14 @@ def parse_signup(signup_text: str) -> Tuple[List[str], List[str]]:
         if "." in name or "," in name:
             name = name.split(".", 1)[-1].split(",", 1)[-1].strip()
         
-        if name in MALE_PLAYERS:
+        if ROSTER.is_male(name):
             males.append(name)
-        elif name in FEMALE_PLAYERS:
+        elif ROSTER.is_female(name):
             females.append(name)
     
     return males, females
 
 
-def get_court_count(total_players: int) -> int:
-    """Determine number of courts based on player count."""
-    if total_players <= 12:
-        return 2
-    return 3
-
-
 def main():
     """Main entry point for LLM scheduler."""
     # Try multiple paths for flexibility
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Local Search Improvement
+Simulated annealing over a finished schedule (e.g. from select_balanced_matches).
+
+Neighborhoods, all inside a single round so the core rule (每轮每人最多一场)
+is checked locally:
+- substitute: 用本轮轮空的同性别球员替换一名上场球员
+- swap players: 同一轮两场比赛之间交换两名同性别球员
+- swap partners: 同一场比赛内重新搭档
+- retype: 改变一场比赛的类型（混双/男双/女双），不足的位置由本轮轮空球员补上
+
+The energy is lineup_scheduler.schedule_objective plus a small penalty for
+repeated partnerships. Every aggregate it depends on (sum / sum of squares
+of games, per-player played-round bitmasks, type counts, partner counts) is
+kept incrementally, so a move is scored by touching only the at most eight
+players and four pairs it changes.
+"""
+
+import math
+import random
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lineup_scheduler import (
+    get_fixed_games_for_player, get_max_games_for_player, get_type_targets, schedule_objective,
+)
+from roster import ROSTER
+
+
+# 重复搭档的惩罚权重（每多搭档一次）
+PARTNER_REPEAT_WEIGHT = 1.0
+
+# 默认迭代次数与温度区间
+DEFAULT_ITERATIONS = 20000
+START_TEMPERATURE = 2.0
+END_TEMPERATURE = 0.01
+
+# 每种比赛类型的两队性别构成（True = 女）
+TYPE_GENDERS = {
+    "混双": (False, True, False, True),
+    "男双": (False, False, False, False),
+    "女双": (True, True, True, True),
+}
+
+
+def _pairs(ids: Tuple[int, int, int, int]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    a, b, c, d = ids
+    return (a, b) if a < b else (b, a), (c, d) if c < d else (d, c)
+
+
+class LocalSearchImprover:
+    """
+    Simulated-annealing improver for a complete schedule.
+
+    Usage:
+        improver = LocalSearchImprover(matches, males, females, total_matches, seed=1)
+        matches, stats = improver.run(iterations=20000)
+    """
+
+    def __init__(self, matches: List[Dict], males: List[str], females: List[str],
+                 total_matches: int, seed: Optional[int] = None,
+                 frozen_rounds: int = 0, inactive: Iterable[str] = (), late: Iterable[str] = ()):
+        """
+        Args:
+            frozen_rounds: 前 N 轮已打完或已打印，run() 不再改动
+            inactive: 已退出的球员：不计入均衡性，也不会被换上场
+            late: 冻结轮次之后才加入的球员：冻结轮次不算轮空
+        """
+        inactive, late = set(inactive), set(late)
+        self.players = males + females
+        self.females = [p for p in females if p not in inactive]
+        self.total_matches = total_matches
+        self.frozen_rounds = frozen_rounds
+        self.rng = random.Random(seed)
+
+        ids = {p: i for i, p in enumerate(self.players)}
+        n = len(self.players)
+        female_set = set(females)
+        self.is_female = [p in female_set for p in self.players]
+        self.inactive = [p in inactive for p in self.players]
+        n_active = n - sum(self.inactive)
+        # 已退出的球员固定为 0 场：不参与方差与轮空，cap 为 0 保证不会被换上场
+        self.fixed = [0 if self.inactive[pid] else get_fixed_games_for_player(p, total_matches, n_active)
+                      for pid, p in enumerate(self.players)]
+        self.caps = [get_max_games_for_player(p) if self.fixed[pid] is None
+                     else min(get_max_games_for_player(p), self.fixed[pid])
+                     for pid, p in enumerate(self.players)]
+        self.free = [f is None for f in self.fixed]
+        self.n_free = sum(self.free)
+        # 只打女双的限制仅在女生足够组成女双时生效（与 generate_mixed_doubles_matches 一致）
+        can_play_womens_doubles = len(self.females) >= 4
+        self.only_womens = [can_play_womens_doubles and ROSTER.is_only_womens_doubles(p) for p in self.players]
+        self.mixed_ok = [self.is_female[pid] or ROSTER.is_mixed_eligible(p) for pid, p in enumerate(self.players)]
+        self.by_gender = {False: [pid for pid in range(n) if not self.is_female[pid]],
+                          True: [pid for pid in range(n) if self.is_female[pid]]}
+        self.targets = get_type_targets(total_matches, len(self.females))
+
+        # 轮次结构：每场比赛为 [类型标签, fallback, (a, b, c, d)]，两队为 (a, b) 与 (c, d)
+        round_count = max((m["round"] for m in matches), default=0)
+        self.rounds: List[List[list]] = [[] for _ in range(round_count)]
+        for m in sorted(matches, key=lambda m: (m["round"], m["court"])):
+            (a, b), (c, d) = m["match"]
+            self.rounds[m["round"] - 1].append([m["type"], m.get("fallback", False),
+                                                (ids[a], ids[b], ids[c], ids[d])])
+
+        @lru_cache(maxsize=None)
+        def bye_cost(mask: int) -> int:
+            """Bye penalty of a played-round bitmask: max(0, 最长连续轮空 - 1)."""
+            streak = longest = 0
+            for r in range(round_count):
+                streak = 0 if mask >> r & 1 else streak + 1
+                longest = max(longest, streak)
+            return max(0, longest - 1)
+
+        self._bye_cost = bye_cost
+
+        self.late = [p in late for p in self.players]
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        """Rebuild every incrementally maintained aggregate from ``self.rounds``."""
+        n = len(self.players)
+        bye_cost = self._bye_cost
+        # 增量维护的聚合量
+        self.games = [0] * n
+        self.masks = [0] * n
+        self.type_counts = {t: 0 for t in self.targets}
+        self.pair_counts: Dict[Tuple[int, int], int] = {}
+        for r, round_matches in enumerate(self.rounds):
+            for label, _, members in round_matches:
+                base = label.split(" ")[0]
+                if base in self.type_counts:
+                    self.type_counts[base] += 1
+                for pid in members:
+                    self.games[pid] += 1
+                    self.masks[pid] |= 1 << r
+                for key in _pairs(members):
+                    self.pair_counts[key] = self.pair_counts.get(key, 0) + 1
+        # 迟到球员在冻结轮次视为"已上场"，避免把到场前的轮次算作连续轮空
+        frozen_mask = (1 << min(self.frozen_rounds, len(self.rounds))) - 1
+        for pid in range(n):
+            if self.late[pid]:
+                self.masks[pid] |= frozen_mask
+
+        self.sum_games = sum(g for pid, g in enumerate(self.games) if self.free[pid])
+        self.sum_squares = sum(g * g for pid, g in enumerate(self.games) if self.free[pid])
+        self.bye_total = sum(bye_cost(self.masks[pid]) for pid in range(n) if self.free[pid])
+        self.shortfall = sum(max(0, self.fixed[pid] - self.games[pid]) for pid in range(n) if not self.free[pid])
+        self.type_deviation = sum(abs(self.type_counts[t] - self.targets[t]) for t in self.targets)
+        self.repeats = sum(c - 1 for c in self.pair_counts.values() if c > 1)
+        self.match_count = sum(len(round_matches) for round_matches in self.rounds)
+        self.missing = max(0, self.total_matches - self.match_count)
+
+    # ------------------------------------------------------------------
+    # Energy
+
+    def _variance(self, sum_games: int, sum_squares: int) -> float:
+        if not self.n_free:
+            return 0.0
+        mean = sum_games / self.n_free
+        return sum_squares / self.n_free - mean * mean
+
+    def energy(self) -> float:
+        """Current objective; equals schedule_objective + partner repeats penalty."""
+        return (self._variance(self.sum_games, self.sum_squares) * 10 + self.bye_total * 5
+                + self.type_deviation * 2 + self.shortfall * 100 + self.missing * 20
+                + self.repeats * PARTNER_REPEAT_WEIGHT)
+
+    def _eligible(self, pid: int, label: str, fallback: bool) -> bool:
+        base = label.split(" ")[0]
+        if self.only_womens[pid] and (base != "女双" or fallback):
+            return False
+        if base == "混双" and not fallback and not self.mixed_ok[pid]:
+            return False
+        return True
+
+    def evaluate_move(self, r: int, changes: List[Tuple[int, list]]):
+        """
+        Score replacing matches of round ``r``: ``changes`` is [(position, new_entry)].
+
+        Returns (delta, plan) or None when the move breaks a constraint.
+        Cost is O(number of changed matches), independent of schedule size.
+        """
+        bit = 1 << r
+        game_delta: Dict[int, int] = {}
+        pair_delta: Dict[Tuple[int, int], int] = {}
+        type_delta: Dict[str, int] = {}
+        seen = set()
+        for pos, new in changes:
+            old = self.rounds[r][pos]
+            for pid in old[2]:
+                game_delta[pid] = game_delta.get(pid, 0) - 1
+            for key in _pairs(old[2]):
+                pair_delta[key] = pair_delta.get(key, 0) - 1
+            old_base = old[0].split(" ")[0]
+            type_delta[old_base] = type_delta.get(old_base, 0) - 1
+
+            for pid in new[2]:
+                if pid in seen or not self._eligible(pid, new[0], new[1]):
+                    return None
+                seen.add(pid)
+                game_delta[pid] = game_delta.get(pid, 0) + 1
+            for key in _pairs(new[2]):
+                pair_delta[key] = pair_delta.get(key, 0) + 1
+            new_base = new[0].split(" ")[0]
+            type_delta[new_base] = type_delta.get(new_base, 0) + 1
+
+        sum_games, sum_squares = self.sum_games, self.sum_squares
+        bye_total, shortfall = self.bye_total, self.shortfall
+        for pid, d in game_delta.items():
+            if not d:
+                continue
+            g = self.games[pid]
+            # 【核心规则】新上场的球员本轮不能已在其他场地
+            if d > 0 and (self.masks[pid] & bit or g + 1 > self.caps[pid]):
+                return None
+            if self.free[pid]:
+                sum_games += d
+                sum_squares += (g + d) * (g + d) - g * g
+                bye_total += self._bye_cost(self.masks[pid] ^ bit) - self._bye_cost(self.masks[pid])
+            else:
+                fixed_games = self.fixed[pid]
+                shortfall += max(0, fixed_games - g - d) - max(0, fixed_games - g)
+
+        type_deviation = self.type_deviation
+        for t, d in type_delta.items():
+            if d and t in self.targets:
+                count, target = self.type_counts[t], self.targets[t]
+                type_deviation += abs(count + d - target) - abs(count - target)
+
+        repeats = self.repeats
+        for key, d in pair_delta.items():
+            if d:
+                count = self.pair_counts.get(key, 0)
+                repeats += max(0, count + d - 1) - max(0, count - 1)
+
+        delta = ((self._variance(sum_games, sum_squares) - self._variance(self.sum_games, self.sum_squares)) * 10
+                 + (bye_total - self.bye_total) * 5 + (type_deviation - self.type_deviation) * 2
+                 + (shortfall - self.shortfall) * 100 + (repeats - self.repeats) * PARTNER_REPEAT_WEIGHT)
+        plan = (game_delta, pair_delta, type_delta,
+                sum_games, sum_squares, bye_total, shortfall, type_deviation, repeats)
+        return delta, plan
+
+    def apply_move(self, r: int, changes: List[Tuple[int, list]], plan) -> None:
+        (game_delta, pair_delta, type_delta,
+         self.sum_games, self.sum_squares, self.bye_total, self.shortfall,
+         self.type_deviation, self.repeats) = plan
+        bit = 1 << r
+        for pid, d in game_delta.items():
+            if d:
+                self.games[pid] += d
+                self.masks[pid] ^= bit
+        for key, d in pair_delta.items():
+            if d:
+                self.pair_counts[key] = self.pair_counts.get(key, 0) + d
+        for t, d in type_delta.items():
+            if t in self.type_counts:
+                self.type_counts[t] += d
+        for pos, new in changes:
+            self.rounds[r][pos] = new
+
+    def _account(self, r: int, entry: list, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one whole match of round ``r`` from every aggregate."""
+        bit = 1 << r
+        for pid in entry[2]:
+            g = self.games[pid]
+            if self.free[pid]:
+                self.sum_games += sign
+                self.sum_squares += (g + sign) * (g + sign) - g * g
+                self.bye_total += self._bye_cost(self.masks[pid] ^ bit) - self._bye_cost(self.masks[pid])
+            else:
+                fixed_games = self.fixed[pid]
+                self.shortfall += max(0, fixed_games - g - sign) - max(0, fixed_games - g)
+            self.games[pid] += sign
+            self.masks[pid] ^= bit
+        for key in _pairs(entry[2]):
+            count = self.pair_counts.get(key, 0)
+            self.repeats += max(0, count + sign - 1) - max(0, count - 1)
+            self.pair_counts[key] = count + sign
+        base = entry[0].split(" ")[0]
+        if base in self.type_counts:
+            count, target = self.type_counts[base], self.targets[base]
+            self.type_deviation += abs(count + sign - target) - abs(count - target)
+            self.type_counts[base] += sign
+        self.match_count += sign
+        self.missing = max(0, self.total_matches - self.match_count)
+
+    def drop_match(self, r: int, pos: int) -> list:
+        """Remove match ``pos`` of round ``r`` (later courts move up); returns the removed entry."""
+        entry = self.rounds[r].pop(pos)
+        self._account(r, entry, -1)
+        return entry
+
+    def can_insert(self, r: int, entry: list) -> bool:
+        """Whether ``entry`` can be added to round ``r`` without breaking a constraint."""
+        bit = 1 << r
+        members = entry[2]
+        return len(set(members)) == 4 and all(
+            not self.masks[pid] & bit and self.games[pid] < self.caps[pid]
+            and self._eligible(pid, entry[0], entry[1]) for pid in members)
+
+    def insert_match(self, r: int, entry: list) -> None:
+        """Append ``entry`` as the next court of round ``r`` (check ``can_insert`` first)."""
+        self.rounds[r].append(entry)
+        self._account(r, entry, 1)
+
+    # ------------------------------------------------------------------
+    # Neighborhoods (each returns (round, changes) or None)
+
+    def _resting_player(self, r: int, female: bool, label: str, fallback: bool,
+                        exclude=()) -> Optional[int]:
+        """Random player of the given gender who sits out round ``r`` and can still play."""
+        pool = self.by_gender[female]
+        if not pool:
+            return None
+        bit = 1 << r
+        for _ in range(8):
+            pid = pool[self.rng.randrange(len(pool))]
+            if (not self.masks[pid] & bit and self.games[pid] < self.caps[pid]
+                    and pid not in exclude and self._eligible(pid, label, fallback)):
+                return pid
+        return None
+
+    def _move_substitute(self, r: int):
+        pos = self.rng.randrange(len(self.rounds[r]))
+        label, fallback, members = self.rounds[r][pos]
+        slot = self.rng.randrange(4)
+        q = self._resting_player(r, self.is_female[members[slot]], label, fallback)
+        if q is None:
+            return None
+        new_members = members[:slot] + (q,) + members[slot + 1:]
+        return [(pos, [label, fallback, new_members])]
+
+    def _move_swap_players(self, r: int):
+        round_matches = self.rounds[r]
+        if len(round_matches) < 2:
+            return None
+        pos1, pos2 = self.rng.sample(range(len(round_matches)), 2)
+        m1, m2 = round_matches[pos1], round_matches[pos2]
+        s1, s2 = self.rng.randrange(4), self.rng.randrange(4)
+        p1, p2 = m1[2][s1], m2[2][s2]
+        if self.is_female[p1] != self.is_female[p2]:
+            return None
+        new1 = m1[2][:s1] + (p2,) + m1[2][s1 + 1:]
+        new2 = m2[2][:s2] + (p1,) + m2[2][s2 + 1:]
+        return [(pos1, [m1[0], m1[1], new1]), (pos2, [m2[0], m2[1], new2])]
+
+    def _move_swap_partners(self, r: int):
+        pos = self.rng.randrange(len(self.rounds[r]))
+        label, fallback, (a, b, c, d) = self.rounds[r][pos]
+        new_members = (a, c, b, d) if self.rng.random() < 0.5 else (a, d, b, c)
+
+        # 两队的性别构成必须保持不变（混双仍为一男一女搭档）
+        def signature(ids):
+            f = self.is_female
+            return sorted((f[ids[0]] + f[ids[1]], f[ids[2]] + f[ids[3]]))
+
+        if signature(new_members) != signature((a, b, c, d)):
+            return None
+        return [(pos, [label, fallback, new_members])]
+
+    def _move_retype(self, r: int):
+        pos = self.rng.randrange(len(self.rounds[r]))
+        label, _, members = self.rounds[r][pos]
+        base = label.split(" ")[0]
+        new_type = self.rng.choice([t for t in TYPE_GENDERS if t != base])
+        if new_type == "女双" and not self.targets.get("女双"):
+            return None
+
+        # 保留性别相符的原有球员，其余位置由本轮轮空球员补上
+        keep = {False: [], True: []}
+        for pid in members:
+            if self._eligible(pid, new_type, False):
+                keep[self.is_female[pid]].append(pid)
+        chosen = set()
+        new_members = []
+        for female in TYPE_GENDERS[new_type]:
+            if keep[female]:
+                pid = keep[female].pop(0)
+            else:
+                pid = self._resting_player(r, female, new_type, False, exclude=chosen)
+                if pid is None:
+                    return None
+            chosen.add(pid)
+            new_members.append(pid)
+        return [(pos, [new_type, False, tuple(new_members)])]
+
+    # ------------------------------------------------------------------
+
+    def to_matches(self) -> List[Dict]:
+        players = self.players
+        matches = []
+        for r, round_matches in enumerate(self.rounds):
+            round_players = set()
+            for court_idx, (label, fallback, (a, b, c, d)) in enumerate(round_matches):
+                # 【核心规则检查】每个轮次中，每个球员只能出现一次
+                for pid in (a, b, c, d):
+                    if pid in round_players:
+                        raise ValueError(f"【核心规则违规】第{r + 1}轮：球员 {players[pid]} 在同一轮次重复出现！")
+                    round_players.add(pid)
+                matches.append({
+                    "type": label,
+                    "match": ((players[a], players[b]), (players[c], players[d])),
+                    "fallback": fallback,
+                    "court": court_idx + 1,
+                    "round": r + 1,
+                })
+        return matches
+
+    def run(self, iterations: int = DEFAULT_ITERATIONS,
+            time_budget: Optional[float] = None) -> Tuple[List[Dict], Dict]:
+        """
+        Anneal for ``iterations`` moves (or until ``time_budget`` seconds pass).
+
+        Returns:
+            (best matches, stats)
+        """
+        moves = (self._move_substitute, self._move_swap_players,
+                 self._move_swap_partners, self._move_retype)
+        rounds = [r for r in range(self.frozen_rounds, len(self.rounds)) if self.rounds[r]]
+        start_energy = current = best = self.energy()
+        best_rounds = [[entry[:] for entry in rnd] for rnd in self.rounds]
+        accepted = evaluated = 0
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        started = time.perf_counter()
+        cooling = (END_TEMPERATURE / START_TEMPERATURE) ** (1 / max(1, iterations))
+        temperature = START_TEMPERATURE
+
+        executed = 0
+        for step in range(iterations if rounds else 0):
+            if deadline and step & 255 == 0 and time.perf_counter() > deadline:
+                break
+            executed += 1
+            temperature *= cooling
+            r = self.rng.choice(rounds)
+            changes = self.rng.choice(moves)(r)
+            if changes is None:
+                continue
+            result = self.evaluate_move(r, changes)
+            if result is None:
+                continue
+            evaluated += 1
+            delta, plan = result
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self.apply_move(r, changes, plan)
+                accepted += 1
+                current += delta
+                if current < best - 1e-9:
+                    best = current
+                    best_rounds = [[entry[:] for entry in rnd] for rnd in self.rounds]
+
+        # 回到最优状态：轮次结构与全部聚合量一起重建，之后可以继续 run()
+        self.rounds = best_rounds
+        self._reset_state()
+        matches = self.to_matches()
+        stats = {
+            "iterations": executed,
+            "evaluated": evaluated,
+            "accepted": accepted,
+            "seconds": time.perf_counter() - started,
+            "start_energy": start_energy,
+            "best_energy": self.energy(),
+            "objective": schedule_objective(matches, self.total_matches, self.players, self.females),
+        }
+        return matches, stats
+
+
+def improve_schedule(matches: List[Dict], males: List[str], females: List[str], total_matches: int,
+                     iterations: int = DEFAULT_ITERATIONS, seed: Optional[int] = None,
+                     time_budget: Optional[float] = None) -> Tuple[List[Dict], Dict]:
+    """Convenience wrapper around LocalSearchImprover.run."""
+    improver = LocalSearchImprover(matches, males, females, total_matches, seed=seed)
+    return improver.run(iterations, time_budget)
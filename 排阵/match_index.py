@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Candidate Index
+Array-backed index over the match pools used by the schedulers.
+
+Every match is stored once as the ids of its four players, with flat
+``array`` counters and flags (a few bytes per match, so pools of tens of
+thousands of candidates stay small). Each player keeps an inverted list of
+the matches they appear in, so blocking a player (used this round, or
+reached their game cap) invalidates all of their matches in one pass
+instead of re-checking every candidate on every court slot.
+"""
+
+from array import array
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+Match = Tuple[Tuple[str, str], Tuple[str, str]]
+
+
+class MatchIndex:
+    """
+    Candidate index shared by several match pools (混双/男双/女双...).
+
+    Each match carries a block counter: one count per blocked player in it,
+    plus one once it has been used. A match is a candidate only while its
+    counter is zero, which is mirrored in the ``available`` byte flags so
+    candidate iteration stays in C via ``itertools.compress``.
+    """
+
+    def __init__(self, players: List[str]):
+        self.player_ids: Dict[str, int] = {p: i for i, p in enumerate(players)}
+        self.players = list(players)
+        self.matches: List[Match] = []
+        self.members: List[Tuple[int, ...]] = []
+        self.pool_of: List[str] = []
+        self.blocks = array("H")
+        self.available = bytearray()
+        self.by_player: List[array] = [array("I") for _ in players]
+        self.pools: Dict[str, Tuple[int, int]] = {}
+        self.remaining: Dict[str, int] = {}
+
+    def add_pool(self, name: str, matches: Iterable[Match]) -> None:
+        """Append a pool; matches keep their iteration order inside the pool."""
+        start = len(self.matches)
+        for match in matches:
+            idx = len(self.matches)
+            ids = tuple(self.player_ids[p] for pair in match for p in pair)
+            for pid in ids:
+                self.by_player[pid].append(idx)
+            self.matches.append(match)
+            self.members.append(ids)
+            self.pool_of.append(name)
+            self.blocks.append(0)
+            self.available.append(1)
+        self.pools[name] = (start, len(self.matches))
+        self.remaining[name] = len(self.matches) - start
+
+    def mask_of(self, players: Iterable[str]) -> int:
+        """Bitmask for a set of player names."""
+        mask = 0
+        for p in players:
+            mask |= 1 << self.player_ids[p]
+        return mask
+
+    def block_player(self, player: str) -> None:
+        """Invalidate every match containing ``player``."""
+        blocks = self.blocks
+        available = self.available
+        for idx in self.by_player[self.player_ids[player]]:
+            blocks[idx] += 1
+            available[idx] = 0
+
+    def unblock_player(self, player: str) -> None:
+        """Undo one ``block_player`` call for ``player``."""
+        blocks = self.blocks
+        available = self.available
+        for idx in self.by_player[self.player_ids[player]]:
+            blocks[idx] -= 1
+            if not blocks[idx]:
+                available[idx] = 1
+
+    def remove(self, idx: int) -> None:
+        """Mark a match as used so it is never offered again."""
+        self.blocks[idx] += 1
+        self.available[idx] = 0
+        self.remaining[self.pool_of[idx]] -= 1
+
+    def restore(self, idx: int) -> None:
+        """Undo ``remove`` (used by backtracking searches)."""
+        self.blocks[idx] -= 1
+        if not self.blocks[idx]:
+            self.available[idx] = 1
+        self.remaining[self.pool_of[idx]] += 1
+
+    def candidates(self, pool: str) -> Iterator[int]:
+        """Indices of the still-valid matches of ``pool``, in pool order."""
+        start, end = self.pools[pool]
+        return compress(range(start, end), memoryview(self.available)[start:end])
+
+    def first_candidate(self, pool: str) -> Optional[int]:
+        """First valid match of ``pool`` or None."""
+        return next(self.candidates(pool), None)
+
+    def players_of(self, idx: int) -> Tuple[str, ...]:
+        """Player names of match ``idx``."""
+        players = self.players
+        return tuple(players[pid] for pid in self.members[idx])
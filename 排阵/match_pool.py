@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Match Pools
+Lazy generators for the candidate match pools used by the schedulers.
+
+Matches are yielded on demand in a canonical form, each set of four players
+and split into two pairs exactly once, so callers can stream, filter or
+sample a pool without materializing every (pair1, pair2) combination.
+
+For tournament-size signups (60+ players) the full pools have millions of
+matches; ``random_doubles_matches`` / ``random_mixed_doubles_matches`` draw a
+bounded uniform sample directly, without enumerating the pool.
+"""
+
+import itertools
+import math
+import random
+from typing import Iterable, Iterator, List, Tuple
+
+
+Match = Tuple[Tuple[str, str], Tuple[str, str]]
+
+
+def iter_doubles_matches(players: List[str]) -> Iterator[Match]:
+    """
+    Yield every same-gender doubles match among ``players``.
+
+    For each 4-player combination (a, b, c, d) in roster order the three
+    possible splits are yielded once: ab-cd, ac-bd, ad-bc.
+    """
+    for a, b, c, d in itertools.combinations(players, 4):
+        yield (a, b), (c, d)
+        yield (a, c), (b, d)
+        yield (a, d), (b, c)
+
+
+def iter_mixed_doubles_matches(males: List[str], females: List[str]) -> Iterator[Match]:
+    """Yield mixed doubles matches: ((male1, female1), (male2, female2))."""
+    for male_pair in itertools.combinations(males, 2):
+        for female_pair in itertools.combinations(females, 2):
+            yield (male_pair[0], female_pair[0]), (male_pair[1], female_pair[1])
+
+
+def count_doubles_matches(player_count: int) -> int:
+    """Size of ``iter_doubles_matches`` without generating it."""
+    return 3 * math.comb(player_count, 4)
+
+
+def count_mixed_doubles_matches(male_count: int, female_count: int) -> int:
+    """Size of ``iter_mixed_doubles_matches`` without generating it."""
+    return math.comb(male_count, 2) * math.comb(female_count, 2)
+
+
+def filter_matches(matches: Iterable[Match], eligible: Iterable[str]) -> Iterator[Match]:
+    """Keep only matches whose four players are all in ``eligible``."""
+    eligible = set(eligible)
+    for match in matches:
+        (a, b), (c, d) = match
+        if a in eligible and b in eligible and c in eligible and d in eligible:
+            yield match
+
+
+def sample_matches(matches: Iterable[Match], k: int, rng: random.Random = None) -> List[Match]:
+    """
+    Uniformly sample up to ``k`` matches from a stream (reservoir sampling).
+
+    Memory stays O(k) however large the underlying pool is.
+    """
+    rng = rng or random
+    reservoir = []
+    for i, match in enumerate(matches):
+        if i < k:
+            reservoir.append(match)
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                reservoir[j] = match
+    return reservoir
+
+
+def random_doubles_matches(players: List[str], k: int, rng: random.Random = None) -> List[Match]:
+    """
+    Up to ``k`` distinct uniformly random matches of ``iter_doubles_matches(players)``.
+
+    Cost is O(k) regardless of the pool size; use it when the pool is much larger than ``k``.
+    """
+    rng = rng or random
+    n = len(players)
+    k = min(k, count_doubles_matches(n))
+    seen = set()
+    matches = []
+    while len(matches) < k:
+        a, b, c, d = sorted(rng.sample(range(n), 4))
+        split = rng.randrange(3)
+        key = (a, b, c, d, split)
+        if key in seen:
+            continue
+        seen.add(key)
+        a, b, c, d = players[a], players[b], players[c], players[d]
+        matches.append(((a, b), (c, d)) if split == 0 else ((a, c), (b, d)) if split == 1 else ((a, d), (b, c)))
+    return matches
+
+
+def random_mixed_doubles_matches(males: List[str], females: List[str], k: int,
+                                 rng: random.Random = None) -> List[Match]:
+    """Up to ``k`` distinct uniformly random matches of ``iter_mixed_doubles_matches``."""
+    rng = rng or random
+    k = min(k, count_mixed_doubles_matches(len(males), len(females)))
+    seen = set()
+    matches = []
+    while len(matches) < k:
+        m1, m2 = sorted(rng.sample(range(len(males)), 2))
+        f1, f2 = sorted(rng.sample(range(len(females)), 2))
+        key = (m1, m2, f1, f2)
+        if key in seen:
+            continue
+        seen.add(key)
+        matches.append(((males[m1], females[f1]), (males[m2], females[f2])))
+    return matches
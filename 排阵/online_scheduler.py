@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Online Mode
+Event-driven "next match" scheduling for sessions that don't run in lockstep rounds.
+
+Instead of precomputing rounds, the scheduler keeps live state (who is on
+court, who is resting and for how long, games played, partners and
+opponents seen) and proposes the best next match whenever a court frees up.
+Players can arrive late or leave early at any time.
+
+Scoring reuses the batch rules from lineup_scheduler.player_priority_score
+(TARGET_GAMES, 外援加分, 固定场次, 最大场次), plus:
+- 等待时间：空闲越久越优先
+- 重复搭档 / 重复对手：加分（靠后）
+- 比赛类型：低于目标比例的类型优先
+
+Only the top ONLINE_POOL_SIZE idle players of each gender are combined, so a
+proposal enumerates a few hundred candidate matches and takes milliseconds.
+
+Usage:
+    python online_scheduler.py          # 读取 微信接龙.txt，交互式输入事件
+    命令：free <场地号> | arrive <姓名> | leave <姓名> | status | quit
+"""
+
+import argparse
+import sys
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lineup_scheduler import (
+    FIXED_PARTNERS, create_lineup_excel, get_court_count, get_fixed_games_for_player,
+    get_max_games_for_player, get_pair_key, get_total_matches, get_type_targets,
+    parse_activity_date, player_priority_score,
+)
+from roster import ROSTER
+from schedule_api import normalize_signup
+from schedule_metrics import ScheduleMatrices
+from scoring_profile import DEFAULT_WEIGHTS, ScoringWeights
+
+
+# 每种性别只在优先级最高的前 N 名空闲球员中枚举组合
+ONLINE_POOL_SIZE = 8
+
+# 评分权重（越低越优先，与 player_priority_score 同一量级）
+WAIT_WEIGHT = 40                # 每多等一场比赛开始的减分
+PARTNER_REPEAT_PENALTY = 150    # 每重复搭档一次的加分
+OPPONENT_REPEAT_PENALTY = 30    # 每重复对手一次的加分
+TYPE_DEFICIT_WEIGHT = 300       # 比赛类型每低于目标比例一场的减分
+
+
+class OnlineScheduler:
+    """
+    Live session state plus a "best next match" proposer.
+
+    Usage:
+        scheduler = OnlineScheduler(males, females, court_count=3)
+        scheduler.fill_courts()            # 开场：每片场地安排一场
+        match = scheduler.court_free(2)    # 2 号场地打完，返回下一场
+    """
+
+    def __init__(self, males: List[str], females: List[str], court_count: int,
+                 total_matches: Optional[int] = None, present: Optional[Iterable[str]] = None,
+                 weights: Optional[ScoringWeights] = None):
+        """
+        Args:
+            males, females: 报名球员
+            court_count: 场地数
+            total_matches: 计划比赛数（决定类型比例与提前离场球员的固定场次）；
+                默认按报名与到场球员计算，球员到场 / 离场时重新计算
+            present: 已到场的球员（默认全部到场）
+            weights: 评分权重（scoring_profile），默认与批量排阵相同
+        """
+        self.players: List[str] = []
+        self.court_count = court_count
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.planned_matches = total_matches
+        self.total_matches = 0
+        self.signup_count = 0
+
+        self.games: Dict[str, int] = {}
+        self.caps: Dict[str, int] = {}
+        self.fixed: Dict[str, Optional[int]] = {}
+        self.idle_since: Dict[str, int] = {}
+        self.departed = set()
+        for p in males + females:
+            self._register(p)
+        self.present = set(self.players if present is None else present)
+        self._update_plan()
+
+        self.on_court: Dict[str, int] = {}
+        self.courts: Dict[int, Optional[Dict]] = {c: None for c in range(1, court_count + 1)}
+        self.court_rounds = {c: 0 for c in self.courts}
+        self.partner_counts: Dict[Tuple[str, str], int] = {}
+        self.opponent_counts: Dict[Tuple[str, str], int] = {}
+        self.type_counts = {"混双": 0, "男双": 0, "女双": 0}
+        self.started = 0
+        self.history: List[Dict] = []
+
+    def _register(self, player: str) -> None:
+        self.players.append(player)
+        self.games[player] = 0
+        self.idle_since[player] = 0
+
+    def _update_plan(self) -> None:
+        """Recompute the planned matches and every player's fixed games / cap from the players still in the session."""
+        players = [p for p in self.players if p not in self.departed]
+        self.signup_count = len(players)
+        if self.planned_matches:
+            self.total_matches = self.planned_matches
+        else:
+            self.total_matches = get_total_matches(players, self.court_count)[0]
+        for p in self.players:
+            self.fixed[p] = get_fixed_games_for_player(p, self.total_matches, self.signup_count)
+            cap = get_max_games_for_player(p)
+            if self.fixed[p] is not None:
+                cap = min(cap, self.fixed[p])
+            self.caps[p] = cap
+
+    # ------------------------------------------------------------------
+    # Events
+
+    def arrive(self, player: str) -> None:
+        """A player arrives (late signups must be on the roster)."""
+        if player not in self.games:
+            if player not in ROSTER:
+                raise ValueError(f"未知球员：{player}")
+            self._register(player)
+        if player not in self.present:
+            self.present.add(player)
+            self.departed.discard(player)
+            self.idle_since[player] = self.started
+            self._update_plan()
+
+    def leave(self, player: str) -> None:
+        """A player leaves; a match in progress is finished normally."""
+        if player in self.present:
+            self.present.discard(player)
+            self.departed.add(player)
+            self._update_plan()
+
+    def court_free(self, court: int) -> Optional[Dict]:
+        """Court ``court`` finished its match: release the players and start the best next match."""
+        self._check_court(court)
+        finished = self.courts[court]
+        if finished is not None:
+            for pair in finished["match"]:
+                for p in pair:
+                    self.on_court.pop(p, None)
+                    self.idle_since[p] = self.started
+            self.courts[court] = None
+        match = self.propose(court)
+        if match is not None:
+            self.start(match)
+        return match
+
+    def fill_courts(self) -> List[Dict]:
+        """Start a match on every idle court (session start, or after late arrivals)."""
+        started = []
+        for court, current in self.courts.items():
+            if current is None:
+                match = self.propose(court)
+                if match is None:
+                    break
+                self.start(match)
+                started.append(match)
+        return started
+
+    def _check_court(self, court: int) -> None:
+        if court not in self.courts:
+            raise ValueError(f"没有{court}号场地（共{self.court_count}个场地）")
+
+    # ------------------------------------------------------------------
+    # Proposals
+
+    def available(self) -> List[str]:
+        """Idle present players who can still play, best priority first."""
+        players = [p for p in self.players
+                   if p in self.present and p not in self.on_court and self.games[p] < self.caps[p]]
+        players.sort(key=self._player_score)
+        return players
+
+    def _player_score(self, player: str) -> float:
+        return (player_priority_score(self.games[player], self.fixed[player],
+                                      get_max_games_for_player(player), ROSTER.is_guest(player), self.weights)
+                - WAIT_WEIGHT * (self.started - self.idle_since[player]))
+
+    def _match_score(self, match: Tuple[Tuple[str, str], Tuple[str, str]],
+                     player_scores: Dict[str, float]) -> float:
+        (a, b), (c, d) = match
+        score = (player_scores[a] + player_scores[b] + player_scores[c] + player_scores[d]) / 4
+        for pair in match:
+            key = get_pair_key(pair[0], pair[1])
+            score += self.partner_counts.get(key, 0) * PARTNER_REPEAT_PENALTY
+            score -= FIXED_PARTNERS.get(key, 0) * self.weights.fixed_partner
+        for x in (a, b):
+            for y in (c, d):
+                score += self.opponent_counts.get(get_pair_key(x, y), 0) * OPPONENT_REPEAT_PENALTY
+        return score
+
+    def _type_bonus(self) -> Dict[str, float]:
+        """Per-type score bonus: how far each type lags behind its target share after the next match."""
+        females_present = sum(1 for p in self.present if ROSTER.is_female(p))
+        targets = get_type_targets(self.total_matches, females_present)
+        bonus = {}
+        if not self.total_matches:
+            return dict.fromkeys(targets, 0.0)  # 还没有计划比赛数（如空场开始）：不按类型比例加减分
+        for match_type, target in targets.items():
+            deficit = target * (self.started + 1) / self.total_matches - self.type_counts[match_type]
+            # 没有目标场次的类型（如女生不足时的女双）视为超额
+            bonus[match_type] = -TYPE_DEFICIT_WEIGHT * (deficit if target else -1.0)
+        return bonus
+
+    def _candidates(self, available: List[str]):
+        """Yield (type, match) for clean 男双 / 女双 / 混双 combinations of the top idle players."""
+        females_present = [p for p in self.present if ROSTER.is_female(p)]
+        can_play_womens_doubles = len(females_present) >= 4
+        females = [p for p in available if ROSTER.is_female(p)][:ONLINE_POOL_SIZE]
+        males = [p for p in available if not ROSTER.is_female(p)][:ONLINE_POOL_SIZE]
+        # 只打女双的球员不能参加混双（女双人数不足 4 人时例外）
+        mixed_females = [p for p in females
+                         if not (can_play_womens_doubles and ROSTER.is_only_womens_doubles(p))]
+        mixed_males = [p for p in males if ROSTER.is_mixed_eligible(p)]
+
+        for a, b, c, d in combinations(males, 4):
+            yield "男双", ((a, b), (c, d))
+            yield "男双", ((a, c), (b, d))
+            yield "男双", ((a, d), (b, c))
+        if can_play_womens_doubles:
+            for a, b, c, d in combinations(females, 4):
+                yield "女双", ((a, b), (c, d))
+                yield "女双", ((a, c), (b, d))
+                yield "女双", ((a, d), (b, c))
+        for m1, m2 in combinations(mixed_males, 2):
+            for f1, f2 in combinations(mixed_females, 2):
+                yield "混双", ((m1, f1), (m2, f2))
+                yield "混双", ((m1, f2), (m2, f1))
+
+    def propose(self, court: int) -> Optional[Dict]:
+        """Best next match for ``court`` without starting it; None when fewer than 4 players are free."""
+        self._check_court(court)
+        available = self.available()
+        if len(available) < 4:
+            return None
+        player_scores = {p: self._player_score(p) for p in available}
+        type_bonus = self._type_bonus()
+
+        best = None
+        best_score = float("inf")
+        for match_type, match in self._candidates(available):
+            score = self._match_score(match, player_scores) + type_bonus[match_type]
+            if score < best_score:
+                best_score = score
+                best = (match_type, match, False)
+
+        if best is None:
+            # 凑不齐任何类型时，与 select_balanced_matches 的临时组合一样打"乱打"
+            selected = available[:4]
+            females = [p for p in selected if ROSTER.is_female(p)]
+            males = [p for p in selected if not ROSTER.is_female(p)]
+            if len(females) >= 2 and len(males) >= 2:
+                best = ("女双 (乱打)", ((females[0], females[1]), (males[0], males[1])), True)
+            elif len(males) >= 3:
+                best = ("男双 (乱打)", ((males[0], males[1]), (males[2], (females + males[3:])[0])), True)
+            else:
+                best = ("男双 (乱打)", ((selected[0], selected[1]), (selected[2], selected[3])), True)
+
+        match_type, match, fallback = best
+        return {
+            "type": match_type,
+            "match": match,
+            "fallback": fallback,
+            "court": court,
+            "round": self.court_rounds[court] + 1,  # 该场地的第几场
+        }
+
+    def start(self, match: Dict) -> None:
+        """Put a proposed (or manually chosen) match on its court and update the live state."""
+        court = match["court"]
+        self._check_court(court)
+        if self.courts[court] is not None:
+            raise ValueError(f"{court}号场地还在比赛中")
+        (a, b), (c, d) = match["match"]
+        for p in (a, b, c, d):
+            if p in self.on_court:
+                raise ValueError(f"【核心规则违规】球员 {p} 正在 {self.on_court[p]}号场地比赛！")
+        for p in (a, b, c, d):
+            self.on_court[p] = court
+            self.games[p] += 1
+        for x, y in ((a, b), (c, d)):
+            key = get_pair_key(x, y)
+            self.partner_counts[key] = self.partner_counts.get(key, 0) + 1
+        for x in (a, b):
+            for y in (c, d):
+                key = get_pair_key(x, y)
+                self.opponent_counts[key] = self.opponent_counts.get(key, 0) + 1
+        base = match["type"].split(" ")[0]
+        self.type_counts[base] = self.type_counts.get(base, 0) + 1
+        self.courts[court] = match
+        self.court_rounds[court] += 1
+        self.started += 1
+        self.history.append(match)
+
+    def status(self) -> Dict:
+        return {
+            "started": self.started,
+            "courts": dict(self.courts),
+            "resting": [p for p in self.players if p in self.present and p not in self.on_court],
+            "games": dict(self.games),
+        }
+
+
+def format_match(match: Dict) -> str:
+    team_a = "/".join(match["match"][0])
+    team_b = "/".join(match["match"][1])
+    return f"{match['court']}号场地 [{match['type']}]: {team_a} VS {team_b}"
+
+
+def main(argv: Optional[List[str]] = None):
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="羽毛球排阵 - 实时模式（场地空出即安排下一场）")
+    parser.add_argument("--signup", default=str(base_dir / "微信接龙.txt"), help="报名接龙")
+    parser.add_argument("--courts", type=int, default=None, help="场地数（默认按人数自动决定）")
+    parser.add_argument("--output", default=str(base_dir / "对阵表_实时.xlsx"), help="结束时导出的对阵表")
+    args = parser.parse_args(argv)
+
+    with open(args.signup, "r", encoding="utf-8") as f:
+        signup_text = f.read()
+    males, females = normalize_signup(signup_text)
+    court_count = args.courts or get_court_count(len(males) + len(females))
+    scheduler = OnlineScheduler(males, females, court_count)
+
+    print(f"报名 {len(males) + len(females)}人，场地 {court_count}个")
+    print("命令：free <场地号> | arrive <姓名> | leave <姓名> | status | quit")
+    for match in scheduler.fill_courts():
+        print(f"  开始 {format_match(match)}")
+
+    for line in sys.stdin:
+        parts = line.split()
+        if not parts:
+            continue
+        command, rest = parts[0], parts[1:]
+        try:
+            if command == "free" and rest:
+                match = scheduler.court_free(int(rest[0]))
+                print(f"  开始 {format_match(match)}" if match else f"  {rest[0]}号场地暂无可安排的比赛")
+            elif command == "arrive" and rest:
+                scheduler.arrive(rest[0])
+                for match in scheduler.fill_courts():
+                    print(f"  开始 {format_match(match)}")
+            elif command == "leave" and rest:
+                scheduler.leave(rest[0])
+            elif command == "status":
+                state = scheduler.status()
+                for court, match in state["courts"].items():
+                    print(f"  {format_match(match)}" if match else f"  {court}号场地：空闲")
+                print(f"  休息中：{', '.join(state['resting'])}")
+                print("  场次：" + ", ".join(f"{p} {g}" for p, g in state["games"].items()))
+            elif command == "quit":
+                break
+            else:
+                print("  未知命令")
+        except ValueError as exc:
+            print(f"  错误：{exc}")
+
+    if scheduler.history:
+        players = scheduler.players
+        player_stats = ScheduleMatrices(scheduler.history, players).player_stats(players)
+        create_lineup_excel(sorted(scheduler.history, key=lambda m: (m["round"], m["court"])),
+                            court_count, args.output, player_stats,
+                            activity_date=parse_activity_date(signup_text))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
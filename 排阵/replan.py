@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Incremental Re-plan
+Repair an existing schedule after late signups or dropouts instead of regenerating it.
+
+The first ``frozen_rounds`` rounds (already played or printed) are kept as-is.
+In the remaining rounds only the matches touched by the roster diff change:
+- 退出的球员：由本轮轮空的同性别球员顶替（选目标值增量最小的人）；
+  没有人可以顶替时取消该场比赛，再尝试用本轮轮空的球员补上一场
+- 新加入的球员：替换场次较多的同性别球员上场，直到均衡性不再改善
+
+Dropout repair only visits the rounds the player was scheduled in, so its
+cost grows with the number of affected matches, not with the event size.
+Moves are scored incrementally by local_search.LocalSearchImprover.
+
+Usage:
+    python replan.py --frozen 3       # 读取 对阵表.xlsx 与最新的 微信接龙.txt，按差异修补
+    python replan.py --frozen 3 --output 对阵表_调整.xlsx
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import openpyxl
+
+from lineup_scheduler import create_lineup_excel, parse_activity_date, schedule_objective
+from local_search import TYPE_GENDERS, LocalSearchImprover
+from roster import ROSTER
+from schedule_api import normalize_signup
+from schedule_metrics import ScheduleMatrices
+
+
+def load_schedule(path: str) -> Tuple[List[Dict], int]:
+    """
+    Read matches back from an exported 对阵表.xlsx.
+
+    Returns:
+        (matches, court_count)
+    """
+    wb = openpyxl.load_workbook(path, read_only=True)
+    ws = wb.worksheets[0]
+    config_text = ws["A2"].value or ""
+    matches = []
+    for row in ws.iter_rows(min_row=4, values_only=True):
+        if len(row) < 7 or not row[0] or not row[2]:
+            continue
+        round_num, court, match_type, team_a, _, _, team_b = row[:7]
+        if isinstance(court, str):
+            court = int(court.replace("号", "").strip())
+        matches.append({
+            "type": match_type,
+            "match": (tuple(team_a.split("/")), tuple(team_b.split("/"))),
+            # "混双 (男代)"、"男双 (乱打)" 等带括号的标签都是 fallback 比赛
+            "fallback": "(" in match_type,
+            "court": court,
+            "round": int(round_num),
+        })
+    wb.close()
+
+    court_count = max((m["court"] for m in matches), default=0)
+    if "场地数：" in config_text:
+        try:
+            court_count = int(config_text.split("场地数：")[1].split("个")[0])
+        except ValueError:
+            pass
+    return matches, court_count
+
+
+def roster_diff(matches: List[Dict], males: List[str], females: List[str]) -> Tuple[List[str], List[str]]:
+    """(removed, added): scheduled players no longer signed up, and signed-up players not scheduled."""
+    scheduled = []
+    for m in matches:
+        for pair in m["match"]:
+            for p in pair:
+                if p not in scheduled:
+                    scheduled.append(p)
+    signed_up = set(males) | set(females)
+    scheduled_set = set(scheduled)
+    removed = [p for p in scheduled if p not in signed_up]
+    added = [p for p in males + females if p not in scheduled_set]
+    return removed, added
+
+
+def _entry_keys(improver: LocalSearchImprover) -> Set[Tuple]:
+    return {(r, entry[0], entry[2])
+            for r in range(improver.frozen_rounds, len(improver.rounds))
+            for entry in improver.rounds[r]}
+
+
+def _replace_dropout(improver: LocalSearchImprover, pid: int, r: int) -> bool:
+    """Substitute ``pid`` in round ``r`` with the best resting player; False when nobody fits."""
+    pos = next(i for i, entry in enumerate(improver.rounds[r]) if pid in entry[2])
+    label, fallback, members = improver.rounds[r][pos]
+    slot = members.index(pid)
+    best = None
+    for q in improver.by_gender[improver.is_female[pid]]:
+        if improver.inactive[q] or q in members:
+            continue
+        new = [label, fallback, members[:slot] + (q,) + members[slot + 1:]]
+        result = improver.evaluate_move(r, [(pos, new)])
+        if result is not None and (best is None or result[0] < best[0]):
+            best = (result[0], new, result[1])
+    if best is None:
+        return False
+    improver.apply_move(r, [(pos, best[1])], best[2])
+    return True
+
+
+def _fill_court(improver: LocalSearchImprover, r: int) -> bool:
+    """Add one match of resting players to round ``r`` if that lowers the objective."""
+    bit = 1 << r
+    resting = [pid for pid in range(len(improver.players))
+               if not improver.masks[pid] & bit and improver.games[pid] < improver.caps[pid]]
+    # 场次最少的球员优先
+    resting.sort(key=lambda pid: improver.games[pid])
+
+    candidates = []
+    for label, genders in TYPE_GENDERS.items():
+        pools = {female: [pid for pid in resting
+                          if improver.is_female[pid] == female and improver._eligible(pid, label, False)]
+                 for female in (False, True)}
+        if all(len(pools[female]) >= genders.count(female) for female in (False, True)):
+            # 混双按 (男, 女) / (男, 女) 搭配
+            candidates.append([label, False, tuple(pools[female].pop(0) for female in genders)])
+
+    # 凑不齐任何类型时，与 select_balanced_matches 的临时组合一样打"乱打"
+    mixable = [pid for pid in resting if improver._eligible(pid, "男双 (乱打)", True)][:4]
+    if len(mixable) == 4:
+        f = [pid for pid in mixable if improver.is_female[pid]]
+        m = [pid for pid in mixable if not improver.is_female[pid]]
+        if len(f) >= 2 and len(m) >= 2:
+            candidates.append(["女双 (乱打)", True, (f[0], f[1], m[0], m[1])])
+        elif len(m) >= 3:
+            candidates.append(["男双 (乱打)", True, (m[0], m[1], m[2], (f + m[3:])[0])])
+        else:
+            candidates.append(["男双 (乱打)", True, tuple(mixable)])
+
+    current = improver.energy()
+    best = None
+    for entry in candidates:
+        if not improver.can_insert(r, entry):
+            continue
+        improver.insert_match(r, entry)
+        energy = improver.energy()
+        improver.drop_match(r, len(improver.rounds[r]) - 1)
+        if energy < current - 1e-9 and (best is None or energy < best[0]):
+            best = (energy, entry)
+    if best is None:
+        return False
+    improver.insert_match(r, best[1])
+    return True
+
+
+def _place_late(improver: LocalSearchImprover, pid: int) -> None:
+    """Swap a late signup into future rounds while it improves balance."""
+    while improver.games[pid] < improver.caps[pid]:
+        best = None
+        for r in range(improver.frozen_rounds, len(improver.rounds)):
+            if improver.masks[pid] >> r & 1:
+                continue
+            for pos, (label, fallback, members) in enumerate(improver.rounds[r]):
+                for slot, q in enumerate(members):
+                    if improver.is_female[q] != improver.is_female[pid]:
+                        continue
+                    new = [label, fallback, members[:slot] + (pid,) + members[slot + 1:]]
+                    result = improver.evaluate_move(r, [(pos, new)])
+                    if result is not None and (best is None or result[0] < best[0]):
+                        best = (result[0], r, pos, new, result[1])
+        if best is None or best[0] >= -1e-9:
+            break
+        _, r, pos, new, plan = best
+        improver.apply_move(r, [(pos, new)], plan)
+
+
+def replan_schedule(matches: List[Dict], males: List[str], females: List[str], frozen_rounds: int,
+                    total_matches: Optional[int] = None) -> Tuple[List[Dict], Dict]:
+    """
+    Repair ``matches`` for the new signup (males, females).
+
+    Args:
+        matches: 已有的排阵
+        males, females: 最新的报名名单
+        frozen_rounds: 前 N 轮保持不变（已打完或已打印）
+        total_matches: 目标比赛数（默认沿用原排阵的场数）
+
+    Returns:
+        (matches, report) - report 含 removed / added / replaced / dropped /
+        filled / changed（改动的比赛数）/ objective
+    """
+    removed, added = roster_diff(matches, males, females)
+    total_matches = total_matches or len(matches)
+    # 退出的球员仍需出现在球员表中（冻结轮次里有他们的比赛）
+    removed_females = [p for p in removed if ROSTER.is_female(p)]
+    removed_males = [p for p in removed if not ROSTER.is_female(p)]
+    improver = LocalSearchImprover(matches, males + removed_males, females + removed_females,
+                                   total_matches, frozen_rounds=frozen_rounds,
+                                   inactive=removed, late=added)
+    ids = {p: i for i, p in enumerate(improver.players)}
+    before = _entry_keys(improver)
+    report = {"removed": removed, "added": added, "replaced": 0, "dropped": 0, "filled": 0, "late_games": {}}
+
+    short_rounds = set()
+    for p in removed:
+        pid = ids[p]
+        for r in range(frozen_rounds, len(improver.rounds)):
+            if not improver.masks[pid] >> r & 1:
+                continue
+            if _replace_dropout(improver, pid, r):
+                report["replaced"] += 1
+            else:
+                pos = next(i for i, entry in enumerate(improver.rounds[r]) if pid in entry[2])
+                improver.drop_match(r, pos)
+                report["dropped"] += 1
+                short_rounds.add(r)
+
+    for r in sorted(short_rounds):
+        if _fill_court(improver, r):
+            report["filled"] += 1
+
+    for p in added:
+        _place_late(improver, ids[p])
+        # 顶替退出球员时也可能已安排了迟到的球员
+        report["late_games"][p] = improver.games[ids[p]]
+
+    result = improver.to_matches()
+    # 被改动或取消的原有比赛，加上新补的比赛
+    report["changed"] = len(before - _entry_keys(improver)) + report["filled"]
+    report["objective"] = schedule_objective(result, total_matches, males + females, females)
+    return result, report
+
+
+def main(argv: Optional[List[str]] = None):
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="羽毛球排阵 - 增量调整（迟到报名 / 临时退出）")
+    parser.add_argument("--frozen", type=int, required=True,
+                        help="保持不变的轮次数（已打完或已打印的前 N 轮）")
+    parser.add_argument("--input", default=str(base_dir / "对阵表.xlsx"), help="已有的对阵表")
+    parser.add_argument("--signup", default=str(base_dir / "微信接龙.txt"), help="最新的报名接龙")
+    parser.add_argument("--output", default=None, help="输出路径（默认覆盖 --input）")
+    args = parser.parse_args(argv)
+
+    with open(args.signup, "r", encoding="utf-8") as f:
+        signup_text = f.read()
+    males, females = normalize_signup(signup_text)
+    matches, court_count = load_schedule(args.input)
+    if not matches:
+        print(f"错误：{args.input} 中没有比赛")
+        return 1
+
+    new_matches, report = replan_schedule(matches, males, females, args.frozen)
+    print(f"冻结轮次：前 {args.frozen} 轮")
+    print(f"退出球员：{', '.join(report['removed']) or '无'}")
+    print(f"新增球员：{', '.join(report['added']) or '无'}")
+    for p, games in report["late_games"].items():
+        print(f"  - {p}: 安排 {games} 场")
+    print(f"顶替 {report['replaced']} 人次，取消 {report['dropped']} 场，补场 {report['filled']} 场")
+    print(f"改动比赛：{report['changed']} / {len(matches)} 场")
+    print(f"目标值：{report['objective']:.2f}（越低越均衡）")
+
+    all_players = males + females
+    player_stats = ScheduleMatrices(new_matches, all_players).player_stats(all_players)
+    output_path = args.output or args.input
+    create_lineup_excel(new_matches, court_count, output_path, player_stats,
+                        activity_date=parse_activity_date(signup_text))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
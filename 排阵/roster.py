@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Badminton Team Roster
+Single source of truth for player facts: gender, internal/guest status,
+mixed doubles eligibility and per-player constraints.
+
+The lists below are compiled once into a compact ``Player`` table with
+integer ids and bit flags, so schedulers and importers answer questions like
+"is this player female / a guest / allowed in mixed doubles" with one dict
+lookup instead of scanning several lists.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+# Player definitions
+INTERNAL_MALE_PLAYERS = [
+    "苏大哲", "罗蒙", "江锐", "严勇文", "陈顺星", "陈小洪",
+    "卢志辉", "林锋", "王小波", "刘继宇", "董广博", "林琪琛", "罗琴荩"
+]
+
+GUEST_MALE_PLAYERS = [
+    "张欣欣", "黄冬青", "程建兴", "陈宇霆", "卢子龙", "吴煜"
+]
+
+MALE_PLAYERS = INTERNAL_MALE_PLAYERS + GUEST_MALE_PLAYERS
+
+INTERNAL_FEMALE_PLAYERS = [
+    "田茜", "唐英武", "李祺祺", "高洁", "滕菲", "谢卓珊", "崔倩男", "林小连"
+]
+
+GUEST_FEMALE_PLAYERS = [
+    "张燕红", "李杏芝", "项小英"
+]
+
+FEMALE_PLAYERS = INTERNAL_FEMALE_PLAYERS + GUEST_FEMALE_PLAYERS
+
+# Mixed doubles eligible male players (internal only)
+MIXED_DOUBLES_MALES = {"林锋", "王小波", "陈顺星", "罗琴荩", "罗蒙"}
+
+# Player-specific constraints
+# fixed_games: None = 自动根据场地紧张程度计算，整数 = 固定场次
+PLAYER_CONSTRAINTS = {
+    "严勇文": {"fixed_games": None, "early_departure": True},
+    "崔倩男": {"fixed_games": None, "early_departure": True},
+    "林小连": {"only_womens_doubles": True},  # 只打女双
+}
+
+# Fixed partner pairs
+FIXED_PARTNERS = {
+}
+
+
+# Player flags
+FEMALE = 1
+GUEST = 2
+MIXED_ELIGIBLE = 4          # 可打混双（女生总是可以，男生见 MIXED_DOUBLES_MALES）
+ONLY_WOMENS_DOUBLES = 8     # 只打女双
+EARLY_DEPARTURE = 16        # 需提前离场
+
+
+class Player:
+    """One roster entry."""
+
+    __slots__ = ("id", "name", "flags")
+
+    def __init__(self, player_id: int, name: str, flags: int):
+        self.id = player_id
+        self.name = name
+        self.flags = flags
+
+    @property
+    def is_female(self) -> bool:
+        return bool(self.flags & FEMALE)
+
+    @property
+    def is_guest(self) -> bool:
+        return bool(self.flags & GUEST)
+
+    def __repr__(self) -> str:
+        return f"Player({self.id}, {self.name!r}, flags={self.flags})"
+
+
+class Roster:
+    """
+    Player table indexed by name and by integer id.
+
+    ``constraints`` is the PLAYER_CONSTRAINTS-style dict for the same
+    players, kept in sync by ``add`` / ``remove``.
+    """
+
+    def __init__(self):
+        self.players: List[Optional[Player]] = []
+        self.by_name: Dict[str, Player] = {}
+        self.constraints: Dict[str, dict] = {}
+
+    def add(self, name: str, female: bool = False, guest: bool = False,
+            mixed_eligible: bool = False, constraints: Optional[dict] = None) -> Player:
+        """Register a player (or update an existing one) and return its entry."""
+        constraints = constraints if constraints is not None else self.constraints.get(name, {})
+        flags = ((FEMALE if female else 0) | (GUEST if guest else 0)
+                 | (MIXED_ELIGIBLE if mixed_eligible or female else 0)
+                 | (ONLY_WOMENS_DOUBLES if constraints.get("only_womens_doubles") else 0)
+                 | (EARLY_DEPARTURE if constraints.get("early_departure") else 0))
+        if constraints:
+            self.constraints[name] = constraints
+        else:
+            self.constraints.pop(name, None)
+
+        player = self.by_name.get(name)
+        if player is None:
+            player = Player(len(self.players), name, flags)
+            self.players.append(player)
+            self.by_name[name] = player
+        else:
+            player.flags = flags
+        return player
+
+    def remove(self, name: str) -> None:
+        """Unregister a player; its id is not reused."""
+        player = self.by_name.pop(name, None)
+        if player is not None:
+            self.players[player.id] = None
+            self.constraints.pop(name, None)
+
+    def get(self, name: str) -> Optional[Player]:
+        return self.by_name.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def id_of(self, name: str) -> int:
+        return self.by_name[name].id
+
+    def flags_of(self, name: str) -> int:
+        """Flags of ``name``; 0 for players not on the roster."""
+        player = self.by_name.get(name)
+        return player.flags if player is not None else 0
+
+    def is_female(self, name: str) -> bool:
+        return bool(self.flags_of(name) & FEMALE)
+
+    def is_male(self, name: str) -> bool:
+        player = self.by_name.get(name)
+        return player is not None and not player.flags & FEMALE
+
+    def is_guest(self, name: str) -> bool:
+        return bool(self.flags_of(name) & GUEST)
+
+    def is_internal(self, name: str) -> bool:
+        player = self.by_name.get(name)
+        return player is not None and not player.flags & GUEST
+
+    def is_mixed_eligible(self, name: str) -> bool:
+        return bool(self.flags_of(name) & MIXED_ELIGIBLE)
+
+    def is_only_womens_doubles(self, name: str) -> bool:
+        return bool(self.flags_of(name) & ONLY_WOMENS_DOUBLES)
+
+    def is_early_departure(self, name: str) -> bool:
+        return bool(self.flags_of(name) & EARLY_DEPARTURE)
+
+    def constraint(self, name: str) -> dict:
+        return self.constraints.get(name, {})
+
+    def names(self, flags: int = 0, value: int = 0) -> List[str]:
+        """Names (in id order) whose ``flags`` bits equal ``value``, e.g. names(FEMALE, FEMALE)."""
+        return [p.name for p in self.players if p is not None and p.flags & flags == value]
+
+    def split_by_gender(self, names: Iterable[str]):
+        """(males, females) of the known players in ``names``, keeping order."""
+        males, females = [], []
+        for name in names:
+            player = self.by_name.get(name)
+            if player is not None:
+                (females if player.flags & FEMALE else males).append(name)
+        return males, females
+
+
+def _build_roster() -> Roster:
+    roster = Roster()
+    # 与 PLAYER_CONSTRAINTS 共用同一个 dict，注册的临时球员也能被 .get() 查到
+    roster.constraints = PLAYER_CONSTRAINTS
+    for names, female, guest in ((INTERNAL_MALE_PLAYERS, False, False), (GUEST_MALE_PLAYERS, False, True),
+                                 (INTERNAL_FEMALE_PLAYERS, True, False), (GUEST_FEMALE_PLAYERS, True, True)):
+        for name in names:
+            roster.add(name, female=female, guest=guest, mixed_eligible=name in MIXED_DOUBLES_MALES)
+    return roster
+
+
+ROSTER = _build_roster()
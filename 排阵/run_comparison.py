@@ -1,12 +1,33 @@
 #!/usr/bin/env python3
 """
 Badminton Lineup Scheduler - Comparison Runner
-Runs both traditional and LLM-based schedulers and compares results.
+A/B harness for the traditional and LLM-based schedulers.
+
+Both schedulers are randomized, so a single side-by-side run says little.
+The harness runs N seeds of each scheduler on every signup in a corpus of
+historical signups (报名/报名表_*.xlsx plus 微信接龙.txt) in a process pool.
+It aggregates quality metrics (schedule_objective, 场次方差, 最长连续轮空,
+重复搭档 / 对手, 缺场) and runtime as mean ± 95% confidence interval. A paired
+difference per (signup, seed) shows which scheduler is better on the same
+inputs, and everything is written to a JSON report.
+
+Usage:
+    python run_comparison.py                          # 全部历史报名，每个调度器 10 个种子
+    python run_comparison.py --seeds 30 --workers 8 --report comparison_report.json
+    python run_comparison.py --single                 # 只比较 微信接龙.txt 一次，并导出两份 Excel
 """
 
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
 import sys
 import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
@@ -19,6 +40,7 @@ from excel_exporter import (
     parse_activity_date
 )
 from llm_scheduler import LLMLineupScheduler, PLAYER_CONSTRAINTS, parse_signup, get_court_count
+from schedule_metrics import ScheduleMatrices, schedule_metrics
 
 
 def run_traditional_scheduler(males, females, court_count):
@@ -81,90 +103,235 @@ def run_llm_scheduler(males, females, court_count):
     return matches, elapsed
 
 
-def analyze_schedule(matches, name):
+def analyze_schedule(matches, name, players=None):
     """Analyze a schedule and return statistics."""
-    from collections import Counter, defaultdict
-    
-    stats = {
-        'total_matches': len(matches),
-        'type_distribution': Counter(),
-        'player_games': defaultdict(int),
-        'player_types': defaultdict(lambda: {'男双': 0, '女双': 0, '混双': 0}),
-        'rounds': set(),
-        'courts_used': set(),
-    }
-    
-    for m in matches:
-        match_type = m["type"]
-        base_type = match_type.split(" ")[0]
-        stats['type_distribution'][base_type] += 1
-        
-        for player in traditional.get_match_players(m["match"]):
-            stats['player_games'][player] += 1
-            stats['player_types'][player][base_type] += 1
-        
-        stats['rounds'].add(m.get('round', 1))
-        stats['courts_used'].add(m.get('court', 1))
-    
-    return stats
+    metrics = schedule_metrics(matches, players)
+    metrics['name'] = name
+    metrics['courts_used'] = len({m.get('court', 1) for m in matches})
+    return metrics
 
 
-def compare_schedules(traditional_matches, llm_matches):
+def compare_schedules(traditional_matches, llm_matches, all_players=None):
     """Compare two schedules and print analysis."""
     print("\n" + "=" * 60)
     print("对比分析")
     print("=" * 60)
-    
-    # Import traditional module for utility functions
-    global traditional
-    import lineup_scheduler as traditional
-    
-    # Type distribution
-    from collections import Counter
-    trad_types = Counter(m["type"].split(" ")[0] for m in traditional_matches)
-    llm_types = Counter(m["type"].split(" ")[0] for m in llm_matches)
-    
+
+    trad = ScheduleMatrices(traditional_matches, all_players)
+    llm = ScheduleMatrices(llm_matches, all_players)
+
     print("\n比赛类型分布对比:")
     print(f"  {'类型':<8} {'传统算法':<12} {'LLM 推理':<12}")
     print(f"  {'-'*32}")
-    all_types = set(trad_types.keys()) | set(llm_types.keys())
+    all_types = {t for t, c in trad.type_counts.items() if c} | {t for t, c in llm.type_counts.items() if c}
     for t in sorted(all_types):
-        trad_count = trad_types.get(t, 0)
-        llm_count = llm_types.get(t, 0)
+        trad_count = trad.type_counts.get(t, 0)
+        llm_count = llm.type_counts.get(t, 0)
         print(f"  {t:<8} {trad_count:<12} {llm_count:<12}")
-    
-    # Player game distribution
-    trad_player_games = Counter()
-    llm_player_games = Counter()
-    
-    for m in traditional_matches:
-        for p in traditional.get_match_players(m["match"]):
-            trad_player_games[p] += 1
-    
-    for m in llm_matches:
-        for p in traditional.get_match_players(m["match"]):
-            llm_player_games[p] += 1
-    
+
     print("\n球员场次对比 (传统 vs LLM):")
-    all_players = set(trad_player_games.keys()) | set(llm_player_games.keys())
-    for player in sorted(all_players):
-        trad = trad_player_games.get(player, 0)
-        llm = llm_player_games.get(player, 0)
-        diff = llm - trad
+    players = sorted({p for p in trad.players if trad.games_of(p)} | {p for p in llm.players if llm.games_of(p)})
+    for player in players:
+        trad_games = trad.games_of(player) if player in trad.index else 0
+        llm_games = llm.games_of(player) if player in llm.index else 0
+        diff = llm_games - trad_games
         diff_str = f"{diff:+d}" if diff != 0 else "0"
-        print(f"  {player:<10} {trad:<3} vs {llm:<3} ({diff_str})")
-    
-    # Statistics summary
-    trad_games = list(trad_player_games.values())
-    llm_games = list(llm_player_games.values())
-    
+        print(f"  {player:<10} {trad_games:<3} vs {llm_games:<3} ({diff_str})")
+
+    # 只统计实际上场的球员（与原先按出场记录统计一致）
+    trad_metrics = trad.metrics([p for p in trad.players if trad.games_of(p)])
+    llm_metrics = llm.metrics([p for p in llm.players if llm.games_of(p)])
+
     print("\n场次均衡性对比:")
-    print(f"  传统算法：平均 {sum(trad_games)/len(trad_games):.2f}场，范围 [{min(trad_games)}, {max(trad_games)}]")
-    print(f"  LLM 推理：平均 {sum(llm_games)/len(llm_games):.2f}场，范围 [{min(llm_games)}, {max(llm_games)}]")
+    for label, metrics in (("传统算法", trad_metrics), ("LLM 推理", llm_metrics)):
+        print(f"  {label}：平均 {metrics['games_mean']:.2f}场，范围 [{metrics['games_min']}, {metrics['games_max']}]，"
+              f"方差 {metrics['games_variance']:.2f}，最长连续轮空 {metrics['max_bye_streak']}轮，"
+              f"重复搭档 {metrics['partner_repeats']}次，重复对手 {metrics['opponent_repeats']}次")
+
+
+# 汇总的质量指标（越低越好）与运行时间
+REPORT_METRICS = ("objective", "games_variance", "max_bye_streak", "partner_repeats",
+                  "opponent_repeats", "missing_matches", "seconds")
+SCHEDULERS = ("traditional", "llm")
+SCHEDULER_NAMES = {"traditional": "传统算法", "llm": "LLM 推理"}
+Z_95 = 1.96  # 95% 置信区间（正态近似）
+
+
+def read_signup_sheet(path: Path) -> List[str]:
+    """Player names from a 报名表_YYYY-MM-DD.xlsx (姓名 column below the header row)."""
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    names = []
+    try:
+        for row in wb.worksheets[0].iter_rows(min_row=3, max_col=1, values_only=True):
+            if row[0] and str(row[0]).strip() and str(row[0]).strip() != "姓名":
+                names.append(str(row[0]).strip())
+    finally:
+        wb.close()
+    return names
+
+
+def load_signup_corpus(paths: List[Path]) -> List[Tuple[str, List[str], List[str]]]:
+    """
+    [(name, males, females)] for every signup file: 报名表 xlsx or 接龙 txt.
+
+    Only known players are kept (schedule_api.normalize_signup); signups with
+    fewer than 8 players can't fill two courts and are skipped.
+    """
+    from schedule_api import normalize_signup
+    corpus = []
+    for path in paths:
+        if path.suffix == ".xlsx":
+            males, females = normalize_signup(read_signup_sheet(path))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                males, females = normalize_signup(f.read())
+        if len(males) + len(females) >= 8:
+            corpus.append((path.stem, males, females))
+    return corpus
+
+
+def _run_trial(args) -> Dict:
+    """One (scheduler, signup, seed) run in a worker process; returns its metrics."""
+    import lineup_scheduler as traditional
+
+    scheduler, signup_name, males, females, seed = args
+    all_players = males + females
+    court_count = traditional.get_court_count(len(all_players))
+    total_matches = traditional.get_total_matches(all_players, court_count)[0]
+
+    random.seed(seed)
+    start = time.perf_counter()
+    if scheduler == "traditional":
+        matches = traditional.select_balanced_matches(
+            traditional.generate_mixed_doubles_matches(males, females),
+            traditional.generate_mens_doubles_matches(males),
+            traditional.generate_womens_doubles_matches(females),
+            total_matches, court_count, all_players, males, females
+        )
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):  # LLM 排阵的推理过程输出
+            matches = LLMLineupScheduler(males, females, court_count, len(all_players)).schedule()
+    seconds = time.perf_counter() - start
+
+    metrics = schedule_metrics(matches, all_players)
+    return {
+        "scheduler": scheduler,
+        "signup": signup_name,
+        "seed": seed,
+        "players": len(all_players),
+        "court_count": court_count,
+        "objective": traditional.schedule_objective(matches, total_matches, all_players, females),
+        "games_variance": metrics["games_variance"],
+        "max_bye_streak": metrics["max_bye_streak"],
+        "partner_repeats": metrics["partner_repeats"],
+        "opponent_repeats": metrics["opponent_repeats"],
+        "missing_matches": max(0, total_matches - len(matches)),
+        "seconds": seconds,
+    }
+
+
+def summarize(values: List[float]) -> Dict:
+    """Mean, sample std and 95% CI (normal approximation) of ``values``."""
+    n = len(values)
+    mean = sum(values) / n if n else 0.0
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1)) if n > 1 else 0.0
+    half = Z_95 * std / math.sqrt(n) if n else 0.0
+    return {"n": n, "mean": mean, "std": std, "ci95": [mean - half, mean + half]}
+
+
+def run_ab(corpus, seeds: List[int], workers: int = 1) -> Dict:
+    """
+    Run every scheduler on every signup with every seed and aggregate.
+
+    Returns:
+        {"runs": [...], "schedulers": {调度器: {指标: summary}},
+         "paired": {指标: summary of (llm - traditional)}, "wins": {...}}
+    """
+    jobs = [(scheduler, name, males, females, seed)
+            for name, males, females in corpus for seed in seeds for scheduler in SCHEDULERS]
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            runs = list(executor.map(_run_trial, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        runs = [_run_trial(job) for job in jobs]
+
+    by_scheduler = {s: [r for r in runs if r["scheduler"] == s] for s in SCHEDULERS}
+    schedulers = {s: {m: summarize([r[m] for r in rs]) for m in REPORT_METRICS}
+                  for s, rs in by_scheduler.items()}
+
+    # 同一报名、同一种子的配对差值（llm - 传统），消除报名难度的差异
+    keyed = {(r["scheduler"], r["signup"], r["seed"]): r for r in runs}
+    pairs = [(keyed[("traditional", name, seed)], keyed[("llm", name, seed)])
+             for name, _, _ in corpus for seed in seeds]
+    paired = {m: summarize([b[m] - a[m] for a, b in pairs]) for m in REPORT_METRICS}
+    wins = {"traditional": sum(1 for a, b in pairs if a["objective"] < b["objective"]),
+            "llm": sum(1 for a, b in pairs if b["objective"] < a["objective"]),
+            "tie": sum(1 for a, b in pairs if a["objective"] == b["objective"])}
+    return {"runs": runs, "schedulers": schedulers, "paired": paired, "wins": wins}
+
+
+def print_ab_report(result: Dict) -> None:
+    print(f"\n{'指标':<18}" + "".join(f"{SCHEDULER_NAMES[s]:>26}" for s in SCHEDULERS) + f"{'差值 (LLM - 传统)':>30}")
+    for m in REPORT_METRICS:
+        cells = []
+        for s in SCHEDULERS:
+            summary = result["schedulers"][s][m]
+            lo, hi = summary["ci95"]
+            cells.append(f"{summary['mean']:>10.3f} [{lo:>6.3f}, {hi:>6.3f}]")
+        diff = result["paired"][m]
+        lo, hi = diff["ci95"]
+        significant = "*" if lo > 0 or hi < 0 else " "
+        print(f"{m:<18}" + "".join(f"{c:>26}" for c in cells) + f"{diff['mean']:>+12.3f} [{lo:>+7.3f}, {hi:>+7.3f}]{significant}")
+    wins = result["wins"]
+    print(f"\n目标值更优：传统 {wins['traditional']}次，LLM {wins['llm']}次，相同 {wins['tie']}次"
+          f"（* = 95% 置信区间不含 0）")
+
+
+def main_ab(argv: Optional[List[str]] = None):
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="羽毛球排阵 - 传统算法 vs LLM 推理 A/B 对比")
+    parser.add_argument("signups", nargs="*", help="报名文件（报名表 xlsx / 接龙 txt），默认全部历史报名")
+    parser.add_argument("--seeds", type=int, default=10, help="每个调度器在每份报名上运行的种子数（默认 10）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数（默认 CPU 核数）")
+    parser.add_argument("--report", default="comparison_report.json", help="JSON 报告路径")
+    parser.add_argument("--single", action="store_true", help="只对 微信接龙.txt 运行一次，并导出两份 Excel")
+    args = parser.parse_args(argv)
+    if args.single:
+        return main()
+
+    if args.signups:
+        paths = [Path(p) for p in args.signups]
+    else:
+        paths = sorted((base_dir.parent / "报名").glob("报名表_*.xlsx")) + [base_dir / "微信接龙.txt"]
+        paths = [p for p in paths if p.exists()]
+    corpus = load_signup_corpus(paths)
+    if not corpus:
+        print("错误：没有可用的报名（至少 8 名已知球员）")
+        return 1
+
+    seeds = list(range(args.seeds))
+    print(f"报名：{len(corpus)}份，每个调度器 {len(seeds)} 个种子，共 {len(corpus) * len(seeds) * len(SCHEDULERS)} 次排阵，"
+          f"{args.workers} 个进程")
+    start = time.perf_counter()
+    result = run_ab(corpus, seeds, args.workers)
+    print(f"用时：{time.perf_counter() - start:.1f}秒")
+    print_ab_report(result)
+
+    report = {
+        "corpus": [{"name": name, "males": len(males), "females": len(females)} for name, males, females in corpus],
+        "seeds": seeds,
+        **result,
+    }
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"报告：{args.report}")
+    return 0
 
 
 def main():
-    """Main comparison runner."""
+    """Single side-by-side run on 微信接龙.txt (exports both schedules to Excel)."""
     # Try multiple paths for flexibility
     possible_paths = [
         "微信接龙.txt",
@@ -211,7 +378,7 @@ def main():
     llm_matches, llm_time = run_llm_scheduler(males, females, court_count)
     
     # Compare results
-    compare_schedules(traditional_matches, llm_matches)
+    compare_schedules(traditional_matches, llm_matches, all_players)
     
     # Export both to Excel
     player_stats_trad = calculate_player_stats(traditional_matches, all_players)
@@ -268,4 +435,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main_ab())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Library API
+Deterministic ``schedule(signup, config, seed)`` entry point with an on-disk cache.
+
+The signup is normalized (known players only, roster order), so the result
+depends only on who signed up, their constraints, the config and the seed.
+Those inputs, plus the scheduler source code, are hashed into the cache key:
+re-running with the same signup returns the stored schedule instantly, and
+any change to the roster, constraints, config or algorithm misses the cache.
+
+Usage:
+    from schedule_api import schedule
+    result = schedule(signup_text, {"backend": "greedy", "seeds": 20}, seed=0)
+    result["matches"], result["objective"], result["cached"]
+"""
+
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from lineup_scheduler import (
+    COURT_ABUNDANCE_THRESHOLD, EARLY_DEPARTURE_GAMES, FIXED_PARTNERS, MATCHES_PER_COURT,
+    MAX_GAMES_GUEST, MAX_GAMES_INTERNAL,
+    generate_mixed_doubles_matches, generate_mens_doubles_matches, generate_womens_doubles_matches,
+    get_court_count, get_total_matches, parse_activity_date, parse_signup,
+    schedule_objective, search_best_schedule, select_balanced_matches,
+)
+from roster import ROSTER
+from scoring_profile import make_weights, weight_overrides
+
+
+CACHE_DIR = Path(__file__).parent / ".schedule_cache"
+
+DEFAULT_CONFIG = {
+    "backend": "greedy",     # greedy / exact
+    "seeds": 1,              # 多种子搜索的种子数量
+    "anneal": 0,             # 模拟退火迭代次数（0 = 不改进）
+    "time_budget": 10.0,     # exact 后端的搜索时限（秒）
+    "court_count": None,     # None = 按人数自动决定
+    "rounds": None,          # 轮数，None = MATCHES_PER_COURT
+    "season": False,         # 参考历史存档做赛季均衡
+    "season_since": None,    # 赛季起始日期（YYYY-MM-DD），None = 全部历史
+    "weights": None,         # 评分权重覆盖 {名称: 值}（见 scoring_profile.ScoringWeights），None = 默认
+}
+
+# 只影响运行方式、不影响结果的配置项，不参与缓存键
+RUNTIME_ONLY_KEYS = {"workers"}
+
+# 参与缓存键的排阵源码（算法改动后缓存自动失效）；本文件的 _run_schedule 决定排阵流程，一并计入
+_SOURCE_FILES = ("schedule_api.py", "lineup_scheduler.py", "match_index.py", "match_pool.py", "schedule_metrics.py",
+                 "roster.py", "exact_scheduler.py", "local_search.py", "season_history.py",
+                 "scoring_profile.py")
+_source_digest = None
+
+
+def normalize_signup(signup: Union[str, Iterable[str]]) -> Tuple[List[str], List[str]]:
+    """(males, females) of the known players in a signup text or name list, in roster order."""
+    if isinstance(signup, str):
+        males, females = parse_signup(signup)
+    else:
+        males, females = ROSTER.split_by_gender(signup)
+    # 去重并按名单顺序排列：接龙顺序不同不影响排阵结果
+    males = sorted(set(males), key=ROSTER.id_of)
+    females = sorted(set(females), key=ROSTER.id_of)
+    return males, females
+
+
+def normalize_config(config: Optional[Dict] = None) -> Dict:
+    normalized = dict(DEFAULT_CONFIG)
+    for key, value in (config or {}).items():
+        if key not in DEFAULT_CONFIG and key not in RUNTIME_ONLY_KEYS:
+            raise ValueError(f"未知的排阵配置项：{key}")
+        normalized[key] = value
+    if normalized["backend"] not in ("greedy", "exact"):
+        raise ValueError(f"未知的排阵后端：{normalized['backend']}")
+    # 与默认值相同的权重不写入配置，保证缓存键一致
+    normalized["weights"] = weight_overrides(make_weights(normalized["weights"])) or None
+    return normalized
+
+
+def _source_hash() -> str:
+    global _source_digest
+    if _source_digest is None:
+        digest = hashlib.sha256()
+        for name in _SOURCE_FILES:
+            path = Path(__file__).parent / name
+            if path.exists():
+                digest.update(path.read_bytes())
+        _source_digest = digest.hexdigest()
+    return _source_digest
+
+
+def cache_key(males: List[str], females: List[str], config: Dict, seed: int,
+              season_digest: str = "") -> str:
+    """Hash of the normalized roster, its constraints, the config, the seed, the season history and the scheduler code."""
+    players = males + females
+    payload = {
+        "males": males,
+        "females": females,
+        "flags": [ROSTER.flags_of(p) for p in players],
+        "constraints": {p: ROSTER.constraint(p) for p in players if ROSTER.constraint(p)},
+        "fixed_partners": sorted([list(pair), weight] for pair, weight in FIXED_PARTNERS.items()
+                                 if set(pair) <= set(players)),
+        "globals": [MATCHES_PER_COURT, MAX_GAMES_INTERNAL, MAX_GAMES_GUEST,
+                    COURT_ABUNDANCE_THRESHOLD, sorted(EARLY_DEPARTURE_GAMES.items())],
+        "config": {k: v for k, v in sorted(config.items()) if k not in RUNTIME_ONLY_KEYS},
+        "seed": seed,
+        "season": season_digest,
+        "source": _source_hash(),
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _load_cached(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for m in data["matches"]:
+            m["match"] = tuple(tuple(pair) for pair in m["match"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None  # 缓存文件损坏或格式不对时当作未命中
+    return data
+
+
+def _store_cached(path: Path, data: Dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # 缓存写入失败不影响排阵结果
+
+
+def _run_schedule(males: List[str], females: List[str], config: Dict, seed: int, season=None) -> Dict:
+    all_players = males + females
+    court_count = config["court_count"] or get_court_count(len(all_players))
+    total_matches = get_total_matches(all_players, court_count, config["rounds"])[0]
+    weights = make_weights(config["weights"])
+
+    best_seed = seed
+    if config["seeds"] > 1:
+        _, best_seed, matches = search_best_schedule(
+            males, females, total_matches, court_count,
+            seeds=list(range(seed, seed + config["seeds"])), workers=config.get("workers", 1),
+            season=season, weights=weights
+        )
+    else:
+        random.seed(seed)
+        matches = select_balanced_matches(
+            generate_mixed_doubles_matches(males, females),
+            generate_mens_doubles_matches(males),
+            generate_womens_doubles_matches(females),
+            total_matches, court_count, all_players, males, females, season, weights
+        )
+
+    if config["backend"] == "exact":
+        from exact_scheduler import ExactLineupScheduler
+        solver = ExactLineupScheduler(males, females, total_matches, court_count, config["time_budget"])
+        matches, _, _ = solver.solve(initial=matches)
+
+    if config["anneal"] > 0:
+        from local_search import improve_schedule
+        matches, _ = improve_schedule(matches, males, females, total_matches,
+                                      iterations=config["anneal"], seed=seed)
+
+    return {
+        "males": males,
+        "females": females,
+        "court_count": court_count,
+        "total_matches": total_matches,
+        "seed": seed,
+        "best_seed": best_seed,
+        "objective": schedule_objective(matches, total_matches, all_players, females),
+        "matches": matches,
+        "season": season is not None,
+    }
+
+
+def schedule(signup: Union[str, Iterable[str]], config: Optional[Dict] = None, seed: int = 0,
+             use_cache: bool = True, cache_dir: Optional[Path] = None) -> Dict:
+    """
+    Schedule a signup deterministically.
+
+    Args:
+        signup: 接龙文本，或球员名字列表
+        config: 排阵配置（见 DEFAULT_CONFIG），可额外传 workers（不参与缓存键）
+        seed: 随机种子；多种子搜索时为起始种子
+        use_cache: 是否读写磁盘缓存（exact 后端结果与机器速度有关，始终不缓存）
+        cache_dir: 缓存目录（默认 排阵/.schedule_cache）
+
+    Returns:
+        {"males", "females", "court_count", "total_matches", "seed", "best_seed",
+         "objective", "matches", "season", "activity_date", "cache_key", "cached"}
+    """
+    config = normalize_config(config)
+    males, females = normalize_signup(signup)
+    season = None
+    if config["season"]:
+        from season_history import load_season_history
+        season = load_season_history(since=config["season_since"], cache_dir=cache_dir)
+    key = cache_key(males, females, config, seed, season.digest if season is not None else "")
+    path = Path(cache_dir or CACHE_DIR) / f"{key}.json"
+    # exact 后端按时限搜索，结果取决于机器速度，同样的输入不一定得到同样的赛程，不缓存
+    use_cache = use_cache and config["backend"] != "exact"
+
+    result = _load_cached(path) if use_cache else None
+    cached = result is not None
+    if result is None:
+        result = _run_schedule(males, females, config, seed, season)
+        if use_cache:
+            _store_cached(path, result)
+
+    result["activity_date"] = parse_activity_date(signup) if isinstance(signup, str) else ""
+    result["cache_key"] = key
+    result["cached"] = cached
+    return result
+
+
+def clear_cache(cache_dir: Optional[Path] = None) -> int:
+    """Delete all cached schedules; returns the number of files removed."""
+    removed = 0
+    directory = Path(cache_dir or CACHE_DIR)
+    if directory.is_dir():
+        for path in directory.glob("*.json"):
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Schedule Metrics
+Shared fairness metrics for schedules produced by any of the schedulers.
+
+A schedule is converted once into compact matrices:
+- incidence: player × round, one bitmask of played rounds per player
+- type_games: player × match type counts
+- partner / opponent: player × player counts in flat ``array('H')`` buffers
+
+Every balance metric (games variance, bye streaks, partner/opponent repeats,
+per-player type mix) is then read off these matrices, so summaries,
+comparisons and multi-seed searches all score schedules the same way
+without re-walking the match dicts.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+
+# 基础比赛类型（"混双 (男代)" 等 fallback 标签按空格前的基础类型统计）
+MATCH_TYPES = ("男双", "女双", "混双")
+
+
+def base_type(match_type: str) -> str:
+    """'男双 (乱打)' -> '男双'."""
+    return match_type.split(" ")[0]
+
+
+def longest_zero_run(mask: int, width: int) -> int:
+    """Longest run of 0 bits in the low ``width`` bits of ``mask`` (最长连续轮空)."""
+    run = ~mask & ((1 << width) - 1)
+    longest = 0
+    while run:
+        run &= run >> 1
+        longest += 1
+    return longest
+
+
+class ScheduleMatrices:
+    """Incidence and pair matrices of a schedule (built in one pass)."""
+
+    def __init__(self, matches: List[Dict], players: Optional[Iterable[str]] = None):
+        self.players: List[str] = list(players or [])
+        self.index: Dict[str, int] = {p: i for i, p in enumerate(self.players)}
+        # 不在名单中的球员（例如临时补位）按出场顺序追加
+        for m in matches:
+            for pair in m["match"]:
+                for p in pair:
+                    if p not in self.index:
+                        self.index[p] = len(self.players)
+                        self.players.append(p)
+
+        n = len(self.players)
+        self.round_count = max((m.get("round", 1) for m in matches), default=0)
+        self.match_count = len(matches)
+        self.incidence = [0] * n
+        self.games = [0] * n
+        self.type_games = {t: [0] * n for t in MATCH_TYPES}
+        self.type_counts = {t: 0 for t in MATCH_TYPES}
+        self.partner = array("H", bytes(2 * n * n))
+        self.opponent = array("H", bytes(2 * n * n))
+
+        index = self.index
+        for m in matches:
+            t = base_type(m["type"])
+            if t not in self.type_counts:
+                self.type_counts[t] = 0
+                self.type_games[t] = [0] * n
+            self.type_counts[t] += 1
+            bit = 1 << (m.get("round", 1) - 1)
+            (a, b), (c, d) = m["match"]
+            a, b, c, d = index[a], index[b], index[c], index[d]
+            for pid in (a, b, c, d):
+                self.incidence[pid] |= bit
+                self.games[pid] += 1
+                self.type_games[t][pid] += 1
+            self.partner[a * n + b] += 1
+            self.partner[b * n + a] += 1
+            self.partner[c * n + d] += 1
+            self.partner[d * n + c] += 1
+            for x in (a, b):
+                for y in (c, d):
+                    self.opponent[x * n + y] += 1
+                    self.opponent[y * n + x] += 1
+
+    def games_of(self, player: str) -> int:
+        return self.games[self.index[player]]
+
+    def longest_bye(self, player: str) -> int:
+        return longest_zero_run(self.incidence[self.index[player]], self.round_count)
+
+    def partner_count(self, p1: str, p2: str) -> int:
+        return self.partner[self.index[p1] * len(self.players) + self.index[p2]]
+
+    def opponent_count(self, p1: str, p2: str) -> int:
+        return self.opponent[self.index[p1] * len(self.players) + self.index[p2]]
+
+    def repeats(self, matrix: array) -> int:
+        """Sum over unordered pairs of max(0, count - 1)."""
+        # 矩阵对称，每对统计两次
+        return sum(c - 1 for c in matrix if c > 1) // 2
+
+    def player_stats(self, players: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """{player: {"total": N, "男双": N, "女双": N, "混双": N}} (calculate_player_stats format)."""
+        stats = {}
+        for p in (self.players if players is None else players):
+            pid = self.index.get(p)
+            row = {"total": self.games[pid] if pid is not None else 0}
+            for t in MATCH_TYPES:
+                row[t] = self.type_games[t][pid] if pid is not None else 0
+            stats[p] = row
+        return stats
+
+    def metrics(self, players: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Balance metrics over ``players`` (default: everyone in the schedule).
+
+        Returns a dict with games mean/variance/min/max, max bye streak,
+        partner/opponent repeats and the match type distribution.
+        """
+        ids = [self.index[p] for p in players if p in self.index] if players is not None else range(len(self.players))
+        games = [self.games[pid] for pid in ids]
+        count = len(games)
+        mean = sum(games) / count if count else 0.0
+        byes = [longest_zero_run(self.incidence[pid], self.round_count) for pid in ids]
+        return {
+            "total_matches": self.match_count,
+            "rounds": self.round_count,
+            "games_mean": mean,
+            "games_variance": sum((g - mean) ** 2 for g in games) / count if count else 0.0,
+            "games_min": min(games, default=0),
+            "games_max": max(games, default=0),
+            "max_bye_streak": max(byes, default=0),
+            "partner_repeats": self.repeats(self.partner),
+            "opponent_repeats": self.repeats(self.opponent),
+            "type_distribution": dict(self.type_counts),
+        }
+
+
+def schedule_metrics(matches: List[Dict], players: Optional[Iterable[str]] = None) -> Dict:
+    """Shortcut: build the matrices and return ``ScheduleMatrices.metrics``."""
+    players = list(players) if players is not None else None
+    return ScheduleMatrices(matches, players).metrics(players)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Scoring Profiles
+Declarative weights for the match scoring in select_balanced_matches and
+LLMLineupScheduler, loaded from TOML instead of edited in code.
+
+A profile is a flat ``ScoringWeights`` tuple. Every weight a profile leaves
+out keeps its default, and the defaults reproduce the built-in scoring
+exactly. Profiles are compiled per signup into ``CompiledProfile``: the score
+of a player only depends on their own game count, so each player gets a small
+lookup table (games -> score) built once from the per-player features
+(固定场次 / 最大场次 / 外援). During scheduling, re-scoring a player is then a
+list index.
+
+``score_profiles`` evaluates many profiles over the same candidate set in one
+batch, and ``sweep_profiles`` runs full seeded schedules per profile and ranks
+them by schedule_objective.
+
+Profile file (每个表是一套权重，未写的项使用默认值):
+
+    [default]
+
+    [guest_friendly]
+    guest = 0
+    below_target = 300
+
+Usage:
+    python scoring_profile.py profiles.toml               # 用 微信接龙.txt 比较各套权重
+    python scoring_profile.py profiles.toml --seeds 10
+    python lineup_scheduler.py --profile profiles.toml:guest_friendly
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class ScoringWeights(NamedTuple):
+    """Match scoring weights (lower score = scheduled sooner)."""
+    forbidden: int = 10000          # 已达到固定场次：巨额加分，禁止参赛
+    fixed_remaining: int = 1000     # 固定场次每差一场减分（最优先）
+    below_target: int = 200         # 未达目标场次时每差一场减分
+    at_max: int = 2000              # 达到最大场次加分（靠后）
+    over_target: int = 100          # 超过目标场次每多一场加分
+    guest: int = 50                 # 外援加分（优先保障内部员工）
+    fixed_partner: int = 30         # 固定搭档每单位权重减分
+    womens_early: int = 1500        # 前几轮女双每差一场目标减分
+    womens_late: int = 600          # 之后的轮次女双每差一场目标减分
+    womens_early_rounds: int = 3    # "前几轮"的轮数
+    target_games: int = 5           # 目标场次
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+WEIGHT_NAMES = ScoringWeights._fields
+
+
+def make_weights(overrides: Optional[Dict] = None) -> ScoringWeights:
+    """Default weights with ``overrides`` applied; unknown names raise ValueError."""
+    overrides = overrides or {}
+    unknown = set(overrides) - set(WEIGHT_NAMES)
+    if unknown:
+        raise ValueError(f"未知的评分权重：{', '.join(sorted(unknown))}")
+    return DEFAULT_WEIGHTS._replace(**overrides)
+
+
+def weight_overrides(weights: ScoringWeights) -> Dict:
+    """The weights that differ from the defaults (compact form for configs and cache keys)."""
+    return {name: value for name, value, default in zip(WEIGHT_NAMES, weights, DEFAULT_WEIGHTS)
+            if value != default}
+
+
+def player_score(weights: ScoringWeights, games: int, fixed_games: Optional[int], max_games: int,
+                 is_guest: bool) -> float:
+    """
+    Scheduling priority of one player given the games already played (lower = play sooner).
+
+    评分规则：
+    1. 已达到固定场次的球员 = 禁止参赛（巨额加分）
+    2. 固定场次要求：未完成时大幅减分（最优先）
+    3. 未达到目标场次的球员优先；达到最大场次的球员大幅加分（最后）
+    4. 外援球员：小幅加分（降低优先级，优先保障内部员工）
+    """
+    (forbidden, fixed_remaining, below_target, at_max, over_target, guest,
+     _, _, _, _, target_games) = weights
+    score = 0
+
+    if fixed_games is not None:
+        if games >= fixed_games:
+            score += forbidden
+        else:
+            score -= (fixed_games - games) * fixed_remaining
+
+    if games < target_games:
+        score -= (target_games - games) * below_target
+    elif games >= max_games:
+        score += at_max
+    else:
+        score += (games - target_games) * over_target
+
+    if is_guest:
+        score += guest
+    return score
+
+
+def womens_bonus(weights: ScoringWeights, round_num: int, remaining_womens: int) -> float:
+    """Score bonus of a women's doubles match while the 女双 target is not met."""
+    per_match = weights.womens_early if round_num <= weights.womens_early_rounds else weights.womens_late
+    return -remaining_womens * per_match
+
+
+class CompiledProfile:
+    """Weights compiled against one signup: per-player score tables indexed by games played."""
+
+    def __init__(self, weights: ScoringWeights, fixed_games: Sequence[Optional[int]],
+                 max_games: Sequence[int], guests: Sequence[bool]):
+        self.weights = weights
+        self.features = list(zip(fixed_games, max_games, guests))
+        # 场次一般不超过最大场次，表长 max_games + 1 覆盖常见的所有状态
+        self.tables: List[List[float]] = [
+            [player_score(weights, g, fixed, cap, guest) for g in range(cap + 1)]
+            for fixed, cap, guest in zip(fixed_games, max_games, guests)
+        ]
+
+    def score(self, pid: int, games: int) -> float:
+        table = self.tables[pid]
+        if games < len(table):
+            return table[games]
+        return player_score(self.weights, games, *self.features[pid])
+
+    def scores(self, games: Sequence[int]) -> List[float]:
+        """Score of every player for the given per-player game counts."""
+        return [self.score(pid, g) for pid, g in enumerate(games)]
+
+
+def score_profiles(profiles: Sequence[CompiledProfile], members: Sequence[Tuple[int, int, int, int]],
+                   games: Sequence[int], partner_units: Optional[Dict[int, List[int]]] = None,
+                   bonus: Sequence[float] = ()) -> List[Tuple[Optional[int], float]]:
+    """
+    Best candidate per profile over one candidate set, in a single batch.
+
+    Args:
+        profiles: 编译后的权重
+        members: 候选比赛的 4 名球员 id
+        games: 每名球员当前场次
+        partner_units: {候选索引: [固定搭档权重, ...]}，按各套权重的 fixed_partner 换算
+        bonus: 与球员无关的加减分项（如女双加分），参与平均
+
+    Returns:
+        [(最佳候选索引, 评分)]，与 profiles 一一对应；评分规则与 select_balanced_matches 相同
+    """
+    partner_units = partner_units or {}
+    bonus_sum = sum(bonus)
+    base_count = 4 + len(bonus)
+    results = []
+    for profile in profiles:
+        player_scores = profile.scores(games)
+        partner_weight = profile.weights.fixed_partner
+        best_idx, best_score = None, float("inf")
+        for idx, (a, b, c, d) in enumerate(members):
+            total = player_scores[a] + player_scores[b] + player_scores[c] + player_scores[d] + bonus_sum
+            units = partner_units.get(idx)
+            if units:
+                score = (total - partner_weight * sum(units)) / (base_count + len(units))
+            else:
+                score = total / base_count
+            if score < best_score:
+                best_idx, best_score = idx, score
+        results.append((best_idx, best_score))
+    return results
+
+
+def _load_toml(path: Path) -> Dict:
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError("读取 TOML 评分配置需要 Python 3.11+ 或 pip install tomli；也可以改用 .json 文件")
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def load_profiles(path: str) -> Dict[str, ScoringWeights]:
+    """
+    Read scoring profiles from a TOML (or JSON) file: one table per profile.
+
+    A file without tables is a single profile named after the file.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = _load_toml(path)
+    if all(not isinstance(v, dict) for v in data.values()):
+        data = {path.stem: data}
+    return {name: make_weights(values) for name, values in data.items()}
+
+
+def load_profile(spec: str) -> ScoringWeights:
+    """Weights from ``FILE`` (its only / first profile) or ``FILE:NAME``."""
+    path, _, name = spec.partition(":")
+    profiles = load_profiles(path)
+    if not name:
+        return next(iter(profiles.values()))
+    if name not in profiles:
+        raise ValueError(f"{path} 中没有评分配置 {name}（可选：{', '.join(profiles)}）")
+    return profiles[name]
+
+
+def sweep_profiles(profiles: Dict[str, ScoringWeights], males: List[str], females: List[str],
+                   seeds: Sequence[int], court_count: Optional[int] = None,
+                   workers: int = 1) -> List[Tuple[str, float, float]]:
+    """
+    Schedule the signup with every profile over the same seeds.
+
+    Returns:
+        [(profile_name, best_objective, mean_objective)] sorted by best objective
+    """
+    # 延迟导入：lineup_scheduler 本身依赖本模块
+    from lineup_scheduler import get_court_count, get_total_matches, schedule_with_seed
+
+    all_players = males + females
+    court_count = court_count or get_court_count(len(all_players))
+    total_matches = get_total_matches(all_players, court_count)[0]
+    jobs = [(name, seed) for name in profiles for seed in seeds]
+    args = [(seed, males, females, total_matches, court_count, None, profiles[name]) for name, seed in jobs]
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(schedule_with_seed, *zip(*args)))
+    else:
+        results = [schedule_with_seed(*a) for a in args]
+
+    objectives: Dict[str, List[float]] = {name: [] for name in profiles}
+    for (name, _), (objective, _, _) in zip(jobs, results):
+        objectives[name].append(objective)
+    summary = [(name, min(values), sum(values) / len(values)) for name, values in objectives.items()]
+    return sorted(summary, key=lambda s: (s[1], s[2]))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="羽毛球排阵 - 评分权重比较")
+    parser.add_argument("profiles", help="评分配置文件（TOML / JSON），每个表一套权重")
+    parser.add_argument("--signup", default=str(Path(__file__).parent / "微信接龙.txt"), help="报名接龙")
+    parser.add_argument("--seeds", type=int, default=5, help="每套权重运行的种子数量（默认 5）")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数（默认 1）")
+    args = parser.parse_args(argv)
+
+    from schedule_api import normalize_signup
+    with open(args.signup, "r", encoding="utf-8") as f:
+        males, females = normalize_signup(f.read())
+    profiles = load_profiles(args.profiles)
+    print(f"评分配置：{len(profiles)}套，每套 {args.seeds} 个种子，报名 {len(males) + len(females)}人")
+
+    summary = sweep_profiles(profiles, males, females, list(range(args.seeds)), workers=args.workers)
+    print(f"\n{'配置':<20}{'最优目标值':>10}{'平均目标值':>10}  调整项")
+    for name, best, mean in summary:
+        changes = ", ".join(f"{k}={v}" for k, v in weight_overrides(profiles[name]).items()) or "默认"
+        print(f"{name:<20}{best:>10.2f}{mean:>10.2f}  {changes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
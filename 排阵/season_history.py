@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Season History
+Prior partner / opponent / game counts from the score archive (data.db), so
+each week's schedule can favour unseen pairings and under-served players.
+
+The archive (db.py ``matches`` + ``participations``) is aggregated once into
+compact matrices - player × player ``array('H')`` counts like
+schedule_metrics.ScheduleMatrices - and cached as JSON next to the schedule
+cache. The cache key is the database file's size and mtime, so after the
+first run loading the history is a single small file read, and saving a new
+event rebuilds it automatically.
+
+Usage:
+    from season_history import load_season_history
+    season = load_season_history()
+    select_balanced_matches(..., season=season)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# data.db 的位置与表结构由项目根目录的 db.py 定义
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+CACHE_DIR = Path(__file__).parent / ".schedule_cache"
+
+# 评分权重（与 select_balanced_matches 的评分同一量级，越低越优先）
+SEASON_PARTNER_WEIGHT = 15     # 本赛季每搭档过一次，比赛评分加分
+SEASON_OPPONENT_WEIGHT = 2     # 本赛季每交手过一次，比赛评分加分
+SEASON_GAMES_WEIGHT = 400      # 场均场次每比全队平均少一场，球员评分减分
+SEASON_MAX_OFFSET = 200        # 球员评分调整的上限（= 少打一场的评分差）
+
+
+class SeasonHistory:
+    """Aggregated archive counts: games / events per player and partner / opponent matrices."""
+
+    def __init__(self, players: List[str], games: List[int], events: List[int],
+                 partner: array, opponent: array, digest: str = ""):
+        self.players = players
+        self.index: Dict[str, int] = {p: i for i, p in enumerate(players)}
+        self.games = games
+        self.events = events
+        self.partner = partner
+        self.opponent = opponent
+        self.digest = digest  # 数据来源的摘要，参与排阵缓存键
+
+    @classmethod
+    def from_records(cls, matches: Iterable[Tuple[List[str], List[str]]],
+                     attendance: Dict[str, Tuple[int, int]], digest: str = "") -> "SeasonHistory":
+        """
+        Build from archived matches [(team_a, team_b)] and {player: (games, events)}.
+        """
+        matches = list(matches)
+        players = sorted(set(attendance) | {p for team_a, team_b in matches for p in team_a + team_b})
+        index = {p: i for i, p in enumerate(players)}
+        n = len(players)
+        partner = array("H", bytes(2 * n * n))
+        opponent = array("H", bytes(2 * n * n))
+        for team_a, team_b in matches:
+            for team in (team_a, team_b):
+                if len(team) == 2:
+                    x, y = index[team[0]], index[team[1]]
+                    partner[x * n + y] += 1
+                    partner[y * n + x] += 1
+            for p in team_a:
+                for q in team_b:
+                    x, y = index[p], index[q]
+                    opponent[x * n + y] += 1
+                    opponent[y * n + x] += 1
+        games = [attendance.get(p, (0, 0))[0] for p in players]
+        events = [attendance.get(p, (0, 0))[1] for p in players]
+        return cls(players, games, events, partner, opponent, digest)
+
+    # ------------------------------------------------------------------
+
+    def partner_count(self, p1: str, p2: str) -> int:
+        x, y = self.index.get(p1), self.index.get(p2)
+        if x is None or y is None:
+            return 0
+        return self.partner[x * len(self.players) + y]
+
+    def opponent_count(self, p1: str, p2: str) -> int:
+        x, y = self.index.get(p1), self.index.get(p2)
+        if x is None or y is None:
+            return 0
+        return self.opponent[x * len(self.players) + y]
+
+    def games_per_event(self, player: str) -> Optional[float]:
+        pid = self.index.get(player)
+        if pid is None or not self.events[pid]:
+            return None
+        return self.games[pid] / self.events[pid]
+
+    def player_offsets(self, players: Iterable[str]) -> Dict[str, float]:
+        """
+        Score offset per player: negative (play sooner) for players whose games
+        per attended event are below this signup's average, capped at
+        ±SEASON_MAX_OFFSET. Players without history get 0.
+        """
+        rates = {p: self.games_per_event(p) for p in players}
+        known = [r for r in rates.values() if r is not None]
+        if not known:
+            return {}
+        mean = sum(known) / len(known)
+        # 最多相当于本次活动的一场差距，赛季均衡不压过单次活动的场次均衡
+        return {p: max(-SEASON_MAX_OFFSET, min(SEASON_MAX_OFFSET, -SEASON_GAMES_WEIGHT * (mean - r)))
+                for p, r in rates.items() if r is not None}
+
+    def match_penalty(self, match: Tuple[Tuple[str, str], Tuple[str, str]]) -> float:
+        """Score penalty of a match for partnerships and opponents already seen this season."""
+        (a, b), (c, d) = match
+        penalty = (self.partner_count(a, b) + self.partner_count(c, d)) * SEASON_PARTNER_WEIGHT
+        for x in (a, b):
+            for y in (c, d):
+                penalty += self.opponent_count(x, y) * SEASON_OPPONENT_WEIGHT
+        return penalty
+
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {
+            "players": self.players,
+            "games": self.games,
+            "events": self.events,
+            "partner": self.partner.tolist(),
+            "opponent": self.opponent.tolist(),
+            "digest": self.digest,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SeasonHistory":
+        return cls(data["players"], data["games"], data["events"],
+                   array("H", data["partner"]), array("H", data["opponent"]), data["digest"])
+
+
+def _read_archive(db_path: str, since: Optional[str]):
+    """(matches, attendance) from the archive, optionally only events on or after ``since``."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT m.team_a, m.team_b
+            FROM matches m JOIN events e ON m.event_id = e.id
+            WHERE e.event_date >= ?
+        """, (since or "",))
+        matches = [([p for p in team_a.split(",") if p], [p for p in team_b.split(",") if p])
+                   for team_a, team_b in cursor.fetchall()]
+        cursor.execute("""
+            SELECT p.name, COUNT(pa.id), COUNT(DISTINCT pa.event_id)
+            FROM participations pa
+            JOIN players p ON p.id = pa.player_id
+            JOIN events e ON e.id = pa.event_id
+            WHERE e.event_date >= ?
+            GROUP BY p.id
+        """, (since or "",))
+        attendance = {name: (games, events) for name, games, events in cursor.fetchall()}
+    finally:
+        conn.close()
+    return matches, attendance
+
+
+def load_season_history(db_path: Optional[str] = None, since: Optional[str] = None,
+                        cache_dir: Optional[Path] = None, use_cache: bool = True) -> Optional[SeasonHistory]:
+    """
+    Season aggregates from the archive, or None when there is no database.
+
+    Args:
+        db_path: SQLite 数据库路径（默认 db.DB_PATH）
+        since: 只统计该日期（YYYY-MM-DD）及之后的活动，默认全部
+        cache_dir: 缓存目录（默认 排阵/.schedule_cache）
+        use_cache: 是否读写缓存
+    """
+    if db_path is None:
+        from db import DB_PATH
+        db_path = DB_PATH
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+
+    source = f"{os.path.abspath(db_path)}|{stat.st_size}|{stat.st_mtime_ns}|{since or ''}"
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    path = Path(cache_dir or CACHE_DIR) / f"season_{digest}.json"
+    if use_cache:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return SeasonHistory.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+
+    try:
+        matches, attendance = _read_archive(db_path, since)
+    except sqlite3.Error:
+        return None
+    # 缓存键只描述文件，摘要则描述内容：内容相同的数据库得到相同的排阵缓存键
+    content = json.dumps([matches, sorted(attendance.items())], ensure_ascii=False)
+    history = SeasonHistory.from_records(matches, attendance,
+                                         hashlib.sha256(content.encode("utf-8")).hexdigest())
+    if use_cache:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(history.to_dict(), f, ensure_ascii=False)
+        except OSError:
+            pass  # 缓存写入失败不影响结果
+    return history
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+局部搜索（local_search.LocalSearchImprover）测试
+对同一个 improver 连续调用 run()，返回的赛程必须与报告的能量一致；
+stats["iterations"] 是实际执行的迭代次数（包括按时限提前停止时）
+"""
+
+import sys
+from pathlib import Path
+
+from lineup_scheduler import get_court_count, get_total_matches, schedule_with_seed
+from local_search import PARTNER_REPEAT_WEIGHT, LocalSearchImprover
+from schedule_api import normalize_signup
+
+
+def load_schedule():
+    with open(Path(__file__).parent / "微信接龙.txt", "r", encoding="utf-8") as f:
+        males, females = normalize_signup(f.read())
+    all_players = males + females
+    court_count = get_court_count(len(all_players))
+    total_matches = get_total_matches(all_players, court_count)[0]
+    _, _, matches = schedule_with_seed(0, males, females, total_matches, court_count)
+    return matches, males, females, total_matches
+
+
+def test_run_twice_matches_energy():
+    """
+    必须需求测试：run() 之后全部聚合量回到最优状态，第二次 run() 的结果与能量一致且不变差
+    """
+    print("=" * 80)
+    print("测试1: 同一 improver 连续 run() 两次")
+    print("=" * 80)
+
+    matches, males, females, total_matches = load_schedule()
+
+    passed = True
+    # 最后接受的状态不一定是最优状态，多试几个种子
+    for seed in range(6):
+        improver = LocalSearchImprover(matches, males, females, total_matches, seed=seed)
+        previous = None
+        for attempt in (1, 2):
+            try:
+                _, stats = improver.run(3000)
+            except ValueError as e:
+                print(f"❌ 种子 {seed} 第{attempt}次: {e}")
+                passed = False
+                break
+            # 能量 = schedule_objective + 重复搭档惩罚
+            expected = stats["objective"] + improver.repeats * PARTNER_REPEAT_WEIGHT
+            print(f"种子 {seed} 第{attempt}次: 起始能量 {stats['start_energy']:.2f}，"
+                  f"最优能量 {stats['best_energy']:.2f}，返回赛程目标值 {stats['objective']:.2f}")
+            if abs(expected - stats["best_energy"]) > 1e-6 or abs(improver.energy() - stats["best_energy"]) > 1e-6:
+                print("❌ 返回的赛程与报告的最优能量不一致")
+                passed = False
+            if stats["best_energy"] > stats["start_energy"] + 1e-9:
+                print("❌ 最优能量比起始能量更差")
+                passed = False
+            if previous is not None and abs(stats["start_energy"] - previous) > 1e-6:
+                print("❌ 第二次 run() 没有从第一次的最优状态开始")
+                passed = False
+            previous = stats["best_energy"]
+
+    if passed:
+        print("\n✅ 测试通过：两次 run() 返回的赛程都与最优能量一致")
+    return passed
+
+
+def test_iterations_count():
+    """
+    必须需求测试：stats["iterations"] 报告实际执行的迭代次数；按时限停止时不多算一次
+    """
+    print("\n" + "=" * 80)
+    print("测试2: 迭代次数统计")
+    print("=" * 80)
+
+    matches, males, females, total_matches = load_schedule()
+    passed = True
+
+    _, stats = LocalSearchImprover(matches, males, females, total_matches, seed=0).run(500)
+    print(f"run(500)：{stats['iterations']}次迭代")
+    if stats["iterations"] != 500:
+        print("❌ 没有时限时应执行全部 500 次迭代")
+        passed = False
+
+    # 时限每 256 次迭代检查一次：时限已过时第一次检查就停止，一次也不执行
+    _, stats = LocalSearchImprover(matches, males, females, total_matches, seed=0).run(10 ** 6, time_budget=1e-9)
+    print(f"run(10⁶, 时限 1e-9 秒)：{stats['iterations']}次迭代")
+    if stats["iterations"] != 0:
+        print("❌ 时限已过时不应报告执行了迭代")
+        passed = False
+
+    _, stats = LocalSearchImprover(matches, males, females, total_matches, seed=0).run(10 ** 6, time_budget=0.05)
+    print(f"run(10⁶, 时限 0.05 秒)：{stats['iterations']}次迭代，{stats['seconds']:.2f}秒")
+    if stats["iterations"] % 256 or stats["iterations"] >= 10 ** 6 or stats["evaluated"] > stats["iterations"]:
+        print("❌ 按时限停止时迭代次数应为已执行的次数（256 的整数倍）")
+        passed = False
+
+    if passed:
+        print("\n✅ 测试通过：迭代次数与实际执行的次数一致")
+    return passed
+
+
+def run_all_tests():
+    results = [
+        ("连续 run() 两次", test_run_twice_matches_energy()),
+        ("迭代次数统计", test_iterations_count()),
+    ]
+    print("\n" + "=" * 80)
+    for name, passed in results:
+        print(f"  {'✅ 通过' if passed else '❌ 失败'} - {name}")
+    failed = sum(1 for _, passed in results if not passed)
+    print("=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
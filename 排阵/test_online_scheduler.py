@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+实时排阵（online_scheduler.OnlineScheduler）测试
+空场开始、球员陆续到场的活动也要能正常排阵
+"""
+
+import sys
+
+from online_scheduler import OnlineScheduler
+from roster import FEMALE_PLAYERS, MALE_PLAYERS
+
+
+def test_walk_in_session():
+    """
+    必须需求测试：没有报名、球员陆续到场时，计划比赛数随到场人数更新，类型比例正常生效
+    """
+    print("=" * 80)
+    print("测试1: 空场开始的实时排阵")
+    print("=" * 80)
+
+    passed = True
+    scheduler = OnlineScheduler([], [], 2)
+    if scheduler.total_matches != 0 or scheduler.fill_courts():
+        print("❌ 没有球员时不应安排比赛")
+        passed = False
+
+    walk_ins = MALE_PLAYERS[:6] + FEMALE_PLAYERS[:4]
+    started = []
+    try:
+        for player in walk_ins:
+            scheduler.arrive(player)
+            started.extend(scheduler.fill_courts())
+        print(f"到场 {len(walk_ins)}人，计划比赛 {scheduler.total_matches}场，已开始 {len(started)}场")
+        if scheduler.total_matches <= 0:
+            print("❌ 球员到场后计划比赛数没有更新")
+            passed = False
+
+        for step in range(12):
+            match = scheduler.court_free(step % 2 + 1)
+            if match is not None:
+                started.append(match)
+        print(f"共开始 {scheduler.started}场，类型：{scheduler.type_counts}")
+        if scheduler.started < 8 or len([t for t, c in scheduler.type_counts.items() if c]) < 2:
+            print("❌ 场次或类型分布不正常")
+            passed = False
+
+        planned = scheduler.total_matches
+        scheduler.leave(walk_ins[0])
+        if scheduler.total_matches > planned:
+            print("❌ 球员离场后计划比赛数不应增加")
+            passed = False
+    except ZeroDivisionError as e:
+        print(f"❌ 排阵出错：{e!r}")
+        passed = False
+
+    try:
+        scheduler.court_free(9)
+        print("❌ 不存在的场地没有报错")
+        passed = False
+    except ValueError as e:
+        print(f"不存在的场地：{e}")
+
+    if passed:
+        print("\n✅ 测试通过：空场开始的活动正常排阵")
+    return passed
+
+
+def run_all_tests():
+    results = [("空场开始的实时排阵", test_walk_in_session())]
+    print("\n" + "=" * 80)
+    for name, passed in results:
+        print(f"  {'✅ 通过' if passed else '❌ 失败'} - {name}")
+    failed = sum(1 for _, passed in results if not passed)
+    print("=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
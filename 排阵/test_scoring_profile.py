@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+评分配置（scoring_profile）测试
+score_profiles 批量评分必须与 select_balanced_matches 的实际选择一致
+"""
+
+import random
+import sys
+from pathlib import Path
+
+from lineup_scheduler import (
+    FIXED_PARTNERS, generate_mens_doubles_matches, get_court_count, get_fixed_games_for_player,
+    get_max_games_for_player, get_pair_key, get_total_matches, is_guest_player, select_balanced_matches,
+)
+from schedule_api import normalize_signup
+from scoring_profile import CompiledProfile, make_weights, score_profiles
+
+
+PROFILES = {
+    "default": make_weights(),
+    "guest_friendly": make_weights({"guest": 0, "below_target": 300}),
+    "partners_first": make_weights({"fixed_partner": 400, "over_target": 20}),
+}
+
+
+def replay_schedule(weights, compiled, males, total_matches, court_count, seed):
+    """
+    用 weights 排一次只有男双的赛程，再逐场重放：
+    每一场都用 score_profiles 在当时的合法候选中评分，返回不一致的说明列表
+    """
+    random.seed(seed)
+    pool = list(generate_mens_doubles_matches(males))
+    matches = select_balanced_matches([], pool, [], total_matches, court_count, males, males, [], weights=weights)
+    ids = {p: i for i, p in enumerate(males)}
+    caps = []
+    for p in males:
+        fixed = get_fixed_games_for_player(p, total_matches, len(males))
+        caps.append(min(get_max_games_for_player(p), fixed) if fixed is not None else get_max_games_for_player(p))
+    profile_index = next(k for k, profile in enumerate(compiled) if profile.weights == weights)
+
+    errors = []
+    games = [0] * len(males)
+    used = set()
+    round_num, round_players = 0, set()
+    for m in matches:
+        if m["round"] != round_num:
+            round_num, round_players = m["round"], set()
+        players = [p for pair in m["match"] for p in pair]
+        if not m["fallback"]:
+            candidates = [match for match in pool if match not in used
+                          and not any(p in round_players or games[ids[p]] >= caps[ids[p]]
+                                      for pair in match for p in pair)]
+            members = [tuple(ids[p] for pair in match for p in pair) for match in candidates]
+            partner_units = {}
+            for idx, match in enumerate(candidates):
+                units = [FIXED_PARTNERS[get_pair_key(*pair)] for pair in match if get_pair_key(*pair) in FIXED_PARTNERS]
+                if units:
+                    partner_units[idx] = units
+
+            if m["match"] not in candidates:
+                errors.append(f"第{round_num}轮 {m['match']} 不是合法候选")
+            else:
+                picked = candidates.index(m["match"])
+                batch = score_profiles(compiled, members, games, partner_units)
+                # 批量结果必须与逐套单独评分相同
+                for k, profile in enumerate(compiled):
+                    if batch[k] != score_profiles([profile], members, games, partner_units)[0]:
+                        errors.append(f"第{round_num}轮：批量评分与单独评分不一致（配置 {k}）")
+                picked_score = score_profiles([compiled[profile_index]], [members[picked]], games,
+                                              {0: partner_units[picked]} if picked in partner_units else None)[0][1]
+                # 平局时选中的比赛可以不同，但评分必须是最优评分
+                if abs(batch[profile_index][1] - picked_score) > 1e-9:
+                    errors.append(f"第{round_num}轮 {m['match']}：排阵评分 {picked_score:.2f}，"
+                                  f"score_profiles 最优评分 {batch[profile_index][1]:.2f}")
+            used.add(m["match"])
+        for p in players:
+            games[ids[p]] += 1
+            round_players.add(p)
+    return errors
+
+
+def test_score_profiles_matches_greedy():
+    """
+    必须需求测试：score_profiles 与 select_balanced_matches 的评分规则相同（含固定搭档）
+    """
+    print("=" * 80)
+    print("测试1: score_profiles 与贪心排阵的每一步选择一致")
+    print("=" * 80)
+
+    with open(Path(__file__).parent / "微信接龙.txt", "r", encoding="utf-8") as f:
+        males, _ = normalize_signup(f.read())
+    court_count = get_court_count(len(males))
+    total_matches = get_total_matches(males, court_count)[0]
+    fixed_games = [get_fixed_games_for_player(p, total_matches, len(males)) for p in males]
+    max_games = [get_max_games_for_player(p) for p in males]
+    guests = [is_guest_player(p) for p in males]
+    compiled = [CompiledProfile(w, fixed_games, max_games, guests) for w in PROFILES.values()]
+
+    # 临时加入两对固定搭档，覆盖 fixed_partner 权重
+    partner_keys = {get_pair_key(males[0], males[1]): 2, get_pair_key(males[2], males[3]): 1}
+    FIXED_PARTNERS.update(partner_keys)
+    passed = True
+    try:
+        for name, weights in PROFILES.items():
+            for seed in range(3):
+                errors = replay_schedule(weights, compiled, males, total_matches, court_count, seed)
+                print(f"{'✅' if not errors else '❌'} {name} 种子 {seed}：{len(errors)}处不一致")
+                for error in errors[:5]:
+                    print(f"   {error}")
+                passed = passed and not errors
+    finally:
+        for key in partner_keys:
+            del FIXED_PARTNERS[key]
+
+    if passed:
+        print("\n✅ 测试通过：score_profiles 的最优评分与贪心排阵的每一步选择一致")
+    return passed
+
+
+def run_all_tests():
+    results = [("score_profiles 与贪心排阵一致", test_score_profiles_matches_greedy())]
+    print("\n" + "=" * 80)
+    for name, passed in results:
+        print(f"  {'✅ 通过' if passed else '❌ 失败'} - {name}")
+    failed = sum(1 for _, passed in results if not passed)
+    print("=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
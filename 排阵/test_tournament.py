@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+比赛赛程（tournament）测试
+淘汰赛的交叉排位：能避免时，同组队伍在决赛之前不相遇
+"""
+
+import sys
+
+from tournament import build_tournament, knockout_slots, meeting_round, schedule_tournament, snake_groups
+
+
+def make_teams(count):
+    return [(f"队{i + 1}甲", f"队{i + 1}乙") for i in range(count)]
+
+
+def test_same_group_meets_in_final():
+    """
+    必须需求测试：每组出线 2 队时，同组两队只可能在决赛相遇
+    """
+    print("=" * 80)
+    print("测试1: 同组出线队伍分在不同半区")
+    print("=" * 80)
+
+    passed = True
+    for team_count in range(4, 33):
+        for group_size in (3, 4, 5):
+            groups = snake_groups(make_teams(team_count), group_size)
+            slots = knockout_slots([len(g) for g in groups], 2)
+            final_round = (len(slots) - 1).bit_length()
+            positions = {}
+            for pos, slot in enumerate(slots):
+                if slot is not None:
+                    positions.setdefault(slot[0], []).append(pos)
+            for g, (winner, *others) in positions.items():
+                for pos in others:
+                    if meeting_round(winner, pos) != final_round:
+                        print(f"❌ {team_count}队 每组{group_size}队：第{g + 1}组两队在第"
+                              f"{meeting_round(winner, pos)}轮相遇（决赛为第{final_round}轮）")
+                        passed = False
+
+    if passed:
+        print("✅ 4-32 队、每组 3-5 队：同组两队都只可能在决赛相遇")
+    return passed
+
+
+def test_first_round_pairings():
+    """
+    必须需求测试：12 队每组 4 队出线 2 队（复现问题）——淘汰赛首轮没有同组对决；
+    每组出线 3 队时也不在首轮相遇
+    """
+    print("\n" + "=" * 80)
+    print("测试2: 淘汰赛首轮没有同组对决")
+    print("=" * 80)
+
+    passed = True
+    for team_count, group_size, advance in ((12, 4, 2), (16, 4, 2), (12, 4, 3), (16, 4, 3), (9, 3, 3)):
+        matches = build_tournament(make_teams(team_count), group_size, advance)
+        first_round = [m for m in matches if "组" not in m.stage and "胜者" not in m.team_a[0] + m.team_b[0]]
+        for m in first_round:
+            print(f"  {team_count}队/{group_size}/{advance}: {m.stage}{m.order} {m.team_a[0]} vs {m.team_b[0]}")
+            if m.team_a[0][0] == m.team_b[0][0]:
+                print("❌ 同组队伍在淘汰赛首轮相遇")
+                passed = False
+        schedule_tournament(matches, 4)
+
+    try:
+        build_tournament(make_teams(8), 0, 2)
+        print("❌ group_size = 0 没有被拒绝")
+        passed = False
+    except ValueError as e:
+        print(f"  group_size = 0：{e}")
+
+    if passed:
+        print("✅ 首轮没有同组对决，非法分组被拒绝")
+    return passed
+
+
+def run_all_tests():
+    results = [
+        ("同组两队只在决赛相遇", test_same_group_meets_in_final()),
+        ("淘汰赛首轮无同组对决", test_first_round_pairings()),
+    ]
+    print("\n" + "=" * 80)
+    for name, passed in results:
+        print(f"  {'✅ 通过' if passed else '❌ 失败'} - {name}")
+    failed = sum(1 for _, passed in results if not passed)
+    print("=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
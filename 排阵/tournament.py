@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Badminton Lineup Scheduler - Tournament Generator
+Group stage plus knockout bracket for a yearly tournament of fixed pairs.
+
+Teams are the usual pairs ``(player1, player2)`` and every match uses the
+normal match dict, so the result exports with create_lineup_excel. The
+type label carries the stage ("混双 A组", "混双 半决赛"), and schedule_metrics
+still counts it as the base type.
+
+Stages:
+- 小组赛：蛇形分组，组内单循环（轮转法）
+- 淘汰赛：各组前 N 名交叉进入淘汰赛，人数不足 2 的幂时种子队轮空；
+  同组队伍尽量分在不同半区（小组第 2 与本组第 1 分在两个半区），能避免时不提前相遇
+
+Courts and time slots are assigned by a list scheduler over the match
+dependency graph (a knockout match waits for the matches that decide its
+teams). Ready matches are ranked by critical path - the longest chain of
+matches that still depends on them - so the bracket never waits on a late
+group, and ties go to teams that did not play in the previous slot (fewer
+back-to-back games). A 64-team event is laid out in a few milliseconds.
+
+Usage:
+    python tournament.py --teams 参赛队伍.txt --courts 4          # 每行一队："张三/李四"
+    python tournament.py --teams 参赛队伍.txt --group-size 4 --advance 2 --type 混双 --output 赛程表.xlsx
+"""
+
+import argparse
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lineup_scheduler import create_lineup_excel
+
+
+Team = Tuple[str, ...]
+
+# 淘汰赛轮次名称（按本轮参赛队数）
+KNOCKOUT_STAGE_NAMES = {2: "决赛", 4: "半决赛", 8: "四分之一决赛"}
+
+
+class TournamentMatch:
+    """One match in the dependency graph (teams may be placeholders until results are known)."""
+
+    __slots__ = ("id", "stage", "team_a", "team_b", "depends", "teams", "order",
+                 "critical_path", "slot", "court")
+
+    def __init__(self, match_id: int, stage: str, team_a: Team, team_b: Team,
+                 depends: Sequence[int] = (), teams: Sequence[str] = (), order: int = 0):
+        self.id = match_id
+        self.stage = stage
+        self.team_a = team_a
+        self.team_b = team_b
+        self.depends = list(depends)     # 必须先打完的比赛
+        self.teams = tuple(teams)        # 参赛队标识（同一时段不能出现两次）
+        self.order = order               # 同优先级时的先后（组内轮次）
+        self.critical_path = 1
+        self.slot: Optional[int] = None
+        self.court: Optional[int] = None
+
+
+def snake_groups(teams: List[Team], group_size: int) -> List[List[Team]]:
+    """Split seeded ``teams`` into groups of about ``group_size`` (蛇形分组: 1-8-9-16 / 2-7-10-15 ...)."""
+    group_count = max(1, -(-len(teams) // group_size))
+    groups: List[List[Team]] = [[] for _ in range(group_count)]
+    for i, team in enumerate(teams):
+        row, col = divmod(i, group_count)
+        groups[col if row % 2 == 0 else group_count - 1 - col].append(team)
+    return groups
+
+
+def round_robin_rounds(size: int) -> List[List[Tuple[int, int]]]:
+    """Circle-method round robin: each round is a list of (i, j) index pairs, every pair exactly once."""
+    slots = list(range(size)) + ([None] if size % 2 else [])
+    rounds = []
+    for _ in range(len(slots) - 1):
+        pairs = [(slots[k], slots[-1 - k]) for k in range(len(slots) // 2)]
+        rounds.append([(a, b) for a, b in pairs if a is not None and b is not None])
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def bracket_order(size: int) -> List[int]:
+    """Standard seeding positions for a bracket of ``size`` (power of 2): [1, 8, 4, 5, 2, 7, 3, 6] ..."""
+    order = [1]
+    while len(order) < size:
+        n = len(order) * 2
+        order = [s for seed in order for s in (seed, n + 1 - seed)]
+    return order
+
+
+def meeting_round(pos_a: int, pos_b: int) -> int:
+    """Knockout round (1 = first round) in which bracket positions ``pos_a`` and ``pos_b`` can meet."""
+    return (pos_a ^ pos_b).bit_length()
+
+
+def knockout_slots(group_sizes: Sequence[int], advance: int) -> List[Optional[Tuple[int, int]]]:
+    """
+    Bracket positions of the qualifiers: (组序号, 组内名次) per position, None for a bye.
+
+    Qualifiers are seeded rank by rank (各组第 1，再各组第 2 ...) into the
+    positions of the standard seeding order. Within a rank, each team takes the
+    free position of its tier that meets its own group's teams as late as
+    possible, so a runner-up lands in the other half from its group winner.
+    """
+    seeds = [(g, rank) for rank in range(advance) for g, count in enumerate(group_sizes) if rank < count]
+    if len(seeds) < 2:
+        return []
+    size = 1
+    while size < len(seeds):
+        size *= 2
+
+    position_of_seed = {seed: pos for pos, seed in enumerate(bracket_order(size))}
+    slots: List[Optional[Tuple[int, int]]] = [None] * size
+    placed: Dict[int, List[int]] = {}
+    start = 0
+    while start < len(seeds):
+        rank = seeds[start][1]
+        tier = [s for s in seeds[start:] if s[1] == rank]
+        free = [position_of_seed[n] for n in range(start + 1, start + len(tier) + 1)]
+        for g, _ in tier:
+            # 与同组已出线队伍的最早相遇轮次越晚越好；相同时按标准种子位置
+            pos = max(free, key=lambda p: min((meeting_round(p, q) for q in placed.get(g, ())), default=0))
+            free.remove(pos)
+            slots[pos] = (g, rank)
+            placed.setdefault(g, []).append(pos)
+        start += len(tier)
+    return slots
+
+
+def stage_name(teams_left: int) -> str:
+    return KNOCKOUT_STAGE_NAMES.get(teams_left, f"{teams_left}强")
+
+
+def group_label(index: int) -> str:
+    return chr(ord("A") + index) if index < 26 else f"G{index + 1}"
+
+
+def build_tournament(teams: List[Team], group_size: int = 4, advance: int = 2) -> List[TournamentMatch]:
+    """
+    Build the match graph: group round robins, then the knockout bracket.
+
+    Args:
+        teams: 按种子顺序排列的参赛队（每队为两名球员）
+        group_size: 每组队数
+        advance: 每组出线队数
+    """
+    if len(teams) < 2:
+        raise ValueError("至少需要 2 支队伍")
+    if group_size < 1:
+        raise ValueError("每组至少 1 支队伍")
+    matches: List[TournamentMatch] = []
+    groups = snake_groups(teams, group_size)
+    group_matches: List[List[int]] = []
+    for g, group in enumerate(groups):
+        label = group_label(g)
+        ids = []
+        for r, pairs in enumerate(round_robin_rounds(len(group))):
+            for i, j in pairs:
+                match = TournamentMatch(len(matches), f"{label}组", group[i], group[j],
+                                        teams=("/".join(group[i]), "/".join(group[j])), order=r)
+                matches.append(match)
+                ids.append(match.id)
+        group_matches.append(ids)
+
+    # 出线种子：先各组第 1，再各组第 2 ...，交叉排位让同组队伍尽量晚相遇
+    slots = knockout_slots([len(group) for group in groups], advance)
+    if not slots:
+        return matches
+
+    # 当前轮次每个位置：(队伍显示名, 依赖的比赛)；None 表示轮空
+    entries: List[Optional[Tuple[Team, List[int]]]] = [
+        ((f"{group_label(slot[0])}组第{slot[1] + 1}",), group_matches[slot[0]]) if slot else None
+        for slot in slots
+    ]
+
+    teams_left = len(slots)
+    while len(entries) > 1:
+        stage = stage_name(teams_left)
+        next_entries = []
+        number = 0
+        for k in range(0, len(entries), 2):
+            a, b = entries[k], entries[k + 1]
+            if a is None or b is None:
+                next_entries.append(a or b)  # 轮空直接晋级
+                continue
+            number += 1
+            label = stage if teams_left == 2 else f"{stage}{number}"
+            match = TournamentMatch(len(matches), stage, a[0], b[0], depends=a[1] + b[1],
+                                    order=number)
+            matches.append(match)
+            next_entries.append(((f"{label}胜者",), [match.id]))
+        entries = next_entries
+        teams_left //= 2
+    return matches
+
+
+def schedule_tournament(matches: List[TournamentMatch], court_count: int) -> int:
+    """
+    Assign a time slot and court to every match (list scheduling, critical-path priority).
+
+    Returns the number of time slots used.
+    """
+    successors: Dict[int, List[int]] = {m.id: [] for m in matches}
+    pending = {m.id: len(set(m.depends)) for m in matches}
+    for m in matches:
+        for d in set(m.depends):
+            successors[d].append(m.id)
+
+    # 关键路径：自身 + 后续最长依赖链（比赛按创建顺序即拓扑序）
+    for m in reversed(matches):
+        m.critical_path = 1 + max((matches[s].critical_path for s in successors[m.id]), default=0)
+
+    ready = [m for m in matches if not pending[m.id]]
+    finished_at: Dict[int, int] = {}
+    last_played: Dict[str, int] = {}
+    done = 0
+    slot = 0
+    while done < len(matches):
+        slot += 1
+        # 依赖的比赛必须在之前的时段打完；优先关键路径长的，其次上一时段没上场的队伍
+        candidates = [m for m in ready if all(finished_at[d] < slot for d in m.depends)]
+        candidates.sort(key=lambda m: (-m.critical_path,
+                                       any(last_played.get(t) == slot - 1 for t in m.teams),
+                                       m.order, m.id))
+        busy = set()
+        court = 0
+        for m in candidates:
+            if court == court_count:
+                break
+            if busy.intersection(m.teams):
+                continue
+            court += 1
+            m.slot, m.court = slot, court
+            busy.update(m.teams)
+            for t in m.teams:
+                last_played[t] = slot
+            finished_at[m.id] = slot
+            ready.remove(m)
+            done += 1
+            for s in successors[m.id]:
+                pending[s] -= 1
+                if not pending[s]:
+                    ready.append(matches[s])
+        if not court and not ready:
+            raise ValueError("比赛依赖关系存在环，无法排程")
+    return slot
+
+
+def tournament_matches(matches: List[TournamentMatch], match_type: str) -> List[Dict]:
+    """Scheduled matches as the usual match dicts (round = time slot), sorted by slot and court."""
+    result = []
+    for m in sorted(matches, key=lambda m: (m.slot, m.court)):
+        result.append({
+            "type": f"{match_type} {m.stage}",
+            "match": (m.team_a, m.team_b),
+            "fallback": False,
+            "court": m.court,
+            "round": m.slot,
+        })
+    return result
+
+
+def back_to_back_count(matches: List[TournamentMatch]) -> int:
+    """Number of times a known team plays in two consecutive time slots."""
+    slots: Dict[str, List[int]] = {}
+    for m in matches:
+        for t in m.teams:
+            slots.setdefault(t, []).append(m.slot)
+    return sum(1 for played in slots.values() for a, b in zip(sorted(played), sorted(played)[1:]) if b == a + 1)
+
+
+def lower_bound_slots(matches: List[TournamentMatch], court_count: int) -> int:
+    """Makespan lower bound: max(场地容量, 最长依赖链)."""
+    return max(-(-len(matches) // court_count), max((m.critical_path for m in matches), default=0))
+
+
+def read_teams(path: str) -> List[Team]:
+    teams = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                teams.append(tuple(p.strip() for p in line.replace("，", "/").replace(",", "/").split("/")))
+    return teams
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="羽毛球比赛 - 小组赛 + 淘汰赛赛程")
+    parser.add_argument("--teams", required=True, help="参赛队伍文件，每行一队（按种子顺序）：张三/李四")
+    parser.add_argument("--type", default="混双", help="比赛类型（默认 混双）")
+    parser.add_argument("--group-size", type=int, default=4, help="每组队数（默认 4）")
+    parser.add_argument("--advance", type=int, default=2, help="每组出线队数（默认 2）")
+    parser.add_argument("--courts", type=int, default=4, help="场地数（默认 4）")
+    parser.add_argument("--output", default="赛程表.xlsx", help="输出 Excel 路径")
+    args = parser.parse_args(argv)
+
+    teams = read_teams(args.teams)
+    matches = build_tournament(teams, args.group_size, args.advance)
+    slots = schedule_tournament(matches, args.courts)
+    print(f"参赛队伍：{len(teams)}支，比赛：{len(matches)}场，场地：{args.courts}个")
+    print(f"总时段：{slots}（下界 {lower_bound_slots(matches, args.courts)}）")
+    print(f"连续两个时段上场：{back_to_back_count(matches)}次")
+
+    create_lineup_excel(tournament_matches(matches, args.type), args.courts, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+混双大乱斗赛程校验
+把赛程转换成每名球员的轮次位图（第 r 位 = 第 r 轮上场），一次遍历检查全部规则：
+
+- 场次：每人场次等于目标（默认男队员 len(女队员) 场，女队员 len(男队员) 场）
+- 同轮重复：同一名球员在同一轮出现两次（包括同一场里出现两次）
+- 连续休息：打满场次前连续休息超过 max_rest 轮（位图取反后移位相与）
+- 配对重复：同一 (男, 女) 配对出现两次
+- 优先排阵：优先球员从第1轮起连续上场直到打满场次（位图必须是 1..目标 的连续位）
+
+检查只用整数位运算，几十场的赛程每次校验在几十微秒量级，
+足够对成千上万个随机生成的赛程做压力测试。
+
+用法:
+    python chaos_validator.py                     # 随机生成 2000 个赛程并校验
+    python chaos_validator.py --cases 20000 --max-group 12 --max-courts 4
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Dict, Iterable, List, Optional
+
+
+# 结构性错误：任何赛程都不应出现
+HARD_RULES = ("round_duplicates", "invalid_matches", "unknown_players", "pair_repeats")
+# 公平规则：个别人数组合下可能无法同时满足
+FAIR_RULES = ("games", "rest", "priority")
+
+
+def round_masks(matches: List[Dict], players: List[str]) -> Dict:
+    """
+    赛程的关联数组：每名球员（按 players 顺序）的轮次位图与场次
+
+    Returns:
+        {"masks", "games", "round_duplicates", "invalid_matches", "unknown_players", "pair_repeats"}
+    """
+    index = {p: i for i, p in enumerate(players)}
+    masks = [0] * len(players)
+    games = [0] * len(players)
+    round_duplicates = invalid_matches = unknown_players = pair_repeats = 0
+    pairs = set()
+    for m in matches:
+        bit = 1 << m["round"]
+        pair_a, pair_b = m["match"]
+        if pair_a[0] == pair_b[0] or pair_a[1] == pair_b[1]:
+            invalid_matches += 1
+        for pair in (pair_a, pair_b):
+            if pair in pairs:
+                pair_repeats += 1
+            else:
+                pairs.add(pair)
+            for p in pair:
+                i = index.get(p)
+                if i is None:
+                    unknown_players += 1
+                    continue
+                if masks[i] & bit:
+                    round_duplicates += 1
+                masks[i] |= bit
+                games[i] += 1
+    return {
+        "masks": masks,
+        "games": games,
+        "round_duplicates": round_duplicates,
+        "invalid_matches": invalid_matches,
+        "unknown_players": unknown_players,
+        "pair_repeats": pair_repeats,
+    }
+
+
+def validate_schedule(
+    matches: List[Dict],
+    group_a_males: List[str],
+    group_b_females: List[str],
+    priority_players: Iterable[str] = (),
+    targets: Optional[Dict[str, int]] = None,
+    max_rest: Optional[int] = 1,
+    rest_exempt: Iterable[str] = ()
+) -> Dict[str, int]:
+    """
+    校验一个混双大乱斗赛程
+
+    Args:
+        targets: 每人目标场次（默认男队员 len(女队员) 场，女队员 len(男队员) 场）
+        max_rest: 打满场次前最多连续休息的轮数；None 表示不检查
+        rest_exempt: 不检查连续休息的球员（如每轮上场不超过一半人的组）
+
+    Returns:
+        每条规则的违规次数，键见 HARD_RULES / FAIR_RULES；全为 0 表示赛程合格
+    """
+    players = group_a_males + group_b_females
+    report = round_masks(matches, players)
+    masks, games = report.pop("masks"), report.pop("games")
+    if targets is None:
+        target_list = [len(group_b_females)] * len(group_a_males) + [len(group_a_males)] * len(group_b_females)
+    else:
+        target_list = [targets[p] for p in players]
+
+    report["games"] = sum(1 for g, t in zip(games, target_list) if g != t)
+
+    rest = 0
+    if max_rest is not None:
+        exempt = set(rest_exempt)
+        for p, mask in zip(players, masks):
+            if not mask or p in exempt:
+                continue
+            # 第 1 轮到最后一次上场之间没上场的轮次；连续 max_rest+1 个休息位即违规
+            run = ((1 << mask.bit_length()) - 2) & ~mask
+            for _ in range(max_rest):
+                run &= run >> 1
+            if run:
+                rest += 1
+    report["rest"] = rest
+
+    index = {p: i for i, p in enumerate(players)}
+    report["priority"] = sum(1 for p in priority_players
+                             if p in index and masks[index[p]] != (1 << (target_list[index[p]] + 1)) - 2)
+    return report
+
+
+def violation_count(report: Dict[str, int], rules: Iterable[str] = HARD_RULES + FAIR_RULES) -> int:
+    return sum(report[r] for r in rules)
+
+
+def random_event(rng: random.Random, max_group: int = 8, max_courts: int = 4):
+    """随机的混双大乱斗参数：(男队员, 女队员, 场地数, 优先球员)；配对总数为偶数"""
+    n_males, n_females = rng.randint(2, max_group), rng.randint(2, max_group)
+    if n_males * n_females % 2:
+        n_males += 1
+    males = [f"男{i + 1}" for i in range(n_males)]
+    females = [f"女{i + 1}" for i in range(n_females)]
+    priority = rng.sample(males + females, rng.choice((0, 0, 1, 2)))
+    return males, females, rng.randint(1, max_courts), priority
+
+
+def stress_test(cases: int = 2000, seed: int = 0, max_group: int = 8, max_courts: int = 4,
+                seeds: int = 8) -> Dict:
+    """
+    随机生成 cases 个赛程（公平模式）逐一校验
+
+    Returns:
+        {"cases", "hard_failures": [(参数, 报告)], "rule_failures": {规则: 次数},
+         "generate_seconds", "validate_seconds"}
+    """
+    from mixed_doubles_chaos import generate_mixed_doubles_matches, rest_exempt_players
+
+    rng = random.Random(seed)
+    hard_failures = []
+    rule_failures = dict.fromkeys(FAIR_RULES, 0)
+    generate_seconds = validate_seconds = 0.0
+    for _ in range(cases):
+        males, females, court_count, priority = random_event(rng, max_group, max_courts)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):  # 生成器会打印未满足规则的警告
+            matches = generate_mixed_doubles_matches(males, females, court_count, "fair", priority, seeds=seeds)
+        generate_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = validate_schedule(matches, males, females, priority,
+                                   rest_exempt=rest_exempt_players(males, females, court_count))
+        validate_seconds += time.perf_counter() - start
+
+        if violation_count(report, HARD_RULES):
+            hard_failures.append(((len(males), len(females), court_count, priority), report))
+        for rule in FAIR_RULES:
+            if report[rule]:
+                rule_failures[rule] += 1
+    return {
+        "cases": cases,
+        "hard_failures": hard_failures,
+        "rule_failures": rule_failures,
+        "generate_seconds": generate_seconds,
+        "validate_seconds": validate_seconds,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="混双大乱斗 - 随机赛程压力校验")
+    parser.add_argument("--cases", type=int, default=2000, help="随机赛程数（默认 2000）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--max-group", type=int, default=8, help="每组最多人数（默认 8）")
+    parser.add_argument("--max-courts", type=int, default=4, help="最多场地数（默认 4）")
+    parser.add_argument("--seeds", type=int, default=8, help="生成器的种子搜索数（默认 8）")
+    args = parser.parse_args(argv)
+
+    result = stress_test(args.cases, args.seed, args.max_group, args.max_courts, args.seeds)
+    cases = result["cases"]
+    print(f"随机赛程：{cases}个（每组 2-{args.max_group} 人，1-{args.max_courts} 个场地）")
+    print(f"生成耗时：{result['generate_seconds']:.2f}s，"
+          f"校验耗时：{result['validate_seconds']:.3f}s（{cases / max(result['validate_seconds'], 1e-9):.0f} 个/秒）")
+    for rule, count in result["rule_failures"].items():
+        print(f"  {rule:<10}未满足：{count}个（{count / cases:.1%}）")
+    if result["hard_failures"]:
+        print(f"❌ 结构性错误：{len(result['hard_failures'])}个")
+        for params, report in result["hard_failures"][:10]:
+            print(f"  {params}: {report}")
+        return 1
+    print("✅ 所有赛程均无同轮重复、无效比赛或重复配对")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
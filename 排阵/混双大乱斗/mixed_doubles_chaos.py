@@ -2,13 +2,22 @@
 """
 混双大乱斗排阵系统
 A组男队员和B组女队员依次组合对战
-支持2个场地同时进行，确保同一轮次球员不重复
+支持多个场地同时进行、两组人数不同，确保同一轮次球员不重复
 """
 
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from typing import List, Tuple, Dict
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from typing import List, Tuple, Dict, Optional
+import heapq
 import itertools
+import math
+import os
+
+from chaos_validator import validate_schedule, violation_count
+
+
+DEFAULT_SEARCH_SEEDS = 64  # 公平模式构造不出合格赛程时搜索的种子数
 
 
 def generate_mixed_doubles_matches(
@@ -16,19 +25,23 @@ def generate_mixed_doubles_matches(
     group_b_females: List[str],
     court_count: int = 2,
     mode: str = "fair",
-    priority_players: List[str] = None
+    priority_players: List[str] = None,
+    seeds: int = DEFAULT_SEARCH_SEEDS,
+    workers: int = 1
 ) -> List[Dict]:
     """
     生成混双大乱斗对阵表
     
     Args:
         group_a_males: A组男队员列表
-        group_b_females: B组女队员列表
+        group_b_females: B组女队员列表（人数可以与A组不同）
         court_count: 场地数量（默认2）
         mode: 排阵模式
             - "fair": 公平模式，每个男队员与每个女队员组合一次（推荐）
             - "max": 最大场次模式，尽可能多的比赛
         priority_players: 需要优先排阵的球员列表（如需要提前回家的球员）
+        seeds: 公平模式构造不出合格赛程时，搜索的随机种子数
+        workers: 种子搜索的并行进程数（默认 1）
     
     Returns:
         比赛列表，每个元素包含：
@@ -37,10 +50,9 @@ def generate_mixed_doubles_matches(
         - type: 比赛类型
         - match: ((男1, 女1), (男2, 女2))
     """
-    matches = []
-    
     if mode == "fair":
-        return _generate_fair_mode(group_a_males, group_b_females, court_count, priority_players)
+        return _generate_fair_mode(group_a_males, group_b_females, court_count, priority_players,
+                                   seeds, workers)
     else:
         return _generate_max_mode(group_a_males, group_b_females, court_count)
 
@@ -49,119 +61,260 @@ def _generate_fair_mode(
     group_a_males: List[str],
     group_b_females: List[str],
     court_count: int = 2,
-    priority_players: List[str] = None
+    priority_players: List[str] = None,
+    seeds: int = DEFAULT_SEARCH_SEEDS,
+    workers: int = 1
 ) -> List[Dict]:
     """
-    公平模式：严格按照优先级生成赛程
+    公平模式：男队员各打 len(女队员) 场，女队员各打 len(男队员) 场（两组人数相同时每人 n 场）
+    
+    1. 先直接构造赛程（拉丁方 / 中国剩余定理），满足规则就返回
+    2. 否则运行逐轮启发式；仍不满足时并行搜索多个随机种子，返回第一个满足规则的赛程
+    3. 都不满足时返回违规最少的赛程并打印警告
+    
+    规则：同组每人场次相同、休息不超过一轮（某组每轮上场不超过一半人时无法保证，不检查）、
+    优先排阵球员从第1轮起连续上场。
+    
+    Args:
+        priority_players: 需要优先排阵的球员列表（如需要提前回家的球员）
+    """
+    priority_players = priority_players or []
+    candidates = []  # (违规次数, 赛程)
+    matches = _construct_fair_schedule(group_a_males, group_b_females, court_count)
+    if matches is not None:
+        violations = _fair_violations(matches, group_a_males, group_b_females, court_count, priority_players)
+        if not violations:
+            return matches
+        candidates.append((violations, matches))
+    
+    matches = _generate_fair_mode_heuristic(group_a_males, group_b_females, court_count, priority_players)
+    violations = _fair_violations(matches, group_a_males, group_b_females, court_count, priority_players)
+    candidates.append((violations, matches))
+    if violations and seeds > 0:
+        matches = search_fair_schedule(group_a_males, group_b_females, court_count, priority_players,
+                                       range(seeds), workers)
+        if matches is not None:
+            return matches
+    if violations:
+        violations, matches = min(candidates, key=lambda c: c[0])
+    
+    if violations:
+        print(f"⚠️  警告：未能找到完全满足规则的赛程（违规 {violations} 处）")
+        games = _player_games(matches)
+        for p in group_a_males + group_b_females:
+            target = len(group_b_females) if p in group_a_males else len(group_a_males)
+            if games.get(p, 0) != target:
+                print(f"  {p}: {games.get(p, 0)}场（应为{target}场）")
+    return matches
+
+
+def search_fair_schedule(
+    group_a_males: List[str],
+    group_b_females: List[str],
+    court_count: int = 2,
+    priority_players: List[str] = None,
+    seeds=range(DEFAULT_SEARCH_SEEDS),
+    workers: int = 1
+) -> Optional[List[Dict]]:
+    """
+    多种子搜索：每个种子打乱启发式的枚举顺序（同分候选的先后）
+    
+    workers > 1 时种子在进程池中并行运行，结果按种子顺序检查，
+    找到第一个满足规则的赛程后取消其余种子，因此结果与并行度无关。
+    
+    Returns:
+        第一个满足规则的赛程；所有种子都不满足时返回 None
+    """
+    args = [(seed, group_a_males, group_b_females, court_count, priority_players or []) for seed in seeds]
+    if workers > 1 and len(args) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(_search_seed, a) for a in args]
+            for future in futures:
+                matches = future.result()
+                if matches is not None:
+                    return matches
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return None
+    for a in args:
+        matches = _search_seed(a)
+        if matches is not None:
+            return matches
+    return None
+
+
+def _search_seed(args) -> Optional[List[Dict]]:
+    """一个种子的启发式排阵；不满足规则时返回 None（进程池任务）"""
+    seed, group_a_males, group_b_females, court_count, priority_players = args
+    matches = _generate_fair_mode_heuristic(group_a_males, group_b_females, court_count, priority_players, seed)
+    if _fair_violations(matches, group_a_males, group_b_females, court_count, priority_players):
+        return None
+    return matches
+
+
+def _construct_fair_schedule(
+    group_a_males: List[str],
+    group_b_females: List[str],
+    court_count: int = 2
+) -> Optional[List[Dict]]:
+    """
+    直接构造：每个男队员与每个女队员恰好搭配一次
+    
+    把全部配对排成一条序列，每轮按顺序取 2×场地数 个位置，相邻两个配对组成一场比赛。
+    
+    两组人数相同（n 人）时用拉丁方：序列分成 n 段，第 m 段第 p 个位置是男队员 p 的第 m+1 场。
+    女队员沿位置环 0, 2, 4, ..., n-1, ..., 3, 1 每段前进一格，因此每段是一个完整的
+    男女配对（拉丁方的一行），且女队员每段的位置最多移动 2。
+    - 同一名球员两次出场至少相隔 n-2 个位置，同轮不会重复
+    - n < 4×场地数 时没有人连续休息两轮
+    
+    两组人数互质时第 a 个位置是 (男队员 a % 男队员人数, 女队员 a % 女队员人数)，
+    由中国剩余定理每个配对恰好出现一次，且两组球员都严格按人数周期上场。
+    
+    时间复杂度与比赛数成正比。其他人数组合，或配对总数为奇数（无法两两成场）时返回 None。
+    """
+    n_males, n_females = len(group_a_males), len(group_b_females)
+    if n_males < 2 or n_females < 2 or (n_males * n_females) % 2:
+        return None
+    per_round = 2 * min(court_count, n_males // 2, n_females // 2)  # 每轮上场的配对数
+    
+    if n_males == n_females:
+        n = n_males
+        ring = list(range(0, n, 2)) + list(range(n - 1, 0, -2))
+        ring_index = {pos: k for k, pos in enumerate(ring)}
+        pairs = [(group_a_males[a % n], group_b_females[(ring_index[a % n] - a // n) % n]) for a in range(n * n)]
+    elif math.gcd(n_males, n_females) == 1:
+        pairs = [(group_a_males[a % n_males], group_b_females[a % n_females]) for a in range(n_males * n_females)]
+    else:
+        return None
+    
+    matches = []
+    for start in range(0, len(pairs), per_round):
+        round_pairs = pairs[start:start + per_round]
+        for court_idx in range(len(round_pairs) // 2):
+            matches.append({
+                "round": start // per_round + 1,
+                "court": court_idx + 1,
+                "type": "混双",
+                "match": (round_pairs[2 * court_idx], round_pairs[2 * court_idx + 1])
+            })
+    return matches
+
+
+def _player_games(matches: List[Dict]) -> Dict[str, int]:
+    games = {}
+    for m in matches:
+        for p in m["match"][0] + m["match"][1]:
+            games[p] = games.get(p, 0) + 1
+    return games
+
+
+def rest_exempt_players(group_a_males: List[str], group_b_females: List[str], court_count: int) -> List[str]:
+    """每轮上场不超过一半人的组无法保证休息不超过一轮，这些球员不检查连续休息"""
+    per_round = min(court_count, len(group_a_males) // 2, len(group_b_females) // 2)
+    return [p for group in (group_a_males, group_b_females) if len(group) >= 4 * per_round for p in group]
+
+
+def _fair_violations(
+    matches: List[Dict],
+    group_a_males: List[str],
+    group_b_females: List[str],
+    court_count: int,
+    priority_players: List[str]
+) -> int:
+    """
+    公平模式的违规次数（0 = 满足全部规则，见 chaos_validator.validate_schedule）
+    
+    - 场次不等于目标（男队员 len(女队员) 场，女队员 len(男队员) 场）的球员数
+    - 打满场次前连续休息两轮及以上的球员数（rest_exempt_players 除外）
+    - 未从第1轮起连续上场的优先排阵球员数
+    """
+    report = validate_schedule(matches, group_a_males, group_b_females, priority_players,
+                               rest_exempt=rest_exempt_players(group_a_males, group_b_females, court_count))
+    return violation_count(report)
+
+
+def _generate_fair_mode_heuristic(
+    group_a_males: List[str],
+    group_b_females: List[str],
+    court_count: int = 2,
+    priority_players: List[str] = None,
+    seed: Optional[int] = None
+) -> List[Dict]:
+    """
+    公平模式（启发式）：严格按照优先级逐轮贪心生成赛程
     
     优先级：
-    1. 【必须】每个人场次一样（6场）
+    1. 【必须】同组每个人场次一样（男队员 len(女队员) 场，女队员 len(男队员) 场）
     2. 【必须】休息1轮后必须上场
     3. 【可选】每个男队员尽量和不同女队员搭配
-    4. 【可选】尽量每轮2个场地并发
+    4. 【可选】尽量每轮所有场地并发
     5. 【特殊】指定球员优先排阵（不休息，排在前面轮次）
     
     Args:
         priority_players: 需要优先排阵的球员列表（如需要提前回家的球员）
+        seed: 随机种子；给定时打乱球员的枚举顺序和新配对加分（同分候选的先后），供多种子搜索使用
     """
     import random
     
-    if priority_players is None:
-        priority_players = []
+    priority_players = set(priority_players or [])
     
     males = group_a_males[:]
     females = group_b_females[:]
-    n = len(males)
-    target_games = n  # 每人应该打6场
+    # 新配对加分（优先级3）；给定种子时在 10~19 之间随机，只打破同分，不影响更高的优先级
+    pair_bonus = {(m, f): 10 for m in males for f in females}
+    if seed is not None:
+        rng = random.Random(seed)
+        rng.shuffle(males)
+        rng.shuffle(females)
+        pair_bonus = {pair: rng.randrange(10, 20) for pair in pair_bonus}
+    per_round = min(court_count, len(males) // 2, len(females) // 2)  # 每轮场地数
     
     matches = []
     pair_used = set()  # 已使用的(男,女)配对
-    player_games = {p: 0 for p in males + females}  # 每人已打场次
-    last_round_players = set()  # 上一轮上场的球员
+    # 每人还差的场次（每个男队员与每个女队员组合一次）
+    remaining = {m: len(females) for m in males}
+    remaining.update({f: len(males) for f in females})
     rested_last_round = set()  # 上一轮休息的球员
     
     current_round = 1
-    max_rounds = 20
+    max_rounds = len(males) * len(females)  # 每轮至少安排一场，不会超过该轮数
     
     while current_round <= max_rounds:
         used_in_round = set()
         round_matches = []
         
-        # 找出所有可以安排的比赛候选
-        candidates = []
-        for m1_idx, male1 in enumerate(males):
-            for f1_idx, female1 in enumerate(females):
-                pair1 = (male1, female1)
-                if pair1 in pair_used:
-                    continue
-                
-                for m2_idx, male2 in enumerate(males):
-                    if m2_idx == m1_idx:
-                        continue
-                    for f2_idx, female2 in enumerate(females):
-                        if f2_idx == f1_idx:
-                            continue
-                        
-                        pair2 = (male2, female2)
-                        if pair2 in pair_used:
-                            continue
-                        
-                        match = ((male1, female1), (male2, female2))
-                        match_players = {male1, male2, female1, female2}
-                        
-                        # 检查是否与本轮已安排的球员冲突
-                        if match_players & used_in_round:
-                            continue
-                        
-                        # 计算优先级分数
-                        priority = 0
-                        
-                        # 优先级5【特殊】：包含优先排阵球员（最高优先级）
-                        priority_in_match = match_players & set(priority_players)
-                        can_play_priority = [p for p in priority_in_match if player_games[p] < target_games]
-                        priority += len(can_play_priority) * 50000
-                        
-                        # 优先级2【必须】：包含上一轮休息且未满6场的球员（高优先级）
-                        rested_in_match = match_players & rested_last_round
-                        can_play = [p for p in rested_in_match if player_games[p] < target_games]
-                        priority += len(can_play) * 10000
-                        
-                        # 优先级1【必须】：优先安排场次少的球员
-                        min_games = min(player_games[p] for p in match_players)
-                        max_games = max(player_games[p] for p in match_players)
-                        # 如果有人已经打满6场，这场比赛不应该被优先考虑
-                        if max_games >= target_games:
-                            priority -= 5000
-                        priority += (target_games - min_games) * 100
-                        
-                        # 优先级3：尽量使用未使用过的配对
-                        new_pairs = sum(1 for p in [pair1, pair2] if p not in pair_used)
-                        priority += new_pairs * 10
-                        
-                        candidates.append((priority, match, match_players, pair1, pair2))
+        # 每名球员对本场优先级的贡献（优先级5、2）
+        gain = {}
+        for p in males + females:
+            can_play = remaining[p] > 0
+            gain[p] = (50000 if can_play and p in priority_players else 0) + \
+                      (10000 if can_play and p in rested_last_round else 0)
         
-        if not candidates:
-            break
-        
-        # 按优先级排序
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        
-        # 尝试安排最多2场比赛
-        for priority, match, match_players, pair1, pair2 in candidates:
-            if len(round_matches) >= 2:
+        # 按优先级从高到低挑选互不冲突的比赛，每个场地一场；
+        # 候选只保留前 k 个，前 k 个都冲突时排除已上场球员再找一次
+        while len(round_matches) < per_round:
+            candidates = _top_candidates(males, females, per_round - len(round_matches), pair_used,
+                                         pair_bonus, remaining, gain, used_in_round)
+            if not candidates:
                 break
-            
-            # 再次检查是否冲突（因为used_in_round可能在循环中更新）
-            if match_players & used_in_round:
-                continue
-            
-            round_matches.append(match)
-            used_in_round.update(match_players)
-            pair_used.add(pair1)
-            pair_used.add(pair2)
-            
-            for p in match_players:
-                player_games[p] += 1
+            for priority, match, match_players, pair1, pair2 in candidates:
+                if len(round_matches) >= per_round:
+                    break
+                
+                # 再次检查是否冲突（因为used_in_round可能在循环中更新）
+                if match_players & used_in_round:
+                    continue
+                
+                round_matches.append(match)
+                used_in_round.update(match_players)
+                pair_used.add(pair1)
+                pair_used.add(pair2)
+                
+                for p in match_players:
+                    remaining[p] -= 1
         
         if round_matches:
             for court_idx, match in enumerate(round_matches):
@@ -174,25 +327,92 @@ def _generate_fair_mode(
             
             # 更新状态
             rested_last_round = set(males + females) - used_in_round
-            last_round_players = used_in_round.copy()
             current_round += 1
         else:
             break
         
-        # 检查是否所有人都打了6场
-        if all(g == target_games for g in player_games.values()):
+        # 检查是否所有人都打满场次
+        if all(r == 0 for r in remaining.values()):
             break
     
-    # 验证是否满足要求
-    if not all(g == target_games for g in player_games.values()):
-        print(f"⚠️  警告：未能让所有人都打{target_games}场")
-        for p, g in player_games.items():
-            if g != target_games:
-                print(f"  {p}: {g}场")
-    
     return matches
 
 
+def _top_candidates(
+    males: List[str],
+    females: List[str],
+    k: int,
+    pair_used: set,
+    pair_bonus: Dict[Tuple[str, str], int],
+    remaining: Dict[str, int],
+    gain: Dict[str, int],
+    excluded: set
+) -> List[Tuple]:
+    """
+    优先级最高的 k 个候选比赛（有界最小堆 + 上界剪枝）
+    
+    优先级 = 4名球员的 gain 之和 + 最多还差的场次×100 - 有人已满场次×5000 + 两个新配对的加分。
+    堆里只保留 k 个候选，堆满后先用部分球员算出的上界与第 k 名比较，
+    不可能超过第 k 名的分支整体跳过。同分时先枚举到的比赛在前，
+    与对全部候选稳定排序的结果一致；(男2, 女2) 在前的重复比赛只枚举一次。
+    
+    Returns:
+        [(priority, match, match_players, pair1, pair2)]，按优先级从高到低
+    """
+    males = [m for m in males if m not in excluded]
+    females = [f for f in females if f not in excluded]
+    if len(males) < 2 or len(females) < 2:
+        return []
+    best_male_gain = max(gain[m] for m in males)
+    best_female_gain = max(gain[f] for f in females)
+    most_female_remaining = max(remaining[f] for f in females)
+    most_remaining = max(max(remaining[m] for m in males), most_female_remaining)
+    # 已用配对不参与枚举，两个配对都是新的
+    best_pair_bonus = max(pair_bonus[(m, f)] for m in males for f in females)
+    
+    heap = []  # (priority, -序号, ...)，堆顶是当前第 k 名
+    seq = 0
+    for m1_idx, male1 in enumerate(males):
+        for f1_idx, female1 in enumerate(females):
+            pair1 = (male1, female1)
+            if pair1 in pair_used:
+                continue
+            base1 = gain[male1] + gain[female1] + pair_bonus[pair1]
+            if len(heap) == k and base1 + best_male_gain + best_female_gain + \
+                    most_remaining * 100 + best_pair_bonus <= heap[0][0]:
+                continue
+            
+            for male2 in males[m1_idx + 1:]:
+                base2 = base1 + gain[male2]
+                high2 = max(remaining[male1], remaining[female1], remaining[male2], most_female_remaining)
+                if len(heap) == k and base2 + best_female_gain + high2 * 100 + best_pair_bonus <= heap[0][0]:
+                    continue
+                
+                for f2_idx, female2 in enumerate(females):
+                    if f2_idx == f1_idx:
+                        continue
+                    pair2 = (male2, female2)
+                    if pair2 in pair_used:
+                        continue
+                    
+                    left = (remaining[male1], remaining[female1], remaining[male2], remaining[female2])
+                    priority = base2 + gain[female2] + max(left) * 100 + pair_bonus[pair2]
+                    # 如果有人已经打满场次，这场比赛不应该被优先考虑
+                    if min(left) <= 0:
+                        priority -= 5000
+                    
+                    seq += 1
+                    if len(heap) < k:
+                        heapq.heappush(heap, (priority, -seq, pair1, pair2))
+                    elif priority > heap[0][0]:
+                        heapq.heapreplace(heap, (priority, -seq, pair1, pair2))
+    
+    result = []
+    for priority, _, pair1, pair2 in sorted(heap, reverse=True):
+        result.append((priority, (pair1, pair2), {pair1[0], pair1[1], pair2[0], pair2[1]}, pair1, pair2))
+    return result
+
+
 def _generate_max_mode(
     group_a_males: List[str],
     group_b_females: List[str],
@@ -284,6 +504,27 @@ def _generate_max_mode(
     return matches
 
 
+def _excel_named_styles() -> List[NamedStyle]:
+    """对阵表的命名样式：注册到工作簿一次，写入单元格时按名称引用"""
+    thin = Side(style="thin")
+    styles = []
+    for name, size, bold, border, fill in [
+        ("chaos_title", 18, True, True, False),
+        ("chaos_config", 10, False, False, False),
+        ("chaos_header", 11, True, True, True),
+        ("chaos_cell", 10, False, True, False),
+    ]:
+        named = NamedStyle(name=name)
+        named.font = Font(name="微软雅黑", size=size, bold=bold)
+        named.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        if border:
+            named.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        if fill:
+            named.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        styles.append(named)
+    return styles
+
+
 def create_excel(
     matches: List[Dict],
     group_a_males: List[str],
@@ -291,7 +532,7 @@ def create_excel(
     output_path: str = "混双大乱斗_对阵表.xlsx"
 ):
     """
-    创建Excel对阵表
+    创建Excel对阵表（写入模式：逐行流式写入，样式在写入时按名称引用）
     
     Args:
         matches: 比赛列表
@@ -299,83 +540,18 @@ def create_excel(
         group_b_females: B组女队员列表
         output_path: 输出文件路径
     """
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "对阵表"
-    
-    # 样式定义
-    font_title = Font(name="微软雅黑", size=18, bold=True)
-    font_header = Font(name="微软雅黑", size=11, bold=True)
-    font_content = Font(name="微软雅黑", size=10)
-    alignment_center = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-    header_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    
-    # 标题行
-    ws.merge_cells("A1:G1")
-    ws["A1"] = "混双大乱斗 - 对阵表"
-    ws["A1"].font = font_title
-    ws["A1"].alignment = alignment_center
-    ws["A1"].border = border
-    
-    # 配置行
-    ws.merge_cells("A2:G2")
-    ws["A2"] = f"A组男队员 ({len(group_a_males)}人) vs B组女队员 ({len(group_b_females)}人) | 场地数：2个 | 赛制：混双对决"
-    ws["A2"].font = Font(name="微软雅黑", size=10)
-    ws["A2"].alignment = alignment_center
-    
-    # 表头
-    headers = ["轮次", "场地", "类型", "对阵 A (男/女)", "比分 A", "比分 B", "对阵 B (男/女)"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = font_header
-        cell.alignment = alignment_center
-        cell.border = border
-        cell.fill = header_fill
-    
-    # 比赛数据行
-    for row_idx, match_info in enumerate(matches, 4):
-        match = match_info["match"]
-        court = match_info["court"]
-        round_num = match_info["round"]
-        
-        # 对阵A: 男/女
-        pair_a = f"{match[0][0]}/{match[0][1]}"
-        # 对阵B: 男/女
-        pair_b = f"{match[1][0]}/{match[1][1]}"
-        
-        ws.cell(row=row_idx, column=1, value=round_num).font = font_content
-        ws.cell(row=row_idx, column=2, value=f"{court}号").font = font_content
-        ws.cell(row=row_idx, column=3, value="混双").font = font_content
-        ws.cell(row=row_idx, column=4, value=pair_a).font = font_content
-        ws.cell(row=row_idx, column=5, value="").font = font_content
-        ws.cell(row=row_idx, column=6, value="").font = font_content
-        ws.cell(row=row_idx, column=7, value=pair_b).font = font_content
-        
-        for col in range(1, 8):
-            ws.cell(row=row_idx, column=col).alignment = alignment_center
-            ws.cell(row=row_idx, column=col).border = border
-    
-    # 列宽设置
-    ws.column_dimensions["A"].width = 7
-    ws.column_dimensions["B"].width = 9
-    ws.column_dimensions["C"].width = 9
-    ws.column_dimensions["D"].width = 22
-    ws.column_dimensions["E"].width = 12
-    ws.column_dimensions["F"].width = 12
-    ws.column_dimensions["G"].width = 22
-    
-    # 行高设置
-    max_row = len(matches) + 3
-    for row in ws.iter_rows(min_row=1, max_row=max_row if max_row > 3 else 20):
-        ws.row_dimensions[row[0].row].height = 32
-    
-    # 页面设置
+    wb = openpyxl.Workbook(write_only=True)
+    for named in _excel_named_styles():
+        wb.add_named_style(named)
+    ws = wb.create_sheet(title="对阵表")
+    
+    # 写入模式下列宽、行高、合并单元格和页面设置都要在写入数据之前设置
+    for col, width in zip("ABCDEFG", [7, 9, 9, 22, 12, 12, 22]):
+        ws.column_dimensions[col].width = width
+    ws.sheet_format.defaultRowHeight = 32
+    ws.sheet_format.customHeight = True
+    ws.merged_cells.add("A1:G1")
+    ws.merged_cells.add("A2:G2")
     ws.page_setup.paperSize = 9
     ws.page_setup.orientation = "landscape"
     ws.page_margins.left = 0.3
@@ -383,6 +559,27 @@ def create_excel(
     ws.page_margins.top = 0.5
     ws.page_margins.bottom = 0.5
     
+    def row(values, style):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
+    
+    court_count = max((m["court"] for m in matches), default=0)
+    ws.append(row(["混双大乱斗 - 对阵表"], "chaos_title"))
+    ws.append(row([f"A组男队员 ({len(group_a_males)}人) vs B组女队员 ({len(group_b_females)}人) | "
+                   f"场地数：{court_count}个 | 赛制：混双对决"], "chaos_config"))
+    ws.append(row(["轮次", "场地", "类型", "对阵 A (男/女)", "比分 A", "比分 B", "对阵 B (男/女)"], "chaos_header"))
+    
+    # 比赛数据行
+    for match_info in matches:
+        match = match_info["match"]
+        # 对阵A / 对阵B: 男/女
+        ws.append(row([match_info["round"], f"{match_info['court']}号", "混双",
+                       f"{match[0][0]}/{match[0][1]}", "", "", f"{match[1][0]}/{match[1][1]}"], "chaos_cell"))
+    
     wb.save(output_path)
     print(f"✅ 对阵表已生成：{output_path}")
 
@@ -476,7 +673,8 @@ def main():
         group_b_females=group_b_females,
         court_count=2,
         mode="fair",  # 公平模式：每人6场
-        priority_players=["崔倩男"]  # 崔倩男优先排阵，不休息
+        priority_players=["崔倩男"],  # 崔倩男优先排阵，不休息
+        workers=os.cpu_count() or 1  # 需要搜索种子时用上所有核心
     )
     
     if not matches:
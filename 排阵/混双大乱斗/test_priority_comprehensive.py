@@ -5,6 +5,7 @@
 """
 
 from mixed_doubles_chaos import generate_mixed_doubles_matches
+from chaos_validator import stress_test, validate_schedule, violation_count
 import sys
 
 
@@ -255,7 +256,7 @@ def test_priority_vs_normal_comparison():
     可选需求测试：对比优先排阵与普通模式的差异
     """
     print("\n" + "=" * 80)
-    print("测试5: 优先排阵 vs 普通模式对比（可选需求）")
+    print("测试7: 优先排阵 vs 普通模式对比（可选需求）")
     print("=" * 80)
     
     group_a_males = ["林锋", "王小波", "陈顺星", "罗琴荩", "苏大哲", "黄冬青"]
@@ -315,7 +316,7 @@ def test_multiple_priority_players():
     可选需求测试：多个球员同时优先排阵
     """
     print("\n" + "=" * 80)
-    print("测试6: 多个球员同时优先排阵（可选需求）")
+    print("测试8: 多个球员同时优先排阵（可选需求）")
     print("=" * 80)
     
     group_a_males = ["林锋", "王小波", "陈顺星", "罗琴荩", "苏大哲", "黄冬青"]
@@ -365,7 +366,7 @@ def test_match_validity():
     必须需求测试：每场比赛的配对有效性（无相同男队员或女队员）
     """
     print("\n" + "=" * 80)
-    print("测试7: 比赛配对有效性（必须需求）")
+    print("测试5: 比赛配对有效性（必须需求）")
     print("=" * 80)
     
     group_a_males = ["林锋", "王小波", "陈顺星", "罗琴荩", "苏大哲", "黄冬青"]
@@ -412,6 +413,47 @@ def test_match_validity():
         return False
 
 
+def test_validator_stress():
+    """
+    必须需求测试：随机生成大量赛程，用校验器检查结构性规则；并确认校验器能发现人为制造的错误
+    """
+    print("\n" + "=" * 80)
+    print("测试6: 随机赛程压力校验（必须需求）")
+    print("=" * 80)
+    
+    result = stress_test(cases=300, seed=0, max_group=6, max_courts=3)
+    print(f"\n随机赛程: {result['cases']}个")
+    print(f"校验耗时: {result['validate_seconds'] * 1000:.1f}ms")
+    for rule, count in result["rule_failures"].items():
+        print(f"  {rule} 未满足: {count}个")
+    
+    # 人为制造错误：把第2轮的一场比赛挪到第1轮（同轮重复），并重复一个配对
+    group_a_males = ["林锋", "王小波", "陈顺星", "罗琴荩", "苏大哲", "黄冬青"]
+    group_b_females = ["田茜", "李祺祺", "高洁", "滕菲", "崔倩男", "李杏芝"]
+    matches = generate_mixed_doubles_matches(group_a_males, group_b_females, court_count=2, mode="fair")
+    broken = [dict(m) for m in matches]
+    moved = next(m for m in broken if m["round"] == 2)
+    moved["round"] = 1
+    broken.append(dict(broken[0]))
+    report = validate_schedule(broken, group_a_males, group_b_females)
+    print(f"\n人为错误的校验结果: {report}")
+    detected = report["round_duplicates"] > 0 and report["pair_repeats"] > 0 and report["games"] > 0
+    clean = violation_count(validate_schedule(matches, group_a_males, group_b_females)) == 0
+    
+    if not result["hard_failures"] and detected and clean:
+        print("✅ 测试通过：随机赛程均无结构性错误，人为错误均被发现")
+        return True
+    else:
+        print("❌ 测试失败")
+        for params, failure in result["hard_failures"][:10]:
+            print(f"   {params}: {failure}")
+        if not detected:
+            print("   校验器未发现人为制造的错误")
+        if not clean:
+            print("   校验器误报了正常赛程")
+        return False
+
+
 def run_all_tests():
     """运行所有测试"""
     print("\n" + "=" * 80)
@@ -438,17 +480,20 @@ def run_all_tests():
     test4 = test_rest_one_round_must_play()
     results["必须需求"].append(("休息一轮后必须上场", test4))
     
-    test7 = test_match_validity()
-    results["必须需求"].append(("比赛配对有效性", test7))
+    test5 = test_match_validity()
+    results["必须需求"].append(("比赛配对有效性", test5))
+    
+    test6 = test_validator_stress()
+    results["必须需求"].append(("随机赛程压力校验", test6))
     
     # 可选需求测试
     print("\n【可选需求测试】\n")
     
-    test5 = test_priority_vs_normal_comparison()
-    results["可选需求"].append(("优先vs普通对比", test5))
+    test7 = test_priority_vs_normal_comparison()
+    results["可选需求"].append(("优先vs普通对比", test7))
     
-    test6 = test_multiple_priority_players()
-    results["可选需求"].append(("多球员优先排阵", test6))
+    test8 = test_multiple_priority_players()
+    results["可选需求"].append(("多球员优先排阵", test8))
     
     # 汇总结果
     print("\n" + "=" * 80)